@@ -0,0 +1,511 @@
+"""Benchmark suite for the client and MCP dispatch hot paths.
+
+Usage::
+
+    python scripts/run_benchmarks.py                    # run and compare with baseline
+    python scripts/run_benchmarks.py --scenario list_tools --scenario request_overhead
+    python scripts/run_benchmarks.py --update-baseline  # store current numbers as baseline
+    python scripts/run_benchmarks.py --scenario startup_help --update-baseline
+
+All scenarios run against the local stand-in server
+(``mcp_docassemble.fakeserver``) or an in-process null client, so no network
+or Docassemble installation is needed. Results are written to
+``benchmark_results.json``; every scenario is compared against
+``benchmarks/baseline.json`` and the script exits with status 1 when a metric
+regresses by more than ``--tolerance``. ``--update-baseline`` together with
+``--scenario`` only replaces the selected scenarios in the baseline.
+
+The ``startup_*`` scenarios run ``mcp-docassemble <command>`` in fresh
+interpreters with ``-X importtime`` and report the cold-start import cost of
+each subcommand. The arguments make every command stop right after it has
+loaded what it needs (closed port, invalid port, missing file).
+
+Absolute numbers depend on the machine. Regenerate the baseline on the machine
+that runs the comparison (``make bench-baseline``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+from mcp.types import CallToolRequest, CallToolRequestParams, ListToolsRequest
+from requests.adapters import HTTPAdapter
+
+from mcp_docassemble.client import DocassembleClient
+from mcp_docassemble.fakeserver import FakeDocassembleServer
+from mcp_docassemble.server import DocassembleServer
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+DEFAULT_OUTPUT = Path("benchmark_results.json")
+
+
+def timing_stats(samples: list[float]) -> dict[str, float]:
+    """Summarise per-call durations (seconds) in milliseconds."""
+    ordered = sorted(samples)
+    p95_index = max(0, int(len(ordered) * 0.95) - 1)
+    mean = statistics.fmean(ordered)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(mean * 1000, 4),
+        "p50_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[p95_index] * 1000, 4),
+        "ops_per_sec": round(1 / mean, 1) if mean else 0.0,
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 5) -> list[float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def measure_async(func, iterations: int, warmup: int = 5) -> list[float]:
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class NullClient:
+    """Client double whose methods return a fixed result without I/O."""
+
+    base_url = "http://null"
+
+    def __init__(self, result: Any = None):
+        self.result = result if result is not None else {}
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.result
+
+
+def call_tool_request(name: str, arguments: dict | None = None) -> CallToolRequest:
+    return CallToolRequest(
+        method="tools/call",
+        params=CallToolRequestParams(name=name, arguments=arguments or {}),
+    )
+
+
+def large_result(items: int) -> dict[str, Any]:
+    return {
+        "items": [
+            {
+                "id": n,
+                "email": f"user{n}@example.com",
+                "first_name": "Vorname",
+                "last_name": "Nachname",
+                "privileges": ["user"],
+                "active": True,
+            }
+            for n in range(items)
+        ],
+        "next_id": None,
+    }
+
+
+# --------------------------------------------------------------------------
+# Scenarios
+# --------------------------------------------------------------------------
+
+
+def bench_request_overhead(scale: float) -> dict[str, Any]:
+    """Per-call cost of DocassembleClient._request against a zero-latency server."""
+    with FakeDocassembleServer() as fake:
+        client = DocassembleClient(fake.base_url, "bench-key")
+        samples = measure(client.get_current_user, int(500 * scale))
+    return {**timing_stats(samples), "metric": "p50_ms", "better": "lower"}
+
+
+class StubAdapter(HTTPAdapter):
+    """Transport adapter that answers every request with a canned JSON response."""
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = b'{"id": 7}'
+        response.request = request
+        response.url = request.url
+        return response
+
+
+def bench_request_prepare(scale: float) -> dict[str, Any]:
+    """Client-side cost of _request per call, with the network replaced by a stub.
+
+    Covers URL building, metric labels, header merging and request preparation
+    for a GET with a path id, a JSON POST and a multipart upload.
+    """
+    client = DocassembleClient("http://stub.invalid/da", "bench-key")
+    adapter = StubAdapter()
+    client.session.mount("http://", adapter)
+    iterations = int(5000 * scale)
+    upload = {"file": ("a.yml", b"question: x\n", "text/plain")}
+    calls = {
+        "get": lambda: client._request("GET", "/api/user/7"),
+        "post_json": lambda: client._request("POST", "/api/user/new", data={"a": 1}),
+        "multipart": lambda: client._request(
+            "POST", "/api/playground", data={"project": "default"}, files=upload
+        ),
+    }
+    stats = {
+        name: timing_stats(measure(call, iterations)) for name, call in calls.items()
+    }
+    return {
+        **stats["get"],
+        "post_json_p50_ms": stats["post_json"]["p50_ms"],
+        "multipart_p50_ms": stats["multipart"]["p50_ms"],
+        "metric": "p50_ms",
+        "better": "lower",
+    }
+
+
+def bench_list_tools(scale: float) -> dict[str, Any]:
+    """Latency of the registered tools/list handler."""
+    server = DocassembleServer()
+    handler = server.server.request_handlers[ListToolsRequest]
+    request = ListToolsRequest(method="tools/list")
+    samples = asyncio.run(measure_async(lambda: handler(request), int(200 * scale)))
+    return {**timing_stats(samples), "metric": "p50_ms", "better": "lower"}
+
+
+def bench_execute_tool_dispatch(scale: float) -> dict[str, Any]:
+    """Cost of _execute_tool routing without any client work."""
+    server = DocassembleServer()
+    server.client = NullClient()
+    samples = asyncio.run(
+        measure_async(
+            lambda: server._execute_tool("docassemble_get_current_user", {}),
+            int(5000 * scale),
+        )
+    )
+    return {**timing_stats(samples), "metric": "p50_ms", "better": "lower"}
+
+
+def bench_call_tool_serialization(scale: float) -> dict[str, Any]:
+    """tools/call with a large result: schema validation plus JSON encoding."""
+    server = DocassembleServer()
+    result = large_result(5000)
+    server.client = NullClient(result)
+    handler = server.server.request_handlers[CallToolRequest]
+    request = call_tool_request("docassemble_list_users")
+    samples = asyncio.run(measure_async(lambda: handler(request), int(30 * scale)))
+    payload_bytes = len(json.dumps(result, indent=2, ensure_ascii=False))
+    return {
+        **timing_stats(samples),
+        "payload_bytes": payload_bytes,
+        "metric": "p50_ms",
+        "better": "lower",
+    }
+
+
+def bench_pagination_throughput(scale: float) -> dict[str, Any]:
+    """Items per second when walking list_users through next_id pages."""
+    total = int(2000 * scale)
+    with FakeDocassembleServer(
+        total_items=total, page_size=50, payload_bytes=128
+    ) as fake:
+        client = DocassembleClient(fake.base_url, "bench-key")
+        started = time.perf_counter()
+        items = 0
+        pages = 0
+        next_id = None
+        while True:
+            page = client.list_users(next_id=next_id)
+            items += len(page["items"])
+            pages += 1
+            next_id = page.get("next_id")
+            if not next_id:
+                break
+        duration = time.perf_counter() - started
+    return {
+        "items": items,
+        "pages": pages,
+        "duration_seconds": round(duration, 4),
+        "items_per_sec": round(items / duration, 1),
+        "metric": "items_per_sec",
+        "better": "higher",
+    }
+
+
+def bench_concurrent_tool_calls(scale: float) -> dict[str, Any]:
+    """tools/call throughput with 50 concurrent calls and 5 ms server latency."""
+    concurrency = 50
+    rounds = max(1, int(4 * scale))
+    with FakeDocassembleServer(latency=0.005) as fake:
+        server = DocassembleServer()
+        server.setup_client(fake.base_url, "bench-key")
+        server.client.session.mount("http://", HTTPAdapter(pool_maxsize=concurrency))
+        handler = server.server.request_handlers[CallToolRequest]
+        request = call_tool_request("docassemble_get_current_user")
+
+        async def run() -> float:
+            await handler(request)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                results = await asyncio.gather(
+                    *(handler(request) for _ in range(concurrency))
+                )
+                assert not any(r.root.isError for r in results)
+            return time.perf_counter() - started
+
+        duration = asyncio.run(run())
+    calls = concurrency * rounds
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "duration_seconds": round(duration, 4),
+        "calls_per_sec": round(calls / duration, 1),
+        "metric": "calls_per_sec",
+        "better": "higher",
+    }
+
+
+# --------------------------------------------------------------------------
+# CLI cold start
+# --------------------------------------------------------------------------
+
+CLOSED_URL = "http://127.0.0.1:9"
+IMPORT_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+STARTUP_COMMANDS: dict[str, tuple[list[str], dict[str, str]]] = {
+    "help": (["--help"], {}),
+    "test_connection": (
+        ["test-connection", "--base-url", CLOSED_URL, "--api-key", "bench"],
+        {},
+    ),
+    "serve": (
+        ["serve"],
+        {
+            "DOCASSEMBLE_TENANTS_FILE": "missing.json",
+        },
+    ),
+    "fake_server": (["fake-server", "--port", "-1"], {}),
+    "loadtest": (["loadtest", "--fake", "--mix", "unknown=1"], {}),
+    "interview_matrix": (
+        [
+            "interview-matrix",
+            "--interview",
+            "bench.yml",
+            "--cases",
+            "missing.json",
+            "--base-url",
+            CLOSED_URL,
+            "--api-key",
+            "bench",
+        ],
+        {},
+    ),
+}
+
+
+def import_profile(stderr: str) -> tuple[float, int]:
+    """Total import time (ms, top-level modules) and module count of a run."""
+    total_us = 0
+    modules = 0
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        modules += 1
+        if not match.group(2):
+            total_us += int(match.group(1))
+    return total_us / 1000, modules
+
+
+def bench_startup(command: str, scale: float) -> dict[str, Any]:
+    """Cold-start import cost of one CLI subcommand in fresh interpreters."""
+    args, extra_env = STARTUP_COMMANDS[command]
+    env = {k: v for k, v in os.environ.items() if not k.startswith("DOCASSEMBLE_")}
+    env.update(extra_env)
+    runs = max(3, int(5 * scale))
+    import_ms, wall_ms, modules = [], [], []
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(runs):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", "mcp_docassemble.cli"]
+                + args,
+                cwd=cwd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=60,
+            )
+            wall_ms.append((time.perf_counter() - started) * 1000)
+            total, count = import_profile(completed.stderr)
+            import_ms.append(total)
+            modules.append(count)
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(import_ms), 1),
+        "wall_ms": round(statistics.median(wall_ms), 1),
+        "modules": int(statistics.median(modules)),
+        "metric": "import_ms",
+        "better": "lower",
+    }
+
+
+SCENARIOS: dict[str, Callable[[float], dict[str, Any]]] = {
+    "request_overhead": bench_request_overhead,
+    "request_prepare": bench_request_prepare,
+    "list_tools": bench_list_tools,
+    "execute_tool_dispatch": bench_execute_tool_dispatch,
+    "call_tool_serialization": bench_call_tool_serialization,
+    "pagination_throughput": bench_pagination_throughput,
+    "concurrent_tool_calls": bench_concurrent_tool_calls,
+    **{
+        f"startup_{command}": partial(bench_startup, command)
+        for command in STARTUP_COMMANDS
+    },
+}
+
+
+# --------------------------------------------------------------------------
+# Baseline comparison
+# --------------------------------------------------------------------------
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    tolerance: float,
+) -> list[dict[str, Any]]:
+    """Compare each scenario's primary metric with the baseline."""
+    rows = []
+    for name, result in results.items():
+        metric = result["metric"]
+        current = result[metric]
+        reference = baseline.get(name, {}).get(metric)
+        row = {"scenario": name, "metric": metric, "current": current}
+        if not reference:
+            row.update({"baseline": None, "change": None, "regression": False})
+        else:
+            change = (current - reference) / reference
+            worse = (
+                change > tolerance
+                if result["better"] == "lower"
+                else (change < -tolerance)
+            )
+            row.update(
+                {
+                    "baseline": reference,
+                    "change": round(change, 4),
+                    "regression": worse,
+                }
+            )
+        rows.append(row)
+    return rows
+
+
+def print_report(rows: list[dict[str, Any]]) -> None:
+    print(
+        f"\n{'Scenario':<26}{'Metric':<16}{'Current':>12}{'Baseline':>12}{'Change':>10}"
+    )
+    for row in rows:
+        baseline = "-" if row["baseline"] is None else f"{row['baseline']:.4g}"
+        change = "-" if row["change"] is None else f"{row['change']:+.1%}"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['scenario']:<26}{row['metric']:<16}{row['current']:>12.4g}"
+            f"{baseline:>12}{change:>10}{flag}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Run only the given scenario (repeatable)",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="Iteration multiplier")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown before a scenario counts as regression",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing",
+    )
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    for name in args.scenario or SCENARIOS:
+        print(f"Running {name} ...", flush=True)
+        results[name] = SCENARIOS[name](args.scale)
+
+    environment = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    if args.update_baseline:
+        scenarios = results
+        if args.scenario and args.baseline.exists():
+            stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+            scenarios = {**stored["scenarios"], **results}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(
+                {"environment": environment, "scenarios": scenarios},
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["scenarios"]
+    rows = compare(results, baseline, args.tolerance)
+    print_report(rows)
+
+    args.output.write_text(
+        json.dumps(
+            {"environment": environment, "scenarios": results, "comparison": rows},
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"\nResults written to {args.output}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,18 +5,29 @@ Usage::
     DOCASSEMBLE_BASE_URL=http://... \
     DOCASSEMBLE_API_KEY=... \
     PYTHONIOENCODING=utf-8 \
-    python scripts/run_live_endpoint_checks.py
+    python scripts/run_live_endpoint_checks.py [--parallel] [--workers 4] [--rate 2]
 
 The script prints the raw results from the suite (including the detailed
 per-endpoint output produced by the underlying test helpers) and writes a
 machine-readable summary to ``live_test_results.json`` in the project root.
+
+By default the five categories run strictly one after another with a pause
+between endpoints. ``--parallel`` runs the read-only checks concurrently and
+the mutating checks as dependency-ordered chains, all sharing one rate limit
+(``--rate`` checks per second). Checks that can disturb every other check
+(package installation, cache clearing, restart) always run last, one at a
+time. Both modes record the per-endpoint latency in the summary.
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
 from tests.test_data_and_keys import DataAndKeyManagementTests
 from tests.test_interview_management import InterviewManagementTests
@@ -32,18 +43,209 @@ MODULES = [
     ("server_management", ServerManagementTests),
 ]
 
+# Checks without side effects; they may run in any order and concurrently.
+READ_ONLY = {
+    "user_management": [
+        "list_users",
+        "get_user_by_username",
+        "get_current_user",
+        "get_user_by_id",
+        "list_privileges",
+    ],
+    "data_and_keys": [
+        "get_user_api_keys",
+        "get_interview_data",
+        "retrieve_stashed_data",
+    ],
+    "interview_management": [
+        "list_interview_sessions",
+        "list_advertised_interviews",
+        "get_user_secret",
+        "get_login_url",
+    ],
+    "playground_management": ["list_playground_files", "list_playground_projects"],
+    "server_management": [
+        "get_server_config",
+        "get_package_update_status",
+        "get_restart_status",
+        "list_installed_packages",
+    ],
+}
+
+# Mutating checks: each chain runs in order, chains run concurrently.
+MUTATING_CHAINS = [
+    (
+        "user_management",
+        [
+            "create_user",
+            "invite_users",
+            "update_current_user",
+            "update_user",
+            "deactivate_user",
+            "give_user_privilege",
+            "remove_user_privilege",
+        ],
+    ),
+    ("data_and_keys", ["create_user_api_key", "delete_user_api_key"]),
+    (
+        "interview_management",
+        [
+            "start_interview",
+            "get_interview_variables",
+            "set_interview_variables",
+            "get_current_question",
+            "run_interview_action",
+            "go_back_in_interview",
+            "delete_interview_session",
+            "delete_interview_sessions",
+        ],
+    ),
+    (
+        "playground_management",
+        [
+            "create_playground_project",
+            "delete_playground_project",
+            "delete_playground_file",
+        ],
+    ),
+]
+
+# Server-wide side effects: run after everything else, one at a time.
+FINAL = [
+    ("server_management", "install_package"),
+    ("server_management", "uninstall_package"),
+    ("playground_management", "clear_interview_cache"),
+    ("server_management", "trigger_server_restart"),
+]
+
+
+class RateLimiter:
+    """Spaces check starts evenly across threads (``rate`` per second)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def endpoints_of(cls: type) -> list[str]:
+    """Endpoint names in the order the category defines its ``_test_*`` methods."""
+    return [name[len("_test_") :] for name in vars(cls) if name.startswith("_test_")]
+
+
+def run_sequential(testers: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    results = {}
+    for name, tester in testers.items():
+        print(f"\n====== Starte Testkategorie: {name} ======")
+        tester.delay = max(getattr(tester, "delay", 1), 1)
+        results[name] = tester.run_all_tests()
+        time.sleep(5)
+    return results
+
+
+def run_parallel(
+    testers: dict[str, Any], workers: int, rate: float
+) -> dict[str, dict[str, Any]]:
+    limiter = RateLimiter(rate)
+    results: dict[str, dict[str, Any]] = {name: {} for name in testers}
+
+    def check(category: str, endpoint: str) -> None:
+        tester = testers[category]
+        limiter.wait()
+        results[category][endpoint] = tester.test_endpoint(
+            endpoint, getattr(tester, f"_test_{endpoint}")
+        )
+
+    def chain(category: str, endpoints: list[str]) -> None:
+        for endpoint in endpoints:
+            check(category, endpoint)
+
+    # Unclassified checks are treated as mutating and run as their own chain
+    planned = {(c, e) for c, endpoints in READ_ONLY.items() for e in endpoints}
+    planned |= {(c, e) for c, endpoints in MUTATING_CHAINS for e in endpoints}
+    planned |= set(FINAL)
+    chains = list(MUTATING_CHAINS)
+    for category, tester in testers.items():
+        extra = [e for e in endpoints_of(type(tester)) if (category, e) not in planned]
+        if extra:
+            chains.append((category, extra))
+
+    for tester in testers.values():
+        tester.delay = 0  # the shared rate limiter replaces the per-test pause
+
+    # One thread per mutating chain; read-only checks share ``workers`` threads
+    with ThreadPoolExecutor(max_workers=len(chains)) as chain_pool:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as read_pool:
+            futures = [
+                chain_pool.submit(chain, category, endpoints)
+                for category, endpoints in chains
+            ]
+            futures += [
+                read_pool.submit(check, category, endpoint)
+                for category, endpoints in READ_ONLY.items()
+                for endpoint in endpoints
+            ]
+            for future in futures:
+                future.result()
+
+    print("\n====== Abschließende Checks (sequentiell) ======")
+    for category, endpoint in FINAL:
+        check(category, endpoint)
+
+    # Report in the categories' own endpoint order, like the sequential run
+    return {
+        category: {
+            endpoint: results[category][endpoint]
+            for endpoint in endpoints_of(type(testers[category]))
+            if endpoint in results[category]
+        }
+        for category in testers
+    }
+
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run read-only checks concurrently and mutating checks as ordered chains",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent read-only checks; each mutating chain gets its own thread",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="Maximum check starts per second across all workers (--parallel)",
+    )
+    parser.add_argument("--output", type=Path, default=Path("live_test_results.json"))
+    args = parser.parse_args()
+
+    testers = {name: cls() for name, cls in MODULES}
+    started = time.perf_counter()
+    if args.parallel:
+        category_results = run_parallel(testers, args.workers, args.rate)
+    else:
+        category_results = run_sequential(testers)
+    duration = time.perf_counter() - started
+
     summary: dict[str, dict[str, object]] = {}
     total_success = 0
     total_count = 0
 
-    for name, cls in MODULES:
-        print(f"\n====== Starte Testkategorie: {name} ======")
-        tester = cls()
-        tester.delay = max(getattr(tester, "delay", 1), 1)
-        results = tester.run_all_tests()
-
+    for name, results in category_results.items():
         successes = sum(1 for success, _ in results.values() if success)
         count = len(results)
 
@@ -54,19 +256,22 @@ def main() -> None:
             "successful": successes,
             "total": count,
             "details": results,
+            "latency_ms": {
+                endpoint: testers[name].latencies.get(endpoint) for endpoint in results
+            },
         }
 
-        time.sleep(5)
-
     print("\n====== Gesamtübersicht ======")
-    print(f"Erfolgreich: {total_success}/{total_count}")
+    print(f"Erfolgreich: {total_success}/{total_count} in {duration:.1f}s")
     print(json.dumps(summary, indent=2, ensure_ascii=False))
 
-    Path("live_test_results.json").write_text(
+    args.output.write_text(
         json.dumps(
             {
                 "total_success": total_success,
                 "total_count": total_count,
+                "mode": "parallel" if args.parallel else "sequential",
+                "duration_seconds": round(duration, 1),
                 "categories": summary,
             },
             indent=2,
@@ -29,8 +29,22 @@ Verwendung:
 __version__ = "0.1.0"
 __author__ = "Docassemble MCP Development Team"
 
-from .client import DocassembleAPIError, DocassembleClient
-from .server import DocassembleServer, create_server
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import DocassembleAPIError, DocassembleClient
+    from .server import DocassembleServer, create_server
+
+# Die Untermodule werden erst beim ersten Zugriff importiert: server zieht das
+# mcp SDK nach, client requests. `mcp-docassemble --help`, `fake-server` oder
+# `loadtest` brauchen davon höchstens einen Teil.
+_LAZY_ATTRIBUTES = {
+    "create_server": ".server",
+    "DocassembleServer": ".server",
+    "DocassembleClient": ".client",
+    "DocassembleAPIError": ".client",
+}
 
 __all__ = [
     "create_server",
@@ -38,3 +52,16 @@ __all__ = [
     "DocassembleClient",
     "DocassembleAPIError",
 ]
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,262 @@
+"""
+Lastverteilung über mehrere Docassemble Knoten
+
+NodePool verteilt Requests auf mehrere Application Server derselben
+Docassemble Installation:
+- zustandslose Endpunkte gehen an den gesunden Knoten mit den wenigsten
+  offenen Requests (bei Gleichstand reihum)
+- /api/session* Requests bleiben bei dem Knoten, der die Session erzeugt hat
+  (Session Affinität, abschaltbar)
+- Verbindungsfehler und 502/503/504 markieren einen Knoten als ungesund; der
+  Request wird, wenn möglich, auf einem anderen Knoten wiederholt
+- ein Hintergrund-Thread prüft alle Knoten über den Health Check Pfad und
+  nimmt wiederhergestellte Knoten zurück in die Verteilung
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+FAILOVER_STATUS = (502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "DELETE")
+
+
+def split_base_urls(base_url: Any) -> List[str]:
+    """Akzeptiert eine URL, eine kommagetrennte Liste oder eine Liste von URLs"""
+    urls = base_url.split(",") if isinstance(base_url, str) else list(base_url)
+    urls = [url.strip().rstrip("/") for url in urls if url and url.strip()]
+    if not urls:
+        raise ValueError("Mindestens eine Docassemble Base URL ist erforderlich")
+    return urls
+
+
+def request_not_sent(error: requests.RequestException) -> bool:
+    """True, wenn der Request den Server sicher nicht erreicht hat"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class Node:
+    """Ein Docassemble Application Server"""
+
+    def __init__(self, url: str, window: int = 200):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.unhealthy_until = 0.0
+        self.ewma_seconds: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def get_stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def quantile(q: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(
+                ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3
+            )
+
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": {
+                "ewma": (
+                    round(self.ewma_seconds * 1000, 3)
+                    if self.ewma_seconds is not None
+                    else None
+                ),
+                "p50": quantile(0.5),
+                "p95": quantile(0.95),
+            },
+        }
+
+
+class NodePool:
+    """
+    Auswahl, Gesundheitsstatus und Session Affinität mehrerer Knoten.
+
+    Args:
+        urls: Base URLs der Knoten
+        session: requests.Session für Health Checks
+        health_path: Pfad des Health Checks (Docassemble: /health_check)
+        health_interval: Abstand der Health Checks in Sekunden (0 = nur passiv)
+        eject_seconds: Dauer, für die ein fehlerhafter Knoten gemieden wird
+        error_threshold: Aufeinanderfolgende 5xx Fehler bis zum Auswerfen
+        session_affinity: Session Requests an den erzeugenden Knoten senden
+        max_affinity_entries: Obergrenze der gemerkten Session → Knoten Zuordnungen
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        session: Optional[requests.Session] = None,
+        health_path: str = "/health_check",
+        health_interval: float = 10.0,
+        eject_seconds: float = 30.0,
+        error_threshold: int = 3,
+        session_affinity: bool = True,
+        max_affinity_entries: int = 10000,
+    ):
+        self.nodes = [Node(url) for url in urls]
+        self.session = session or requests.Session()
+        self.health_path = "/" + health_path.lstrip("/")
+        self.health_interval = health_interval
+        self.eject_seconds = eject_seconds
+        self.error_threshold = error_threshold
+        self.session_affinity = session_affinity
+        self.max_affinity_entries = max_affinity_entries
+        self.failovers = 0
+        self._affinity: "OrderedDict[str, Node]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._rr = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if health_interval:
+            self._thread = threading.Thread(
+                target=self._health_loop, name="node-health", daemon=True
+            )
+            self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # ----------------------------------------------------------------
+    # Auswahl
+    # ----------------------------------------------------------------
+
+    def pick(
+        self, affinity_key: Optional[str] = None, exclude: Optional[Set[Node]] = None
+    ) -> Node:
+        """Wählt den Knoten für den nächsten Request"""
+        exclude = exclude or set()
+        with self._lock:
+            if affinity_key and self.session_affinity:
+                bound = self._affinity.get(affinity_key)
+                if bound is not None and bound.healthy and bound not in exclude:
+                    self._affinity.move_to_end(affinity_key)
+                    bound.outstanding += 1
+                    bound.requests += 1
+                    return bound
+            candidates = [n for n in self.nodes if n not in exclude and n.healthy]
+            if not candidates:
+                # Alle ungesund: den Knoten versuchen, der am längsten gemieden wird
+                remaining = [n for n in self.nodes if n not in exclude]
+                candidates = sorted(
+                    remaining or self.nodes, key=lambda n: n.unhealthy_until
+                )[:1]
+            # Wechselnder Startpunkt verteilt Gleichstände reihum; Latenz dient
+            # bewusst nicht als Kriterium, sonst bekäme ein einmal langsamer
+            # Knoten keine Requests mehr, an denen er sich erholen könnte
+            self._rr = (self._rr + 1) % len(candidates)
+            rotated = candidates[self._rr :] + candidates[: self._rr]
+            node = min(rotated, key=lambda n: n.outstanding)
+            node.outstanding += 1
+            node.requests += 1
+            return node
+
+    def release(self, node: Node, seconds: float, failed: bool, hard: bool = False):
+        """
+        Beendet einen Request auf einem Knoten
+
+        Args:
+            node: Knoten aus pick()
+            seconds: Dauer des Requests
+            failed: Ob der Request als Knotenfehler zählt
+            hard: Verbindungsfehler; der Knoten wird sofort ausgeworfen
+        """
+        with self._lock:
+            node.outstanding -= 1
+            if failed:
+                node.errors += 1
+                node.consecutive_errors += 1
+                if hard or node.consecutive_errors >= self.error_threshold:
+                    if node.healthy:
+                        logger.warning(
+                            f"Docassemble Knoten {node.url} ausgeworfen "
+                            f"für {self.eject_seconds:g}s"
+                        )
+                    node.unhealthy_until = time.monotonic() + self.eject_seconds
+                return
+            node.consecutive_errors = 0
+            node.latencies.append(seconds)
+            node.ewma_seconds = (
+                seconds
+                if node.ewma_seconds is None
+                else 0.8 * node.ewma_seconds + 0.2 * seconds
+            )
+
+    # ----------------------------------------------------------------
+    # Session Affinität
+    # ----------------------------------------------------------------
+
+    def bind(self, session_id: str, node: Node):
+        if not self.session_affinity:
+            return
+        with self._lock:
+            self._affinity[session_id] = node
+            self._affinity.move_to_end(session_id)
+            while len(self._affinity) > self.max_affinity_entries:
+                self._affinity.popitem(last=False)
+
+    def unbind(self, session_id: str):
+        with self._lock:
+            self._affinity.pop(session_id, None)
+
+    # ----------------------------------------------------------------
+    # Health Checks
+    # ----------------------------------------------------------------
+
+    def check(self, node: Node) -> bool:
+        try:
+            response = self.session.get(node.url + self.health_path, timeout=2)
+            ok = response.status_code < 500
+        except requests.RequestException:
+            ok = False
+        with self._lock:
+            if ok:
+                if not node.healthy:
+                    logger.info(f"Docassemble Knoten {node.url} wieder verfügbar")
+                node.unhealthy_until = 0.0
+                node.consecutive_errors = 0
+            else:
+                node.unhealthy_until = time.monotonic() + self.eject_seconds
+        return ok
+
+    def _health_loop(self):
+        while not self._stopped.wait(self.health_interval):
+            for node in self.nodes:
+                self.check(node)
+
+    def stop(self):
+        self._stopped.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = [node.get_stats() for node in self.nodes]
+            affinity = len(self._affinity)
+        return {
+            "nodes": nodes,
+            "healthy": sum(1 for node in nodes if node["healthy"]),
+            "failovers": self.failovers,
+            "session_affinity": self.session_affinity,
+            "affinity_entries": affinity,
+        }
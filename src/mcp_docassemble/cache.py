@@ -0,0 +1,471 @@
+"""
+Client-seitige Caches
+
+CacheBackend ist die austauschbare Speicherschicht für alle cachebaren
+Lesezugriffe des DocassembleClient (Server Konfiguration, Packages, Interview
+Metadaten, Template Felder):
+
+- MemoryCacheBackend: prozesslokal, geht bei Neustart verloren
+- SQLiteCacheBackend: lokale SQLite Datei, übersteht Neustarts und kann von
+  mehreren mcp-docassemble Prozessen auf demselben Host geteilt werden
+
+Beide Backends unterstützen TTLs und eine Obergrenze der Gesamtgröße mit
+LRU Verdrängung.
+
+InterviewMetadataCache hält Ergebnisse von get_interview_data und
+list_advertised_interviews vor. Einträge sind an einen Fingerprint der
+installierten Package-Versionen gebunden: ändert sich eine Version, werden
+alte Einträge automatisch ignoriert.
+
+TemplateFieldCache speichert Ergebnisse von extract_template_fields
+inhaltsadressiert (SHA-256 der Template Bytes plus Format).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import cancellation
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def packages_fingerprint(packages: Any) -> str:
+    """Bildet einen stabilen Hash über Namen und Versionen installierter Packages"""
+    if not isinstance(packages, list):
+        return "unknown"
+    entries = sorted(
+        f"{item.get('name')}=={item.get('version')}"
+        for item in packages
+        if isinstance(item, dict)
+    )
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+def server_namespace(base_url: str, name: str) -> str:
+    """Cache Namespace, getrennt pro Docassemble Server"""
+    server = hashlib.sha256(base_url.encode("utf-8")).hexdigest()[:12]
+    return f"{server}:{name}"
+
+
+class CacheBackend:
+    """
+    Basisklasse für Cache Backends.
+
+    Werte müssen JSON-serialisierbar sein. Unterklassen implementieren
+    _get, _set und _delete; get_or_load ergänzt Single-Flight, damit
+    gleichzeitige Anfragen auf denselben Schlüssel nur einen Ladevorgang
+    auslösen.
+    """
+
+    def __init__(self):
+        self._flight_lock = threading.Lock()
+        self._flights: Dict[Tuple[str, str], threading.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, namespace: str, key: str) -> Any:
+        """Liefert den gecachten Wert oder MISSING"""
+        value = self._get(namespace, key)
+        self.stats["misses" if value is MISSING else "hits"] += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Speichert einen Wert, optional mit Ablaufzeit in Sekunden
+
+        ttl=None speichert ohne Ablaufzeit, ttl <= 0 speichert gar nicht
+        (Caching aus, z.B. DOCASSEMBLE_CONFIG_CACHE_TTL=0).
+        """
+        if ttl is not None and ttl <= 0:
+            return
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Cache Wert für {namespace}/{key} nicht serialisierbar: {e}")
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._set(namespace, key, payload, expires_at)
+
+    def delete(self, namespace: str, key: Optional[str] = None):
+        """Löscht einen Schlüssel oder (ohne key) den ganzen Namespace"""
+        self._delete(namespace, key)
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Liefert den gecachten Wert oder lädt ihn genau einmal (Single-Flight)"""
+        value = self.get(namespace, key)
+        if value is not MISSING:
+            return value
+
+        with self._flight_lock:
+            flight = self._flights.setdefault((namespace, key), threading.Lock())
+        # Ein abgebrochener Tool Aufruf wartet nicht weiter auf den Ladenden
+        cancellation.acquire(flight)
+        try:
+            # Ein paralleler Aufrufer kann den Wert inzwischen geladen haben
+            value = self._get(namespace, key)
+            if value is MISSING:
+                value = loader()
+                self.set(namespace, key, value, ttl)
+        finally:
+            flight.release()
+            with self._flight_lock:
+                self._flights.pop((namespace, key), None)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, **self.stats}
+
+    def _get(self, namespace: str, key: str) -> Any:
+        raise NotImplementedError
+
+    def _set(self, namespace: str, key: str, payload: str, expires_at: Optional[float]):
+        raise NotImplementedError
+
+    def _delete(self, namespace: str, key: Optional[str]):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Prozesslokaler LRU Cache mit TTL und Größenlimit"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    def _get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return MISSING
+            payload, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                self._remove((namespace, key))
+                self.stats["expired"] += 1
+                return MISSING
+            self._entries.move_to_end((namespace, key))
+        return json.loads(payload)
+
+    def _set(self, namespace: str, key: str, payload: str, expires_at: Optional[float]):
+        with self._lock:
+            self._remove((namespace, key))
+            self._entries[(namespace, key)] = (payload, expires_at)
+            self._size += len(payload)
+            while self._size > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _remove(self, entry_key: Tuple[str, str]):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+    def _delete(self, namespace: str, key: Optional[str]):
+        with self._lock:
+            if key is not None:
+                self._remove((namespace, key))
+                return
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                self._remove(entry_key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **super().get_stats(),
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Persistenter Cache in einer lokalen SQLite Datei.
+
+    Mehrere Prozesse können dieselbe Datei gleichzeitig nutzen: die Datenbank
+    läuft im WAL Modus, Schreibzugriffe erfolgen in IMMEDIATE Transaktionen und
+    warten per busy_timeout auf konkurrierende Writer.
+
+    Die Datei enthält u.a. die Server Konfiguration (Secret Key, Datenbank
+    Zugangsdaten) im Klartext. Sie wird daher nur für den Besitzer lesbar
+    angelegt (0600, neue Verzeichnisse 0700); SQLite übernimmt die Rechte für
+    WAL- und SHM-Dateien.
+
+    Args:
+        path: Pfad zur SQLite Datei (Verzeichnis wird angelegt)
+        max_bytes: Obergrenze der gespeicherten Nutzdaten, älteste Zugriffe werden verdrängt
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(
+            os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True
+        )
+        self._restrict_permissions()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)"
+        )
+
+    def _restrict_permissions(self):
+        """Legt die Datei mit 0600 an bzw. setzt bestehende Dateien auf 0600"""
+        os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+        for path in (self.path, f"{self.path}-wal", f"{self.path}-shm"):
+            try:
+                os.chmod(path, 0o600)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Rechte von {path} nicht einschränkbar: {e}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread, im Autocommit Modus"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, namespace: str, key: str) -> Any:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace=? AND key=?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return MISSING
+        payload, expires_at = row
+        now = time.time()
+        if expires_at is not None and expires_at < now:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace=? AND key=?",
+                (namespace, key),
+            )
+            self.stats["expired"] += 1
+            return MISSING
+        conn.execute(
+            "UPDATE cache_entries SET accessed_at=? WHERE namespace=? AND key=?",
+            (now, namespace, key),
+        )
+        return json.loads(payload)
+
+    def _set(self, namespace: str, key: str, payload: str, expires_at: Optional[float]):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, payload, len(payload), expires_at, now),
+            )
+            conn.execute(
+                "DELETE FROM cache_entries "
+                "WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (now,),
+            )
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - self.max_bytes)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, excess: int):
+        """Entfernt die am längsten nicht genutzten Einträge, bis excess frei ist"""
+        freed = 0
+        victims = []
+        for namespace, key, size in conn.execute(
+            "SELECT namespace, key, size FROM cache_entries ORDER BY accessed_at"
+        ):
+            if freed >= excess:
+                break
+            victims.append((namespace, key))
+            freed += size
+        conn.executemany(
+            "DELETE FROM cache_entries WHERE namespace=? AND key=?", victims
+        )
+        self.stats["evictions"] += len(victims)
+
+    def _delete(self, namespace: str, key: Optional[str]):
+        conn = self._connection()
+        if key is None:
+            conn.execute("DELETE FROM cache_entries WHERE namespace=?", (namespace,))
+        else:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace=? AND key=?",
+                (namespace, key),
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries, size = (
+            self._connection()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries")
+            .fetchone()
+        )
+        return {
+            **super().get_stats(),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "path": self.path,
+        }
+
+
+def create_cache_backend(
+    cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES
+) -> CacheBackend:
+    """SQLite Backend wenn ein Cache Verzeichnis angegeben ist, sonst In-Memory"""
+    if cache_dir:
+        return SQLiteCacheBackend(
+            os.path.join(cache_dir, "cache.sqlite3"), max_bytes=max_bytes
+        )
+    return MemoryCacheBackend(max_bytes=max_bytes)
+
+
+class InterviewMetadataCache:
+    """
+    Cache für Interview Metadaten, gebunden an einen Package-Version Fingerprint.
+
+    Args:
+        backend: Cache Backend
+        namespace: Namespace der Einträge (pro Server)
+        fingerprint_fn: Liefert den aktuellen Fingerprint (z.B. über list_installed_packages)
+        fingerprint_ttl: Sekunden, bis der Fingerprint erneut ermittelt wird
+        max_age: Maximale Lebensdauer eines Eintrags in Sekunden
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        fingerprint_fn: Callable[[], str],
+        fingerprint_ttl: float = 300.0,
+        max_age: float = 3600.0,
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self._fingerprint_fn = fingerprint_fn
+        self.fingerprint_ttl = fingerprint_ttl
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._fingerprint: Optional[str] = None
+        self._fingerprint_at = 0.0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def fingerprint(self) -> str:
+        """Aktueller Package Fingerprint (mit fingerprint_ttl zwischengespeichert)"""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._fingerprint is None
+                or now - self._fingerprint_at > self.fingerprint_ttl
+            ):
+                try:
+                    self._fingerprint = self._fingerprint_fn()
+                except Exception as e:
+                    logger.debug(f"Package Fingerprint nicht ermittelbar: {e}")
+                    self._fingerprint = "unknown"
+                self._fingerprint_at = now
+            return self._fingerprint
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Liefert den gecachten Wert oder lädt und speichert ihn"""
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            return loader()
+
+        value = self.backend.get_or_load(
+            self.namespace, f"{self.fingerprint()}|{key}", load, ttl=self.max_age
+        )
+        with self._lock:
+            self.stats["misses" if loaded else "hits"] += 1
+        return value
+
+    def invalidate(self):
+        """Verwirft alle Einträge und erzwingt einen neuen Fingerprint"""
+        self.backend.delete(self.namespace)
+        with self._lock:
+            self._fingerprint = None
+            self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "fingerprint": self._fingerprint}
+
+
+class TemplateFieldCache:
+    """
+    Inhaltsadressierter Cache für extract_template_fields.
+
+    Einträge laufen nicht ab (gleicher Inhalt liefert gleiche Felder) und
+    werden nur über das Größenlimit des Backends verdrängt.
+    """
+
+    namespace = "template_fields"
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(content: bytes, format: str) -> str:
+        return f"{hashlib.sha256(content).hexdigest()}-{format}"
+
+    def get(self, key: str) -> Any:
+        """Liefert den gecachten Wert oder MISSING"""
+        value = self.backend.get(self.namespace, key)
+        with self._lock:
+            self.stats["misses" if value is MISSING else "hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        self.backend.set(self.namespace, key, value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats)
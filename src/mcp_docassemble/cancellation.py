@@ -0,0 +1,139 @@
+"""
+Abbruch laufender Tool Aufrufe
+
+Bricht der MCP Host einen Request ab (notifications/cancelled), wird die
+asyncio Task des Tool Aufrufs abgebrochen. Die Client Methode läuft aber in
+einem Worker Thread mit blockierenden requests Aufrufen weiter. CancelScope
+trägt den Abbruch in diesen Thread:
+
+- Verbindungen, auf denen gerade ein Request des Aufrufs läuft, werden per
+  socket.shutdown() geschlossen; der blockierende Aufruf kehrt sofort zurück
+- Wartezeiten (Rate Limit, Single-Flight, Restart Polling) enden vorzeitig
+- Es folgt kein Retry und kein Failover auf einen anderen Knoten
+
+Der aktuelle Scope steht in einer ContextVar; ToolExecutor setzt ihn für
+jeden Aufruf. Außerhalb eines Tool Aufrufs sind alle Funktionen no-ops.
+
+ToolCancelledError erbt (wie asyncio.CancelledError) von BaseException,
+damit die vielen `except Exception` Fallbacks einen Abbruch nicht
+verschlucken.
+"""
+
+import contextvars
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCancelledError(BaseException):
+    """Der Tool Aufruf wurde vom MCP Host abgebrochen"""
+
+
+class CancelScope:
+    """Abbruch Signal eines Tool Aufrufs, über Threads hinweg"""
+
+    __slots__ = ("_event", "_lock", "_connections")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._connections: Set[Any] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Setzt das Signal und schließt Verbindungen mit laufenden Requests"""
+        with self._lock:
+            self._event.set()
+            connections = list(self._connections)
+            self._connections.clear()
+        for connection in connections:
+            sock = getattr(connection, "sock", None)
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError as e:
+                logger.debug(f"Verbindung beim Abbruch bereits geschlossen: {e}")
+
+    def check(self):
+        """
+        Raises:
+            ToolCancelledError: Wenn der Aufruf abgebrochen wurde
+        """
+        if self._event.is_set():
+            raise ToolCancelledError()
+
+    def sleep(self, seconds: float):
+        """Wartet seconds Sekunden oder bis zum Abbruch (dann ToolCancelledError)"""
+        if self._event.wait(seconds):
+            raise ToolCancelledError()
+
+    def attach(self, connection: Any):
+        """Registriert eine Verbindung, auf der ein Request dieses Aufrufs läuft"""
+        with self._lock:
+            if not self._event.is_set():
+                self._connections.add(connection)
+                return
+        # Bereits abgebrochen: der Request soll gar nicht erst laufen
+        raise ToolCancelledError()
+
+    def detach(self, connection: Any):
+        with self._lock:
+            self._connections.discard(connection)
+
+
+_current: contextvars.ContextVar[Optional[CancelScope]] = contextvars.ContextVar(
+    "cancel_scope", default=None
+)
+
+
+def current_scope() -> Optional[CancelScope]:
+    return _current.get()
+
+
+@contextmanager
+def cancel_scope(scope: CancelScope) -> Iterator[CancelScope]:
+    """Macht scope für den Block (und seine Client Aufrufe) zum aktuellen Scope"""
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+
+
+def cancelled() -> bool:
+    scope = _current.get()
+    return scope is not None and scope.cancelled
+
+
+def raise_if_cancelled():
+    scope = _current.get()
+    if scope is not None:
+        scope.check()
+
+
+def sleep(seconds: float):
+    """time.sleep, das bei einem Abbruch des Tool Aufrufs vorzeitig endet"""
+    scope = _current.get()
+    if scope is None:
+        time.sleep(seconds)
+    else:
+        scope.sleep(seconds)
+
+
+def acquire(lock: Any, poll_interval: float = 0.05):
+    """Wartet auf lock; bricht mit ToolCancelledError ab, wenn der Aufruf endet"""
+    scope = _current.get()
+    if scope is None:
+        lock.acquire()
+        return
+    while not lock.acquire(timeout=poll_interval):
+        scope.check()
@@ -8,22 +8,27 @@ Verwendung:
     mcp-docassemble --help
     mcp-docassemble serve
     mcp-docassemble test-connection
+    mcp-docassemble fake-server
 """
 
 import argparse
-import asyncio
+import json
 import logging
 import os
 import sys
 from typing import Optional
 
-from .client import DocassembleAPIError, DocassembleClient
-from .main import main as run_server
-from .main import setup_logging, validate_environment
+# Nur leichtgewichtige Module auf oberster Ebene: client (requests) und server
+# (mcp SDK) importieren die Befehle selbst, damit --help, fake-server oder
+# loadtest nicht für den ganzen MCP Server bezahlen
+from .loadtest import DEFAULT_INTERVIEW, DEFAULT_MIX
+from .main import setup_logging
 
 
 def test_connection(base_url: str, api_key: str) -> bool:
     """Testet die Verbindung zur Docassemble API"""
+    from .client import DocassembleAPIError, DocassembleClient
+
     try:
         client = DocassembleClient(base_url, api_key)
         result = client.get_current_user()
@@ -45,8 +50,25 @@ def test_connection(base_url: str, api_key: str) -> bool:
         return False
 
 
+SERVE_OPTIONS = {
+    "transport": "DOCASSEMBLE_MCP_TRANSPORT",
+    "host": "DOCASSEMBLE_MCP_HOST",
+    "port": "DOCASSEMBLE_MCP_PORT",
+    "path": "DOCASSEMBLE_MCP_PATH",
+    "workers": "DOCASSEMBLE_MCP_WORKERS",
+    "max_queue": "DOCASSEMBLE_MCP_MAX_QUEUE",
+}
+
+
 async def serve_command(args):
     """Startet den MCP Server"""
+    from .main import main as run_server
+
+    # Kommandozeilen Optionen haben Vorrang vor den Umgebungsvariablen
+    for option, variable in SERVE_OPTIONS.items():
+        value = getattr(args, option, None)
+        if value is not None:
+            os.environ[variable] = str(value)
     await run_server()
 
 
@@ -80,6 +102,157 @@ def test_command(args):
         sys.exit(1)
 
 
+def fake_server_command(args):
+    """Startet den lokalen Docassemble Stand-in Server"""
+    from .fakeserver import FakeDocassembleServer
+
+    fake = FakeDocassembleServer(
+        host=args.host,
+        port=args.port,
+        api_key=args.api_key,
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        page_size=args.page_size,
+        total_items=args.items,
+        payload_bytes=args.payload_bytes,
+        restart_seconds=args.restart_seconds,
+        seed=args.seed,
+    )
+    print(f"🧪 Fake Docassemble Server auf http://{args.host}:{args.port or '<frei>'}")
+    try:
+        fake.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {fake.get_stats()['requests']} Requests beantwortet")
+
+
+def loadtest_command(args):
+    """Führt einen Lasttest gegen Docassemble oder den Stand-in Server aus"""
+    from .client import DocassembleClient
+    from .fakeserver import FakeDocassembleServer
+    from .loadtest import LoadTest, build_operations, format_report, parse_mix
+
+    try:
+        mix = parse_mix(args.mix, list(build_operations(args.interview, 1)))
+    except ValueError as e:
+        print(f"❌ Fehler: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    fake = None
+    if args.fake:
+        fake = FakeDocassembleServer(
+            latency=args.fake_latency,
+            error_rate=args.fake_error_rate,
+            seed=args.seed or 0,
+        ).start()
+        base_url, api_key = fake.base_url, "loadtest"
+    else:
+        base_url = args.base_url or os.getenv("DOCASSEMBLE_BASE_URL")
+        api_key = args.api_key or os.getenv("DOCASSEMBLE_API_KEY")
+        if not base_url or not api_key:
+            print(
+                "❌ Fehler: DOCASSEMBLE_BASE_URL und DOCASSEMBLE_API_KEY werden benötigt "
+                "(--base-url/--api-key, Umgebungsvariablen oder --fake)",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    client = None
+    try:
+        client = DocassembleClient(
+            base_url, api_key, timeout=args.timeout, pool_maxsize=args.concurrency
+        )
+        test = LoadTest(
+            client,
+            mix,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            duration=args.duration,
+            requests=args.requests,
+            interview=args.interview,
+            file_number=args.file_number,
+            seed=args.seed,
+        )
+        limit = (
+            f"{args.requests} Operationen" if args.requests else f"{args.duration:g}s"
+        )
+        print(f"🚀 Lasttest gegen {base_url} ({limit}) ...", flush=True)
+        report = test.run()
+    finally:
+        if client is not None:
+            # Sessions, deren Löschung im Lauf fehlgeschlagen ist
+            client.reap_sessions(force=True)
+            client.close()
+        if fake is not None:
+            fake.stop()
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"\n💾 Bericht gespeichert: {args.json}")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        sys.exit(1)
+
+
+def interview_matrix_command(args):
+    """Führt ein Interview mit vielen Antwort-Kombinationen parallel aus"""
+    from .client import DocassembleClient
+
+    base_url = args.base_url or os.getenv("DOCASSEMBLE_BASE_URL")
+    api_key = args.api_key or os.getenv("DOCASSEMBLE_API_KEY")
+    if not base_url or not api_key:
+        print(
+            "❌ Fehler: DOCASSEMBLE_BASE_URL und DOCASSEMBLE_API_KEY werden benötigt "
+            "(--base-url/--api-key oder Umgebungsvariablen)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    with open(args.cases, encoding="utf-8") as handle:
+        cases = json.load(handle)
+
+    client = DocassembleClient(base_url, api_key, pool_maxsize=args.workers)
+    print(f"🧪 Starte Test-Matrix für {args.interview} ...", flush=True)
+    try:
+        report = client.run_interview_matrix(
+            args.interview,
+            cases,
+            max_workers=args.workers,
+            variables=args.variables.split(",") if args.variables else None,
+            cleanup=not args.keep_sessions,
+            max_steps=args.max_steps,
+        )
+    except ValueError as e:
+        print(f"❌ Fehler: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if not args.keep_sessions:
+            # Sessions, deren Löschung im Lauf fehlgeschlagen ist
+            client.reap_sessions(force=True)
+        client.close()
+
+    latency = report["case_latency_ms"]
+    print(
+        f"📊 {report['cases']} Fälle in {report['duration_seconds']}s "
+        f"({report['cases_per_second']} Fälle/s, p50 {latency['p50']} ms, "
+        f"p95 {latency['p95']} ms)"
+    )
+    for status, count in sorted(report["by_status"].items()):
+        print(f"   {status}: {count}")
+    for result in report["results"]:
+        if result["status"] not in ("completed", "needs_input"):
+            print(
+                f"   ⚠️  {result['name']}: {result['status']} {result.get('error', '')}"
+            )
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False, default=str)
+    print(f"💾 Ergebnisse gespeichert: {args.output}")
+    if report["by_status"].get("error"):
+        sys.exit(1)
+
+
 def main():
     """CLI Hauptfunktion"""
     parser = argparse.ArgumentParser(
@@ -88,7 +261,11 @@ def main():
         epilog="""
 Beispiele:
   mcp-docassemble serve
+  mcp-docassemble serve --transport streamable-http --port 8000 --workers 32
   mcp-docassemble test-connection --base-url https://demo.docassemble.org --api-key your_key
+  mcp-docassemble fake-server --port 8765 --latency 0.01 --error-rate 0.01
+  mcp-docassemble loadtest --fake --concurrency 20 --duration 10
+  mcp-docassemble interview-matrix --interview docassemble.demo:data/questions/questions.yml --cases cases.json
   
 Umgebungsvariablen:
   DOCASSEMBLE_BASE_URL    Base URL der Docassemble Installation
@@ -104,6 +281,26 @@ Umgebungsvariablen:
 
     # Serve command
     serve_parser = subparsers.add_parser("serve", help="Startet den MCP Server")
+    serve_parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        help="MCP Transport (Default: stdio bzw. DOCASSEMBLE_MCP_TRANSPORT)",
+    )
+    serve_parser.add_argument(
+        "--host", help="Adresse für HTTP Transporte (Default: 127.0.0.1)"
+    )
+    serve_parser.add_argument(
+        "--port", type=int, help="Port für HTTP Transporte (Default: 8000)"
+    )
+    serve_parser.add_argument("--path", help="Pfad des MCP Endpunkts (Default: /mcp)")
+    serve_parser.add_argument(
+        "--workers", type=int, help="Gleichzeitig laufende Tool Aufrufe (Default: 16)"
+    )
+    serve_parser.add_argument(
+        "--max-queue",
+        type=int,
+        help="Wartende Tool Aufrufe, bevor neue abgelehnt werden (Default: 64)",
+    )
     serve_parser.set_defaults(func=serve_command)
 
     # Test command
@@ -118,6 +315,135 @@ Umgebungsvariablen:
     )
     test_parser.set_defaults(func=test_command)
 
+    # Fake server command
+    fake_parser = subparsers.add_parser(
+        "fake-server",
+        help="Startet einen lokalen Docassemble Stand-in Server für Benchmarks",
+    )
+    fake_parser.add_argument("--host", default="127.0.0.1", help="Bind Adresse")
+    fake_parser.add_argument("--port", type=int, default=8765, help="Port")
+    fake_parser.add_argument(
+        "--api-key", help="Erwarteter API Key (default: jeder Key wird akzeptiert)"
+    )
+    fake_parser.add_argument(
+        "--latency", type=float, default=0.0, help="Feste Latenz pro Request (s)"
+    )
+    fake_parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Zusätzliche zufällige Latenz (s)"
+    )
+    fake_parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Anteil fehlerhafter Antworten"
+    )
+    fake_parser.add_argument(
+        "--page-size", type=int, default=100, help="Einträge pro Seite"
+    )
+    fake_parser.add_argument(
+        "--items", type=int, default=250, help="Anzahl Benutzer und Sessions"
+    )
+    fake_parser.add_argument(
+        "--payload-bytes", type=int, default=0, help="Füllbytes pro Listeneintrag"
+    )
+    fake_parser.add_argument(
+        "--restart-seconds", type=float, default=0.0, help="Dauer simulierter Restarts"
+    )
+    fake_parser.add_argument("--seed", type=int, default=0, help="Zufalls-Seed")
+    fake_parser.set_defaults(func=fake_server_command)
+
+    # Load test command
+    load_parser = subparsers.add_parser(
+        "loadtest",
+        help="Lasttest mit einer Mischung aus Client Operationen",
+    )
+    load_parser.add_argument(
+        "--base-url", help="Docassemble Base URL (überschreibt Umgebungsvariable)"
+    )
+    load_parser.add_argument(
+        "--api-key", help="API Key (überschreibt Umgebungsvariable)"
+    )
+    load_parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Gegen einen lokalen Stand-in Server im selben Prozess testen",
+    )
+    load_parser.add_argument(
+        "--fake-latency", type=float, default=0.005, help="Latenz des Stand-in (s)"
+    )
+    load_parser.add_argument(
+        "--fake-error-rate", type=float, default=0.0, help="Fehleranteil des Stand-in"
+    )
+    load_parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help="Gewichtete Operationen, z.B. interview_flow=5,list_users=1",
+    )
+    load_parser.add_argument(
+        "--concurrency", type=int, default=10, help="Gleichzeitige Operationen"
+    )
+    load_parser.add_argument(
+        "--rps",
+        type=float,
+        help="Feste Startrate pro Sekunde (default: so schnell wie möglich)",
+    )
+    load_parser.add_argument(
+        "--duration", type=float, default=30.0, help="Laufzeit in Sekunden"
+    )
+    load_parser.add_argument(
+        "--requests", type=int, help="Anzahl Operationen (statt --duration)"
+    )
+    load_parser.add_argument(
+        "--interview",
+        default=DEFAULT_INTERVIEW,
+        help="Interview für interview_flow",
+    )
+    load_parser.add_argument(
+        "--file-number", type=int, default=1, help="Datei für retrieve_file"
+    )
+    load_parser.add_argument(
+        "--timeout", type=int, default=30, help="Request Timeout in Sekunden"
+    )
+    load_parser.add_argument("--seed", type=int, help="Seed für die Operationsauswahl")
+    load_parser.add_argument("--json", help="Bericht zusätzlich als JSON speichern")
+    load_parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        help="Exit Code 1, wenn der Fehleranteil darüber liegt",
+    )
+    load_parser.set_defaults(func=loadtest_command)
+
+    # Interview matrix command
+    matrix_parser = subparsers.add_parser(
+        "interview-matrix",
+        help="Führt ein Interview mit vielen Antwort-Kombinationen parallel aus",
+    )
+    matrix_parser.add_argument(
+        "--base-url", help="Docassemble Base URL (überschreibt Umgebungsvariable)"
+    )
+    matrix_parser.add_argument(
+        "--api-key", help="API Key (überschreibt Umgebungsvariable)"
+    )
+    matrix_parser.add_argument("--interview", required=True, help="Interview Dateiname")
+    matrix_parser.add_argument(
+        "--cases",
+        required=True,
+        help='JSON Datei mit einer Liste von Fällen oder {"base": ..., "matrix": ...}',
+    )
+    matrix_parser.add_argument(
+        "--workers", type=int, default=8, help="Gleichzeitige Sessions"
+    )
+    matrix_parser.add_argument(
+        "--variables", help="Kommagetrennte Variablen, die gesammelt werden"
+    )
+    matrix_parser.add_argument(
+        "--keep-sessions", action="store_true", help="Sessions nicht löschen"
+    )
+    matrix_parser.add_argument(
+        "--max-steps", type=int, default=50, help="Maximale Fragen pro Fall"
+    )
+    matrix_parser.add_argument(
+        "--output", default="interview_matrix_results.json", help="Ergebnis Datei"
+    )
+    matrix_parser.set_defaults(func=interview_matrix_command)
+
     args = parser.parse_args()
 
     # Setup logging based on verbosity
@@ -125,6 +451,11 @@ Umgebungsvariablen:
         logging.basicConfig(level=logging.DEBUG)
     else:
         setup_logging()
+    if args.command != "fake-server":
+        # .env ergänzt die Umgebungsvariablen; der Stand-in braucht keine
+        from .envfile import load_env_file
+
+        load_env_file()
 
     # Default to serve if no command given
     if not args.command:
@@ -133,7 +464,9 @@ Umgebungsvariablen:
 
     # Execute command
     if args.command == "serve":
-        validate_environment()
+        import asyncio
+
+        # serve_command übernimmt die Optionen und prüft die Konfiguration
         asyncio.run(args.func(args))
     else:
         args.func(args)
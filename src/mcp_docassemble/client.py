@@ -7,13 +7,43 @@ Enhanced with version detection, graceful fallbacks, and improved error handling
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
-from urllib.parse import urljoin
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
-from pydantic import BaseModel, Field
 
+from . import cancellation, progress
+from .balancer import (
+    FAILOVER_STATUS,
+    IDEMPOTENT_METHODS,
+    NodePool,
+    request_not_sent,
+    split_base_urls,
+)
+from .cache import (
+    DEFAULT_MAX_BYTES,
+    MISSING,
+    CacheBackend,
+    InterviewMetadataCache,
+    TemplateFieldCache,
+    create_cache_backend,
+    packages_fingerprint,
+    server_namespace,
+)
+from .cancellation import ToolCancelledError
+from .endpoints import EndpointTable, freeze_environment
 from .enhancements import DocassembleClientEnhanced
+from .metrics import InstrumentedHTTPAdapter, MetricsRegistry
+from .playground_sync import PlaygroundSync
+from .ratelimit import TokenBucket
+from .restarts import RestartCoalescer
+from .sessions import SessionRegistry
+from .slowcalls import record_upstream
+from .tracing import Tracer, submit_in_context
 
 logger = logging.getLogger(__name__)
 
@@ -45,54 +75,145 @@ class DocassembleClient(DocassembleClientEnhanced):
 
     def __init__(
         self,
-        base_url: str,
+        base_url: Union[str, List[str]],
         api_key: str,
         timeout: int = 30,
         session_timeout: int = 3600,
         enable_fallbacks: bool = True,
+        restart_debounce: float = 0,
+        cache_dir: Optional[str] = None,
+        cache_backend: Optional[CacheBackend] = None,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        config_cache_ttl: float = 300,
+        packages_cache_ttl: float = 60,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
+        pool_maxsize: int = 10,
+        session_reap_interval: float = 60,
+        health_check_interval: float = 10,
+        session_affinity: bool = True,
+        rate_limit: float = 0,
+        rate_burst: Optional[int] = None,
+        cache_namespace: Optional[str] = None,
     ):
         """
         Initialisiere Docassemble Client
 
         Args:
-            base_url: Base URL des Docassemble Servers (z.B. https://docassemble.example.com)
+            base_url: Base URL des Docassemble Servers (z.B. https://docassemble.example.com);
+                eine Liste (oder kommagetrennt) verteilt Requests auf mehrere Knoten
             api_key: API Schlüssel für Authentifizierung
-            timeout: Request timeout in seconds (default: 30)
-            session_timeout: Interview session timeout in seconds (default: 3600)
+            timeout: Request timeout in seconds (default: 30), gilt für Verbindungsaufbau
+                und jede Lesepause jedes Requests
+            session_timeout: Interview session timeout in seconds (default: 3600); eigene
+                Sessions, die so lange unbenutzt sind, werden gelöscht (0 = nie)
             enable_fallbacks: Enable graceful fallbacks for unsupported APIs (default: True)
-        """
-        self.base_url = base_url.rstrip("/")
+            restart_debounce: Zeitfenster in Sekunden, in dem Restarts gesammelt werden (0 = aus)
+            cache_dir: Verzeichnis für den persistenten SQLite Cache (optional, sonst In-Memory)
+            cache_backend: Eigenes Cache Backend (überschreibt cache_dir)
+            cache_max_bytes: Obergrenze der Cache Größe in Bytes
+            config_cache_ttl: Cache Dauer der Server Konfiguration in Sekunden
+            packages_cache_ttl: Cache Dauer der Package Liste in Sekunden
+            metrics: Gemeinsame MetricsRegistry (optional, sonst eigene Instanz)
+            tracer: Tracer für HTTP Spans (optional, sonst deaktiviert)
+            pool_maxsize: Maximale Anzahl offener Verbindungen pro Host
+            session_reap_interval: Abstand der Läufe zum Löschen abgelaufener Sessions (0 = aus)
+            health_check_interval: Abstand der Health Checks bei mehreren Knoten (0 = nur passiv)
+            session_affinity: Session Requests bei mehreren Knoten an den erzeugenden Knoten senden
+            rate_limit: Maximale Requests pro Sekunde (0 = unbegrenzt); darüber wird gewartet
+            rate_burst: Requests, die ohne Wartezeit gebündelt gesendet werden dürfen
+            cache_namespace: Eigener Cache Namespace (Default: aus der Base URL abgeleitet),
+                z.B. pro Mandant bei gemeinsamem Cache Backend
+        """
+        self.base_urls = split_base_urls(base_url)
+        self.base_url = self.base_urls[0]
         self.api_key = api_key
         self.timeout = timeout
         self.session_timeout = session_timeout
         self.enable_fallbacks = enable_fallbacks
         self.session = requests.Session()
-        self.session.headers.update(
-            {"X-API-Key": api_key, "Content-Type": "application/json"}
+        # Kein Content-Type in der Session: requests setzt ihn passend zum
+        # Body (json= bzw. multipart mit Boundary), ohne Header pro Request
+        self.session.headers["X-API-Key"] = api_key
+        freeze_environment(self.session, self.base_urls)
+        self.endpoints = EndpointTable(self.base_url)
+        self.metrics = metrics or MetricsRegistry()
+        self.tracer = tracer or Tracer()
+        self.pool_maxsize = pool_maxsize
+        adapter = InstrumentedHTTPAdapter(self.metrics, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.restart_coalescer = RestartCoalescer(
+            self, debounce_seconds=restart_debounce
         )
-
-        # Detect Docassemble version and capabilities
-        self.da_version = self._detect_docassemble_version()
-        self._init_feature_compatibility()
+        self.cache = cache_backend or create_cache_backend(cache_dir, cache_max_bytes)
+        self.config_cache_ttl = config_cache_ttl
+        self.packages_cache_ttl = packages_cache_ttl
+        namespace_key = cache_namespace or self.base_url
+        self._server_cache_namespace = server_namespace(namespace_key, "server")
+        self.interview_cache = InterviewMetadataCache(
+            self.cache,
+            server_namespace(namespace_key, "interview"),
+            lambda: packages_fingerprint(self.list_installed_packages()),
+        )
+        self.template_cache = TemplateFieldCache(self.cache)
+        self.metrics.add_collector(self._cache_metrics)
+        self.sessions = SessionRegistry(
+            self, ttl=session_timeout, reap_interval=session_reap_interval
+        )
+        self.metrics.add_collector(self._session_metrics)
+        self.nodes: Optional[NodePool] = None
+        if len(self.base_urls) > 1:
+            self.nodes = NodePool(
+                self.base_urls,
+                health_interval=health_check_interval,
+                session_affinity=session_affinity,
+            )
+            self.metrics.add_collector(self._node_metrics)
+        self.rate_limiter: Optional[TokenBucket] = None
+        if rate_limit:
+            self.rate_limiter = TokenBucket(rate_limit, rate_burst)
+            self.metrics.add_collector(self._rate_limit_metrics)
+
+        # Version und Feature Matrix werden beim ersten Zugriff ermittelt (Warm-up
+        # oder Feature Check); das Erzeugen des Clients sendet keinen Request
+        self._version_lock = threading.Lock()
+        self._da_version: Optional[str] = None
+        self._feature_support: Optional[Dict[str, bool]] = None
+
+    @property
+    def da_version(self) -> Optional[str]:
+        """Docassemble Version (None, wenn /api/config nicht lesbar ist)"""
+        self._ensure_feature_support()
+        return self._da_version
+
+    @property
+    def feature_support(self) -> Dict[str, bool]:
+        self._ensure_feature_support()
+        return self._feature_support
+
+    def _ensure_feature_support(self):
+        if self._feature_support is not None:
+            return
+        with self._version_lock:
+            if self._feature_support is None:
+                self._da_version = self._detect_docassemble_version()
+                self._init_feature_compatibility()
 
     def _detect_docassemble_version(self) -> Optional[str]:
         """Detect Docassemble version and capabilities."""
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/config", timeout=self.timeout
-            )
-            if response.status_code == 200:
-                config = response.json()
-                version = config.get("version", "unknown")
-                logger.info(f"Detected Docassemble version: {version}")
-                return version
+            # Über den Config Cache: ein Prefetch der Konfiguration reicht
+            version = self.get_server_config().get("version", "unknown")
+            logger.info(f"Detected Docassemble version: {version}")
+            return version
         except Exception as e:
             logger.warning(f"Could not detect Docassemble version: {e}")
         return None
 
     def _init_feature_compatibility(self):
         """Initialize feature compatibility matrix based on version."""
-        self.feature_support = {
+        feature_support = {
             "convert_file_to_markdown": False,  # Not available in current versions
             "get_redirect_url": False,  # Now using correct /api/temp_url endpoint
             "get_login_url": False,  # Limited availability
@@ -101,14 +222,15 @@ class DocassembleClient(DocassembleClientEnhanced):
         }
 
         # Adjust based on detected version
-        if self.da_version and "dev" in self.da_version.lower():
+        if self._da_version and "dev" in self._da_version.lower():
             # Development versions might have more features
-            self.feature_support.update(
+            feature_support.update(
                 {
                     "convert_file_to_markdown": True,
                     "get_redirect_url": True,
                 }
             )
+        self._feature_support = feature_support
 
     def _is_feature_supported(self, feature: str) -> bool:
         """Check if a feature is supported in current version."""
@@ -128,6 +250,12 @@ class DocassembleClient(DocassembleClientEnhanced):
             "message": "Feature not available in this version",
         }
 
+    def _defer_restart(self, operation: str, restart: bool) -> bool:
+        """Liefert das effektive restart Flag unter Berücksichtigung des Coalescers"""
+        if restart and self.restart_coalescer.defer(operation):
+            return False
+        return restart
+
     def _request(
         self,
         method: str,
@@ -151,10 +279,10 @@ class DocassembleClient(DocassembleClientEnhanced):
 
         Raises:
             DocassembleAPIError: Bei API Fehlern
+            ToolCancelledError: Wenn der Tool Aufruf abgebrochen wurde
         """
-        url = urljoin(self.base_url + "/", endpoint.lstrip("/"))
-
-        kwargs = {}
+        cancellation.raise_if_cancelled()
+        kwargs: Dict[str, Any] = {"timeout": self.timeout}
         if params:
             kwargs["params"] = params
         if data and not files:
@@ -162,43 +290,251 @@ class DocassembleClient(DocassembleClientEnhanced):
         elif data and files:
             kwargs["data"] = data
             kwargs["files"] = files
-            # Entferne Content-Type Header für multipart/form-data
-            headers = self.session.headers.copy()
-            headers.pop("Content-Type", None)
-            kwargs["headers"] = headers
         elif files:
             kwargs["files"] = files
-            headers = self.session.headers.copy()
-            headers.pop("Content-Type", None)
-            kwargs["headers"] = headers
 
-        try:
-            response = self.session.request(method, url, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        path, label, url = self.endpoints.resolve(endpoint)
+        with self.tracer.span(
+            f"{method} {label}",
+            {
+                "http.method": method,
+                "http.route": label,
+                "http.retry_count": 0,
+            },
+            kind="client",
+        ) as span:
+            started = time.perf_counter()
+            response = None
+            decode_seconds = 0.0
+            try:
+                affinity_key = None
+                if endpoint.startswith("/api/session"):
+                    affinity_key = (params or data or {}).get("session")
+                response, node = self._send(
+                    method, path, url, kwargs, affinity_key, label, span
+                )
+                if node is not None:
+                    span.set_attribute("server.address", node.url)
+
+                # Erfolgreiche leere Responses
+                if response.status_code in [204]:
+                    return None
+
+                # Erfolgreiche Responses mit Content
+                if 200 <= response.status_code < 300:
+                    if response.headers.get("content-type", "").startswith(
+                        "application/json"
+                    ):
+                        decode_started = time.perf_counter()
+                        try:
+                            result = response.json()
+                        finally:
+                            decode_seconds = time.perf_counter() - decode_started
+                        if node is not None and endpoint == "/api/session/new":
+                            if isinstance(result, dict) and result.get("session"):
+                                self.nodes.bind(result["session"], node)
+                        return result
+                    else:
+                        return response.text
+
+                # Fehler Responses
+                error_msg = f"API Request failed with status {response.status_code}"
+                if response.text:
+                    error_msg += f": {response.text}"
+
+                raise DocassembleAPIError(
+                    error_msg,
+                    status_code=response.status_code,
+                    response_data=response.text,
+                )
+
+            except requests.RequestException as e:
+                if cancellation.cancelled():
+                    # Die Verbindung wurde durch den Abbruch geschlossen
+                    self.metrics.inc(
+                        "docassemble_client_requests_cancelled_total",
+                        {"endpoint": label},
+                    )
+                    raise ToolCancelledError() from e
+                raise DocassembleAPIError(f"Request failed: {str(e)}")
+
+            finally:
+                self._record_request(
+                    method,
+                    label,
+                    response,
+                    time.perf_counter() - started,
+                    decode_seconds,
+                    span,
+                )
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        url: str,
+        kwargs: Dict[str, Any],
+        affinity_key: Optional[str] = None,
+        label: Optional[str] = None,
+        span: Any = None,
+    ) -> Tuple[requests.Response, Any]:
+        """
+        Sendet den Request an den Server bzw. an einen Knoten des NodePool
 
-            # Erfolgreiche leere Responses
-            if response.status_code in [204]:
-                return None
+        Bei mehreren Knoten werden Verbindungsfehler und 502/503/504 auf einem
+        anderen Knoten wiederholt, sofern der Request idempotent ist oder den
+        Server nachweislich nicht erreicht hat. Ein durch Abbruch beendeter
+        Request zählt nicht als Fehler des Knotens und wird nicht wiederholt.
 
-            # Erfolgreiche Responses mit Content
-            if 200 <= response.status_code < 300:
-                if response.headers.get("content-type", "").startswith(
-                    "application/json"
-                ):
-                    return response.json()
-                else:
-                    return response.text
+        Args:
+            path: Pfad des Endpunkts mit führendem Slash
+            url: Vollständige URL auf der ersten Base URL (ohne NodePool)
+            label: Metrik Label des Endpunkts (docassemble_client_retries_total)
+            span: Client Span des Requests; http.retry_count zählt die Failover
 
-            # Fehler Responses
-            error_msg = f"API Request failed with status {response.status_code}"
-            if response.text:
-                error_msg += f": {response.text}"
+        Returns:
+            Response und gewählter Knoten (None ohne NodePool)
+        """
+        if self.nodes is None:
+            return self.session.request(method, url, **kwargs), None
+
+        tried = set()
+        while True:
+            node = self.nodes.pick(affinity_key, exclude=tried)
+            if tried and span is not None:
+                span.set_attribute("http.retry_count", len(tried))
+            tried.add(node)
+            can_failover = len(tried) < len(self.nodes)
+            started = time.perf_counter()
+            failed = hard = False
+            try:
+                response = self.session.request(method, node.url + path, **kwargs)
+                failed = response.status_code in FAILOVER_STATUS
+            except requests.RequestException as e:
+                if cancellation.cancelled():
+                    raise
+                failed, hard = True, isinstance(e, requests.ConnectionError)
+                if can_failover and (
+                    method in IDEMPOTENT_METHODS or request_not_sent(e)
+                ):
+                    self._record_failover(node.url, label, type(e).__name__)
+                    continue
+                raise
+            finally:
+                # Auch bei Abbruch (ToolCancelledError ist eine BaseException)
+                # und sonstigen Exceptions, sonst bleibt outstanding erhöht
+                self.nodes.release(
+                    node, time.perf_counter() - started, failed=failed, hard=hard
+                )
+            if failed and can_failover and method in IDEMPOTENT_METHODS:
+                self._record_failover(node.url, label, f"HTTP {response.status_code}")
+                continue
+            return response, node
+
+    def _record_failover(self, node_url: str, label: Optional[str], reason: str):
+        """Zählt einen Failover, d.h. eine Wiederholung auf einem anderen Knoten"""
+        self.nodes.failovers += 1
+        self.metrics.inc("docassemble_client_failovers_total", {"node": node_url})
+        self.metrics.inc(
+            "docassemble_client_retries_total", {"endpoint": label or "unknown"}
+        )
+        logger.warning(f"Failover von {node_url} ({reason}) auf einen anderen Knoten")
 
-            raise DocassembleAPIError(
-                error_msg, status_code=response.status_code, response_data=response.text
+    def _record_request(
+        self,
+        method: str,
+        endpoint: str,
+        response: Optional[requests.Response],
+        duration: float,
+        decode_seconds: float,
+        span: Any = None,
+    ):
+        """Erfasst Dauer, Phasen, Status und Bytes eines Requests"""
+        record_upstream(duration)
+        metrics = self.metrics
+        labels = {"method": method, "endpoint": endpoint}
+        metrics.observe("docassemble_client_request_seconds", duration, labels)
+        if response is None:
+            metrics.inc(
+                "docassemble_client_responses_total", {**labels, "status": "error"}
             )
+            return
+        metrics.inc(
+            "docassemble_client_responses_total",
+            {**labels, "status": response.status_code},
+        )
+        metrics.observe(
+            "docassemble_client_server_seconds",
+            response.elapsed.total_seconds(),
+            labels,
+        )
+        if decode_seconds:
+            metrics.observe("docassemble_client_decode_seconds", decode_seconds, labels)
+        body = response.request.body if response.request is not None else None
+        sent = len(body) if body else 0
+        received = len(response.content)
+        if sent:
+            metrics.inc("docassemble_client_bytes_sent_total", labels, sent)
+        metrics.inc("docassemble_client_bytes_received_total", labels, received)
+        if span is not None and span.recording:
+            span.set_attribute("http.status_code", response.status_code)
+            span.set_attribute("http.request_body_size", sent)
+            span.set_attribute("http.response_body_size", received)
+            if response.status_code >= 400:
+                span.set_error(f"HTTP {response.status_code}")
+
+    def _cache_metrics(self):
+        """Collector: Cache Treffer aus den Cache Statistiken"""
+        for name, stats in (
+            ("backend", self.cache.stats),
+            ("interview_metadata", self.interview_cache.stats),
+            ("template_fields", self.template_cache.stats),
+        ):
+            labels = {"cache": name}
+            yield "docassemble_client_cache_hits_total", labels, stats["hits"]
+            yield "docassemble_client_cache_misses_total", labels, stats["misses"]
+
+    def _session_metrics(self):
+        """Collector: Anzahl eigener Sessions und gelöschter Sessions"""
+        stats = self.sessions.stats
+        yield "docassemble_client_sessions_live", {}, len(self.sessions)
+        for outcome in ("reaped", "already_gone", "failed"):
+            labels = {"outcome": outcome}
+            yield "docassemble_client_sessions_reaped_total", labels, stats[outcome]
+
+    def _rate_limit_metrics(self):
+        """Collector: durch das Rate Limit verzögerte Requests und Wartezeit"""
+        stats = self.rate_limiter.stats
+        yield "docassemble_client_rate_limited_total", {}, stats["throttled"]
+        yield "docassemble_client_rate_limit_wait_seconds_total", {}, round(
+            stats["wait_seconds"], 6
+        )
+
+    def _node_metrics(self):
+        """Collector: Requests, Fehler und Zustand pro Docassemble Knoten"""
+        for node in self.nodes.nodes:
+            labels = {"node": node.url}
+            yield "docassemble_client_node_requests_total", labels, node.requests
+            yield "docassemble_client_node_errors_total", labels, node.errors
+            yield "docassemble_client_node_healthy", labels, int(node.healthy)
+            yield "docassemble_client_node_outstanding", labels, node.outstanding
+
+    def get_metrics(self, format: str = "json") -> Union[Dict[str, Any], str]:
+        """
+        Latenz-, Status- und Byte-Metriken des Clients und der MCP Tools
+
+        Args:
+            format: 'json' (Snapshot mit Histogramm-Zusammenfassung) oder 'prometheus'
 
-        except requests.RequestException as e:
-            raise DocassembleAPIError(f"Request failed: {str(e)}")
+        Returns:
+            Metriken als Dict oder Prometheus Text
+        """
+        if format == "prometheus":
+            return self.metrics.to_prometheus()
+        return self.metrics.snapshot()
 
     # ====================================================================
     # BENUTZER-MANAGEMENT (9 Endpunkte)
@@ -627,7 +963,10 @@ class DocassembleClient(DocassembleClientEnhanced):
         if tag:
             params["tag"] = tag
 
-        return self._request("DELETE", "/api/interviews", params=params)
+        result = self._request("DELETE", "/api/interviews", params=params)
+        if not query and not tag:
+            self.sessions.forget(session=session, i=i)
+        return result
 
     def list_user_interview_sessions(
         self,
@@ -776,7 +1115,10 @@ class DocassembleClient(DocassembleClientEnhanced):
         return self._request("DELETE", f"/api/user/{user_id}/interviews", params=params)
 
     def list_advertised_interviews(
-        self, tag: Optional[str] = None, absolute_urls: bool = True
+        self,
+        tag: Optional[str] = None,
+        absolute_urls: bool = True,
+        use_cache: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         Holt Liste der beworbenen Interviews
@@ -786,6 +1128,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         Args:
             tag: Tag Filter für Interviews
             absolute_urls: Ob absolute URLs zurückgegeben werden sollen
+            use_cache: Ob der Interview Metadaten Cache verwendet werden soll
 
         Returns:
             Liste der verfügbaren Interviews
@@ -796,7 +1139,12 @@ class DocassembleClient(DocassembleClientEnhanced):
         if not absolute_urls:
             params["absolute_urls"] = "0"
 
-        return self._request("GET", "/api/list", params=params)
+        if not use_cache:
+            return self._request("GET", "/api/list", params=params)
+        return self.interview_cache.get_or_load(
+            f"list|{tag or ''}|{int(absolute_urls)}",
+            lambda: self._request("GET", "/api/list", params=params),
+        )
 
     def get_user_secret(self, username: str, password: str) -> str:
         """
@@ -933,7 +1281,10 @@ class DocassembleClient(DocassembleClientEnhanced):
             params["secret"] = secret
         params.update(url_args)
 
-        return self._request("GET", "/api/session/new", params=params)
+        result = self._request("GET", "/api/session/new", params=params)
+        if isinstance(result, dict) and result.get("session"):
+            self.sessions.register(i, result["session"], result.get("secret") or secret)
+        return result
 
     def get_interview_variables(
         self, i: str, session: str, secret: Optional[str] = None
@@ -955,6 +1306,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         if secret:
             params["secret"] = secret
 
+        self.sessions.touch(session)
         return self._request("GET", "/api/session", params=params)
 
     def set_interview_variables(
@@ -1010,6 +1362,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         if file_variables:
             data["file_variables"] = file_variables
 
+        self.sessions.touch(session)
         return self._request("POST", "/api/session", data=data, files=files)
 
     def get_current_question(
@@ -1032,8 +1385,94 @@ class DocassembleClient(DocassembleClientEnhanced):
         if secret:
             params["secret"] = secret
 
+        self.sessions.touch(session)
         return self._request("GET", "/api/session/question", params=params)
 
+    def run_interview_script(
+        self,
+        i: str,
+        answers: Union[List[Dict[str, Any]], Dict[str, Any]],
+        session: Optional[str] = None,
+        secret: Optional[str] = None,
+        max_steps: int = 50,
+        url_args: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Beantwortet Fragen einer Interview Session mit vorbereiteten Antworten
+
+        Nutzt die Frage, die set_interview_variables zurückgibt, für den
+        nächsten Schritt; pro Frage fällt damit nur ein Request an.
+
+        Benötigte Berechtigungen: Keine
+
+        Args:
+            i: Interview Dateiname
+            answers: Liste mit einem Variablen-Dict pro Schritt oder Dict Variable → Wert
+            session: Bestehende Session ID (ohne wird eine neue Session gestartet)
+            secret: Entschlüsselungskey (falls verschlüsselt)
+            max_steps: Maximale Anzahl beantworteter Fragen
+            url_args: url_args für eine neue Session
+
+        Returns:
+            Dict mit Status, letzter Frage, Schritten mit Dauer und eingesparten Round Trips
+        """
+        # Lokaler Import: interview_script importiert DocassembleAPIError aus diesem Modul
+        from .interview_script import InterviewScript
+
+        return InterviewScript(
+            self,
+            i,
+            answers,
+            session=session,
+            secret=secret,
+            max_steps=max_steps,
+            url_args=url_args,
+        ).run()
+
+    def run_interview_matrix(
+        self,
+        i: str,
+        cases: Union[List[Any], Dict[str, Any]],
+        max_workers: int = 8,
+        variables: Optional[List[str]] = None,
+        cleanup: bool = True,
+        max_steps: int = 50,
+        url_args: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Führt ein Interview mit vielen Antwort-Kombinationen parallel aus
+
+        Jeder Fall läuft in einer eigenen Session (siehe run_interview_script);
+        danach werden finale Variablen und erzeugte Dateien gesammelt und die
+        Session gelöscht.
+
+        Benötigte Berechtigungen: Keine
+
+        Args:
+            i: Interview Dateiname
+            cases: Liste von Antworten bzw. {"name", "answers"} oder {"base", "matrix"}
+            max_workers: Maximale Anzahl gleichzeitiger Sessions
+            variables: Zu sammelnde Variablen (None = alle, [] = keine)
+            cleanup: Sessions nach jedem Fall löschen
+            max_steps: Maximale Anzahl Fragen pro Fall
+            url_args: url_args für jede neue Session
+
+        Returns:
+            Dict mit Ergebnissen pro Fall, Status-Übersicht und Durchsatz
+        """
+        from .interview_matrix import InterviewMatrix
+
+        return InterviewMatrix(
+            self,
+            i,
+            cases,
+            max_workers=max_workers,
+            variables=variables,
+            cleanup=cleanup,
+            max_steps=max_steps,
+            url_args=url_args,
+        ).run()
+
     def run_interview_action(
         self,
         i: str,
@@ -1075,6 +1514,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         if read_only:
             data["read_only"] = "1"
 
+        self.sessions.touch(session)
         return self._request("POST", "/api/session/action", data=data)
 
     def go_back_in_interview(
@@ -1100,6 +1540,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         if not question:
             data["question"] = "0"
 
+        self.sessions.touch(session)
         return self._request("POST", "/api/session/back", data=data)
 
     def delete_interview_session(self, i: str, session: str) -> None:
@@ -1113,7 +1554,11 @@ class DocassembleClient(DocassembleClientEnhanced):
             session: Session ID
         """
         params = {"i": i, "session": session}
-        return self._request("DELETE", "/api/session", params=params)
+        result = self._request("DELETE", "/api/session", params=params)
+        self.sessions.forget(session)
+        if self.nodes is not None:
+            self.nodes.unbind(session)
+        return result
 
     def retrieve_stored_file(self, file_number: int) -> bytes:
         """
@@ -1168,6 +1613,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         user_id: Optional[int] = None,
         folder: str = "static",
         project: str = "default",
+        restart: bool = True,
     ) -> Optional[Dict[str, str]]:
         """
         Löscht eine Datei aus dem Playground
@@ -1179,6 +1625,7 @@ class DocassembleClient(DocassembleClientEnhanced):
             user_id: Benutzer ID (optional)
             folder: Ordner Name
             project: Projekt Name
+            restart: Ob Server nach Löschen eines Moduls restartet werden soll
 
         Returns:
             Task ID für Restart wenn nötig, sonst None
@@ -1186,8 +1633,14 @@ class DocassembleClient(DocassembleClientEnhanced):
         params = {"filename": filename, "folder": folder, "project": project}
         if user_id:
             params["user_id"] = user_id
+        if folder == "modules":
+            restart = self._defer_restart("delete_playground_file", restart)
+        if not restart:
+            params["restart"] = "0"
 
-        return self._request("DELETE", "/api/playground", params=params)
+        result = self._request("DELETE", "/api/playground", params=params)
+        self.interview_cache.invalidate()
+        return result
 
     def upload_playground_files(
         self,
@@ -1195,6 +1648,7 @@ class DocassembleClient(DocassembleClientEnhanced):
         user_id: Optional[int] = None,
         folder: str = "static",
         project: str = "default",
+        restart: bool = True,
     ) -> Optional[Dict[str, str]]:
         """
         Lädt Dateien in den Playground hoch
@@ -1206,6 +1660,7 @@ class DocassembleClient(DocassembleClientEnhanced):
             user_id: Benutzer ID (optional)
             folder: Zielordner
             project: Zielprojekt
+            restart: Ob Server nach Upload eines Moduls restartet werden soll
 
         Returns:
             Task ID für Restart wenn nötig, sonst None
@@ -1213,8 +1668,14 @@ class DocassembleClient(DocassembleClientEnhanced):
         data = {"folder": folder, "project": project}
         if user_id:
             data["user_id"] = user_id
+        if folder == "modules":
+            restart = self._defer_restart("upload_playground_files", restart)
+        if not restart:
+            data["restart"] = "0"
 
-        return self._request("POST", "/api/playground", data=data, files=files)
+        result = self._request("POST", "/api/playground", data=data, files=files)
+        self.interview_cache.invalidate()
+        return result
 
     def install_playground_packages(
         self,
@@ -1240,12 +1701,15 @@ class DocassembleClient(DocassembleClientEnhanced):
         data = {"project": project}
         if user_id:
             data["user_id"] = user_id
+        restart = self._defer_restart("install_playground_packages", restart)
         if not restart:
             data["restart"] = "0"
 
-        return self._request(
+        result = self._request(
             "POST", "/api/playground_install", data=data, files=packages
         )
+        self._invalidate_package_caches()
+        return result
 
     def list_playground_projects(self, user_id: Optional[int] = None) -> List[str]:
         """
@@ -1335,33 +1799,87 @@ class DocassembleClient(DocassembleClientEnhanced):
             data["branch"] = branch
         if pip:
             data["pip"] = pip
+        restart = self._defer_restart("pull_package_to_playground", restart)
         if not restart:
             data["restart"] = "0"
 
-        return self._request("POST", "/api/playground/pull", data=data)
+        result = self._request("POST", "/api/playground/pull", data=data)
+        self._invalidate_package_caches()
+        return result
 
     def clear_interview_cache(self) -> None:
         """
-        Löscht den Interview Cache
+        Löscht den Interview Cache (serverseitig und den lokalen Metadaten Cache)
 
         Benötigte Berechtigungen: admin, developer oder playground_control
         """
-        return self._request("POST", "/api/clear_cache", data={})
+        result = self._request("POST", "/api/clear_cache", data={})
+        self.interview_cache.invalidate()
+        return result
+
+    def sync_playground_project(
+        self,
+        local_dir: str,
+        project: str = "default",
+        user_id: Optional[int] = None,
+        delete_orphans: bool = True,
+        dry_run: bool = False,
+        max_workers: int = 4,
+    ) -> Dict[str, Any]:
+        """
+        Synchronisiert einen lokalen Projektordner mit einem Playground Projekt
+
+        Lädt nur Dateien hoch, deren SHA-256 Hash sich seit dem letzten Sync
+        geändert hat (lokales Manifest), löscht verwaiste Dateien im Playground
+        und löst höchstens einen Server Restart am Ende aus.
+
+        Benötigte Berechtigungen: admin, developer oder playground_control
+
+        Args:
+            local_dir: Lokaler Ordner mit Unterordnern questions, templates, static, modules, sources
+            project: Zielprojekt
+            user_id: Benutzer ID (optional)
+            delete_orphans: Ob Dateien gelöscht werden, die lokal nicht mehr existieren
+                (nur in Ordnern, die lokal vorhanden sind)
+            dry_run: Nur geplante Änderungen ermitteln
+            max_workers: Anzahl paralleler Uploads
+
+        Returns:
+            Dict mit hochgeladenen, unveränderten, gelöschten und fehlgeschlagenen Dateien
+        """
+        return PlaygroundSync(
+            self,
+            local_dir,
+            project=project,
+            user_id=user_id,
+            delete_orphans=delete_orphans,
+            max_workers=max_workers,
+        ).run(dry_run=dry_run)
 
     # ====================================================================
     # SYSTEM ADMINISTRATION (8 Endpunkte)
     # ====================================================================
 
-    def get_server_config(self) -> Dict[str, Any]:
+    def get_server_config(self, use_cache: bool = True) -> Dict[str, Any]:
         """
         Holt die Server Konfiguration
 
         Benötigte Berechtigungen: admin
 
+        Args:
+            use_cache: Ob die gecachte Konfiguration verwendet werden darf (config_cache_ttl)
+
         Returns:
             Server Konfiguration als JSON
         """
-        return self._request("GET", "/api/config")
+        if not use_cache:
+            return self._request("GET", "/api/config")
+        return self.cache.get_or_load(
+            self._server_cache_namespace,
+            "config",
+            lambda: self._request("GET", "/api/config"),
+            ttl=self.config_cache_ttl,
+        )
 
     def write_server_config(self, config: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -1375,7 +1893,9 @@ class DocassembleClient(DocassembleClientEnhanced):
         Returns:
             Task ID für Restart
         """
-        return self._request("POST", "/api/config", data={"config": config})
+        result = self._request("POST", "/api/config", data={"config": config})
+        self.cache.delete(self._server_cache_namespace, "config")
+        return result
 
     def update_server_config(self, config_changes: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -1389,20 +1909,37 @@ class DocassembleClient(DocassembleClientEnhanced):
         Returns:
             Task ID für Restart
         """
-        return self._request(
+        result = self._request(
             "PATCH", "/api/config", data={"config_changes": config_changes}
         )
+        self.cache.delete(self._server_cache_namespace, "config")
+        return result
 
-    def list_installed_packages(self) -> List[Dict[str, Any]]:
+    def list_installed_packages(self, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         Listet installierte Python Packages
 
         Benötigte Berechtigungen: admin oder developer
 
+        Args:
+            use_cache: Ob die gecachte Liste verwendet werden darf (packages_cache_ttl)
+
         Returns:
             Liste der installierten Packages mit Details
         """
-        return self._request("GET", "/api/package")
+        if not use_cache:
+            return self._request("GET", "/api/package")
+        return self.cache.get_or_load(
+            self._server_cache_namespace,
+            "packages",
+            lambda: self._request("GET", "/api/package"),
+            ttl=self.packages_cache_ttl,
+        )
+
+    def _invalidate_package_caches(self):
+        """Verwirft Package Liste und Interview Metadaten nach Package Änderungen"""
+        self.cache.delete(self._server_cache_namespace, "packages")
+        self.interview_cache.invalidate()
 
     def install_or_update_package(
         self,
@@ -1438,6 +1975,7 @@ class DocassembleClient(DocassembleClientEnhanced):
             data["branch"] = branch
         if pip:
             data["pip"] = pip
+        restart = self._defer_restart("install_or_update_package", restart)
         if not restart:
             data["restart"] = "0"
 
@@ -1445,9 +1983,11 @@ class DocassembleClient(DocassembleClientEnhanced):
         if zip_file:
             files["zip"] = zip_file
 
-        return self._request(
+        result = self._request(
             "POST", "/api/package", data=data, files=files if files else None
         )
+        self._invalidate_package_caches()
+        return result
 
     def install_package(
         self,
@@ -1502,10 +2042,13 @@ class DocassembleClient(DocassembleClientEnhanced):
             Task ID für Package Update Monitoring
         """
         params = {"package": package}
+        restart = self._defer_restart("uninstall_package", restart)
         if not restart:
             params["restart"] = "0"
 
-        return self._request("DELETE", "/api/package", params=params)
+        result = self._request("DELETE", "/api/package", params=params)
+        self._invalidate_package_caches()
+        return result
 
     def get_package_update_status(self, task_id: str) -> Dict[str, Any]:
         """
@@ -1548,6 +2091,36 @@ class DocassembleClient(DocassembleClientEnhanced):
         """
         return self._request("GET", "/api/restart_status", params={"task_id": task_id})
 
+    def restart_batch(self, wait: bool = True):
+        """
+        Context Manager, der Restarts aller enthaltenen Operationen sammelt
+
+        Playground Modul-Uploads/-Löschungen und Package Operationen innerhalb
+        des with-Blocks werden mit restart=0 gesendet; beim Verlassen wird genau
+        ein trigger_server_restart ausgelöst und per get_restart_status abgewartet.
+
+        Args:
+            wait: Ob auf Abschluss des Restarts gewartet werden soll
+        """
+        return self.restart_coalescer.batch(wait=wait)
+
+    def flush_restarts(self, wait: bool = True) -> Dict[str, Any]:
+        """
+        Löst einen aufgeschobenen Restart sofort aus
+
+        Benötigte Berechtigungen: admin, developer oder playground_control
+
+        Args:
+            wait: Ob auf Abschluss des Restarts gewartet werden soll
+
+        Returns:
+            Restart Ergebnis und Statistik über vermiedene Restarts
+        """
+        return {
+            "restart": self.restart_coalescer.flush(wait=wait),
+            "stats": self.restart_coalescer.get_stats(),
+        }
+
     # ====================================================================
     # API KEY MANAGEMENT (8 Endpunkte)
     # ====================================================================
@@ -1788,17 +2361,38 @@ class DocassembleClient(DocassembleClientEnhanced):
     # FILE OPERATIONS (3 Endpunkte)
     # ====================================================================
 
+    @staticmethod
+    def _read_template(template_file: Any) -> Tuple[str, bytes]:
+        """Normalisiert Pfad, Bytes, Datei-Objekt oder requests-Tupel zu (Name, Bytes)"""
+        if isinstance(template_file, (str, Path)):
+            path = Path(template_file)
+            return path.name, path.read_bytes()
+        if isinstance(template_file, (bytes, bytearray)):
+            return "template", bytes(template_file)
+        if isinstance(template_file, tuple):
+            name, content = template_file[0], template_file[1]
+            if hasattr(content, "read"):
+                content = content.read()
+            return name, content
+        content = template_file.read()
+        name = os.path.basename(getattr(template_file, "name", "template"))
+        return name, content
+
     def extract_template_fields(
-        self, template_file: Any, format: str = "json"
+        self, template_file: Any, format: str = "json", use_cache: bool = True
     ) -> Union[Dict[str, Any], str]:
         """
         Extrahiert Felder aus einer Template Datei (PDF, DOCX, Markdown)
 
+        Ergebnisse werden inhaltsadressiert (SHA-256 der Datei plus Format)
+        gecacht; wiederholte Analysen derselben Datei erfolgen ohne Upload.
+
         Benötigte Berechtigungen: admin, developer oder template_parse
 
         Args:
-            template_file: Template Datei (PDF oder DOCX)
+            template_file: Template Datei (Pfad, Bytes, Datei-Objekt oder (Name, Inhalt) Tupel)
             format: Ausgabeformat ('json' oder 'yaml')
+            use_cache: Ob der Template Cache verwendet werden soll
 
         Returns:
             Feldinformationen als JSON Dict oder YAML String
@@ -1807,26 +2401,165 @@ class DocassembleClient(DocassembleClientEnhanced):
         if format != "json":
             data["format"] = format
 
-        files = {"template": template_file}
+        name, content = self._read_template(template_file)
+        key = TemplateFieldCache.key(content, format)
+        if use_cache:
+            cached = self.template_cache.get(key)
+            if cached is not MISSING:
+                return cached
+
+        files = {"template": (name, content)}
+        result = self._request("POST", "/api/fields", data=data, files=files)
+        if use_cache:
+            self.template_cache.put(key, result)
+        return result
+
+    def extract_template_fields_batch(
+        self,
+        directory: str,
+        format: str = "json",
+        extensions: Tuple[str, ...] = (".pdf", ".docx", ".md"),
+        max_workers: int = 4,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Extrahiert Felder aller Templates eines Verzeichnisses parallel
 
-        return self._request("POST", "/api/fields", data=data, files=files)
+        Benötigte Berechtigungen: admin, developer oder template_parse
+
+        Args:
+            directory: Verzeichnis mit Template Dateien
+            format: Ausgabeformat ('json' oder 'yaml')
+            extensions: Zu analysierende Dateiendungen
+            max_workers: Anzahl paralleler Analysen
+            use_cache: Ob der Template Cache verwendet werden soll
+
+        Returns:
+            Dict mit Ergebnissen je Dateiname und Liste fehlgeschlagener Dateien
+        """
+        paths = sorted(
+            path
+            for path in Path(directory).iterdir()
+            if path.is_file() and path.suffix.lower() in extensions
+        )
+
+        def analyze(path: Path):
+            try:
+                return (
+                    path.name,
+                    self.extract_template_fields(
+                        str(path), format=format, use_cache=use_cache
+                    ),
+                    None,
+                )
+            except Exception as e:
+                return path.name, None, str(e)
+
+        results: Dict[str, Any] = {}
+        failed = []
+        progress.phase(len(paths), "Template Felder")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [submit_in_context(executor, analyze, path) for path in paths]
+            for name, result, error in (future.result() for future in futures):
+                if error is None:
+                    results[name] = result
+                else:
+                    failed.append({"file": name, "error": error})
+                progress.step(name)
+
+        return {
+            "results": results,
+            "failed": failed,
+            "cache": self.template_cache.get_stats(),
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Statistik der client-seitigen Caches
+
+        Returns:
+            Backend Statistik (Einträge, Bytes, Treffer, Verdrängungen) sowie
+            Treffer der Interview Metadaten und Template Caches
+        """
+        return {
+            "backend": self.cache.get_stats(),
+            "interview_metadata": self.interview_cache.get_stats(),
+            "template_fields": self.template_cache.get_stats(),
+        }
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """
+        Statistik der vom Client erzeugten Interview Sessions
+
+        Returns:
+            Anzahl lebender, abgelaufener und gelöschter Sessions sowie TTL
+        """
+        return self.sessions.get_stats()
+
+    def get_node_stats(self) -> Dict[str, Any]:
+        """
+        Zustand und Latenz der Docassemble Knoten
+
+        Returns:
+            Pro Knoten Gesundheit, offene Requests, Anzahl, Fehler und Latenz
+            (EWMA, p50, p95) sowie Anzahl der Failover
+        """
+        if self.nodes is None:
+            return {"nodes": [], "single_node": self.base_url}
+        return self.nodes.get_stats()
+
+    def close(self):
+        """
+        Gibt Hintergrund-Threads und Verbindungen frei
+
+        Anstehende Restarts werden ausgelöst, eigene Sessions bleiben bestehen.
+        """
+        try:
+            self.restart_coalescer.flush(wait=False)
+        except DocassembleAPIError as e:
+            logger.warning(f"Aufgeschobener Restart beim Schließen fehlgeschlagen: {e}")
+        self.sessions.stop()
+        if self.nodes is not None:
+            self.nodes.stop()
+        self.session.close()
+
+    def reap_sessions(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Löscht abgelaufene eigene Sessions sofort
+
+        Args:
+            force: Alle registrierten Sessions löschen, nicht nur abgelaufene
+
+        Returns:
+            Ergebnis des Laufs und aktuelle Session Statistik
+        """
+        return {**self.sessions.reap(force=force), "stats": self.get_session_stats()}
 
     # NICHT-DOKUMENTIERTE ENDPUNKTE ENTFERNT
     # convert_file_to_markdown existiert nicht in der offiziellen API
 
-    def get_interview_data(self, i: str) -> Dict[str, Any]:
+    def get_interview_data(self, i: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Holt Informationen über ein Interview (Python Namen, Variablen, etc.)
 
+        Ergebnisse werden pro Interview und Package-Version Fingerprint gecacht,
+        da Docassemble das YAML bei jedem Aufruf serverseitig parst.
+
         Benötigte Berechtigungen: admin, developer oder interview_data
 
         Args:
             i: Interview Dateiname
+            use_cache: Ob der Interview Metadaten Cache verwendet werden soll
 
         Returns:
             Interview Datenanalyse
         """
-        return self._request("GET", "/api/interview_data", params={"i": i})
+        if not use_cache:
+            return self._request("GET", "/api/interview_data", params={"i": i})
+        return self.interview_cache.get_or_load(
+            f"interview_data|{i}",
+            lambda: self._request("GET", "/api/interview_data", params={"i": i}),
+        )
 
     # ====================================================================
     # DATA STASHING (2 Endpunkte)
@@ -0,0 +1,231 @@
+"""
+Konfiguration des MCP Servers
+
+Alle Einstellungen kommen aus Umgebungsvariablen DOCASSEMBLE_<FELD>, optional
+ergänzt durch eine .env Datei. ServerConfig beschreibt sie als typisiertes
+Schema (URL, API Key, Timeouts, Pool Größen, Cache, Transport, Exporter) und
+prüft sie beim Start, statt erst beim ersten Tool Aufruf zu scheitern.
+
+Der Import dieses Moduls hat keine Seiteneffekte. Die .env Datei wird erst in
+load_config() gelesen, die Konfiguration dort einmal aufgelöst und gecacht.
+Eingebettete Server können DocassembleServer.run() auch direkt eine
+ServerConfig übergeben; dann werden weder .env noch Umgebung gelesen.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
+
+from .cache import DEFAULT_MAX_BYTES
+from .envfile import load_env_file
+from .transport import TRANSPORTS
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "DOCASSEMBLE_"
+
+# Felder, die unverändert als Argumente an DocassembleClient gehen
+CLIENT_FIELDS = (
+    "timeout",
+    "pool_maxsize",
+    "session_timeout",
+    "session_reap_interval",
+    "health_check_interval",
+    "session_affinity",
+    "restart_debounce",
+    "cache_dir",
+    "cache_max_bytes",
+    "config_cache_ttl",
+    "packages_cache_ttl",
+    "rate_limit",
+    "rate_burst",
+)
+
+
+class ServerConfig(BaseModel):
+    """
+    Geprüfte Einstellungen des MCP Servers.
+
+    Jedes Feld entspricht der Umgebungsvariable DOCASSEMBLE_<FELD>
+    (z.B. mcp_port → DOCASSEMBLE_MCP_PORT).
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    # Verbindung
+    base_url: Optional[str] = Field(
+        None, description="Base URL oder kommagetrennte Liste von Knoten"
+    )
+    api_key: Optional[str] = Field(None, description="API Key")
+    timeout: int = Field(30, ge=1, description="Request Timeout in Sekunden")
+    pool_maxsize: int = Field(10, ge=1, description="HTTP Verbindungen pro Knoten")
+    health_check_interval: float = Field(10, ge=0)
+    session_affinity: bool = True
+    rate_limit: float = Field(0, ge=0, description="Requests pro Sekunde (0 = aus)")
+    rate_burst: Optional[int] = Field(None, ge=1)
+    warmup_seconds: float = Field(
+        0, ge=0, description="Budget des Warm-ups nach dem Handshake (0 = aus)"
+    )
+    warmup_connections: int = Field(4, ge=0, description="Verbindungen pro Knoten")
+
+    # Mandanten
+    tenants_file: Optional[str] = None
+    default_tenant: Optional[str] = None
+    tenant_idle_seconds: float = Field(900, ge=0)
+    max_tenant_clients: int = Field(32, ge=1)
+
+    # Sessions und Restarts
+    session_timeout: int = Field(3600, ge=0)
+    session_reap_interval: float = Field(60, ge=0)
+    restart_debounce: float = Field(0, ge=0)
+
+    # Cache
+    cache_dir: Optional[str] = None
+    cache_max_bytes: int = Field(DEFAULT_MAX_BYTES, ge=0)
+    config_cache_ttl: float = Field(300, ge=0)
+    packages_cache_ttl: float = Field(60, ge=0)
+
+    # MCP Transport
+    mcp_transport: str = "stdio"
+    mcp_host: str = "127.0.0.1"
+    mcp_port: int = Field(8000, ge=0, le=65535)
+    mcp_path: str = "/mcp"
+    mcp_auth_token: Optional[str] = Field(
+        None, description="Bearer Token der HTTP Transporte"
+    )
+    mcp_allowed_hosts: Optional[str] = Field(
+        None, description="Zusätzliche Host Header, kommagetrennt"
+    )
+    local_root: Optional[str] = Field(
+        None, description="Wurzel für lokale Pfade in Tool Argumenten"
+    )
+    mcp_workers: int = Field(16, ge=1)
+    mcp_max_queue: int = Field(64, ge=0)
+
+    # Hintergrund Jobs
+    job_workers: int = Field(4, ge=1)
+    job_max_queue: int = Field(32, ge=0)
+    job_retention_seconds: float = Field(3600, ge=0)
+    job_max_results: int = Field(100, ge=1)
+    job_state_file: Optional[str] = None
+
+    # Metriken, Tracing, Profiling
+    metrics_file: Optional[str] = None
+    metrics_interval: float = Field(15, gt=0)
+    metrics_port: Optional[int] = Field(None, ge=0, le=65535)
+    metrics_host: str = "127.0.0.1"
+    trace_file: Optional[str] = None
+    trace_otlp_endpoint: Optional[str] = None
+    trace_sample_rate: float = Field(0.1, ge=0, le=1)
+    slow_call_seconds: float = Field(5, ge=0)
+    profile_dir: Optional[str] = None
+    profile_sample_rate: float = Field(0.1, ge=0, le=1)
+
+    @field_validator("base_url")
+    @classmethod
+    def _check_base_url(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        for url in value.split(","):
+            parsed = urlparse(url.strip())
+            if parsed.scheme not in ("http", "https") or not parsed.netloc:
+                raise ValueError(f"keine http(s) URL: {url.strip()!r}")
+        return value
+
+    @field_validator("mcp_transport")
+    @classmethod
+    def _check_transport(cls, value: str) -> str:
+        value = value.lower()
+        if value not in TRANSPORTS:
+            raise ValueError(f"muss einer von {', '.join(TRANSPORTS)} sein")
+        return value
+
+    @model_validator(mode="after")
+    def _check_target(self) -> "ServerConfig":
+        # Im Mandantenbetrieb stehen Base URL und API Key in der Mandanten Datei
+        if not self.tenants_file and not (self.base_url and self.api_key):
+            raise ValueError(
+                f"{ENV_PREFIX}BASE_URL und {ENV_PREFIX}API_KEY sind erforderlich "
+                f"(oder {ENV_PREFIX}TENANTS_FILE)"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _check_http_auth(self) -> "ServerConfig":
+        if self.mcp_transport != "stdio" and not self.mcp_auth_token:
+            raise ValueError(
+                f"{ENV_PREFIX}MCP_AUTH_TOKEN ist für den Transport "
+                f"{self.mcp_transport} erforderlich"
+            )
+        return self
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "ServerConfig":
+        """
+        Liest die Konfiguration aus Umgebungsvariablen
+
+        Leere Variablen gelten als nicht gesetzt. OTEL_EXPORTER_OTLP_ENDPOINT
+        wird als Fallback für DOCASSEMBLE_TRACE_OTLP_ENDPOINT verwendet.
+
+        Args:
+            environ: Variablen (Default: os.environ)
+
+        Returns:
+            Geprüfte ServerConfig
+
+        Raises:
+            ValueError: Mit einer Zeile pro ungültiger Variable
+        """
+        environ = os.environ if environ is None else environ
+        values: Dict[str, Any] = {}
+        for name in cls.model_fields:
+            value = environ.get(ENV_PREFIX + name.upper())
+            if value not in (None, ""):
+                values[name] = value
+        if "trace_otlp_endpoint" not in values and environ.get(
+            "OTEL_EXPORTER_OTLP_ENDPOINT"
+        ):
+            values["trace_otlp_endpoint"] = environ["OTEL_EXPORTER_OTLP_ENDPOINT"]
+
+        try:
+            return cls.model_validate(values)
+        except ValidationError as e:
+            problems = []
+            for error in e.errors():
+                field = ".".join(str(part) for part in error["loc"])
+                message = error["msg"].removeprefix("Value error, ")
+                if field:
+                    message = f"{ENV_PREFIX}{field.upper()}: {message}"
+                problems.append(message)
+            raise ValueError(
+                "Ungültige Konfiguration:\n  " + "\n  ".join(problems)
+            ) from None
+
+    def client_options(self) -> Dict[str, Any]:
+        """Gemeinsame DocassembleClient Argumente (ohne base_url und api_key)"""
+        return {name: getattr(self, name) for name in CLIENT_FIELDS}
+
+
+@lru_cache(maxsize=1)
+def load_config() -> ServerConfig:
+    """
+    Lädt .env und liefert die geprüfte Konfiguration (einmal pro Prozess)
+
+    load_config.cache_clear() erzwingt ein erneutes Einlesen.
+
+    Raises:
+        ValueError: Bei fehlenden oder ungültigen Einstellungen
+    """
+    load_env_file()
+    return ServerConfig.from_env()
@@ -0,0 +1,75 @@
+"""
+Vorbereitete Request Ziele
+
+Pro Request fallen sonst Arbeiten an, deren Ergebnis sich nie ändert:
+
+- urljoin() der Base URL mit dem Endpunkt und das Metrik Label (Regex über
+  den Pfad). EndpointTable berechnet beides einmal pro Endpunkt; Pfade mit
+  IDs bekommen das Label ihres Templates (/api/user/{id}).
+- requests liest bei jedem Request Proxy- und CA-Bundle-Variablen aus
+  os.environ (merge_environment_settings), bei vielen Variablen der größte
+  Posten. freeze_environment() löst sie einmal beim Erzeugen des Clients auf
+  und setzt sie fest in die Session.
+"""
+
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import requests
+
+from .metrics import endpoint_label
+
+# (Pfad, Metrik Label, URL auf der ersten Base URL)
+Endpoint = Tuple[str, str, str]
+
+
+class EndpointTable:
+    """
+    Cache von Pfad, Label und URL je Endpunkt.
+
+    Args:
+        base_url: Base URL ohne abschließenden Slash
+        max_entries: Obergrenze für gecachte Endpunkte; Pfade mit IDs darüber
+            hinaus werden jedes Mal neu berechnet
+    """
+
+    def __init__(self, base_url: str, max_entries: int = 4096):
+        self.base_url = base_url.rstrip("/")
+        self.max_entries = max_entries
+        self._entries: Dict[str, Endpoint] = {}
+
+    def resolve(self, endpoint: str) -> Endpoint:
+        """Pfad (mit führendem Slash), Metrik Label und URL eines Endpunkts"""
+        entry = self._entries.get(endpoint)
+        if entry is None:
+            path = "/" + endpoint.lstrip("/")
+            entry = (path, endpoint_label(path), self.base_url + path)
+            if len(self._entries) < self.max_entries:
+                self._entries[endpoint] = entry
+        return entry
+
+
+def freeze_environment(session: requests.Session, urls: Sequence[str]):
+    """
+    Löst Proxy und CA-Bundle Umgebungsvariablen einmal für urls auf
+
+    Danach ignoriert die Session os.environ und ~/.netrc (trust_env=False);
+    der Client authentifiziert sich ohnehin per X-API-Key. Spätere
+    Änderungen der Variablen wirken erst auf neu erzeugte Clients. Ergeben
+    sich für die Knoten unterschiedliche Proxies (NO_PROXY), bleibt die
+    Auflösung pro Request aktiv.
+    """
+    proxies: Optional[Dict[str, str]] = None
+    for url in urls:
+        node_proxies = requests.utils.get_environ_proxies(url)
+        if proxies is not None and node_proxies != proxies:
+            return
+        proxies = node_proxies
+    session.proxies.update(proxies or {})
+    if session.verify is True:
+        session.verify = (
+            os.environ.get("REQUESTS_CA_BUNDLE")
+            or os.environ.get("CURL_CA_BUNDLE")
+            or True
+        )
+    session.trust_env = False
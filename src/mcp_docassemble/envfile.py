@@ -0,0 +1,31 @@
+"""
+.env Datei für lokale Konfiguration
+
+Eigenes Modul ohne weitere Abhängigkeiten: die CLI Befehle lesen .env, ohne
+das Konfigurations Schema (pydantic) zu laden.
+"""
+
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def load_env_file():
+    """
+    Lädt eine .env Datei (Projektverzeichnis, sonst Arbeitsverzeichnis)
+
+    Bereits gesetzte Umgebungsvariablen haben Vorrang. Ohne python-dotenv
+    werden nur die Umgebungsvariablen verwendet.
+    """
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+
+    env_path = Path(__file__).parent.parent.parent / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+        logger.info(f"Loaded environment from {env_path}")
+    else:
+        load_dotenv()
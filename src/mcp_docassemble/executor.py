@@ -0,0 +1,154 @@
+"""
+Ausführung von Tool Aufrufen
+
+Die Client Methoden sind blockierend (requests). ToolExecutor führt sie in
+einem Thread Pool aus, damit der Event Loop des MCP Servers weitere
+Nachrichten und - beim HTTP Transport - weitere Host Sessions bedienen kann.
+
+Backpressure: Höchstens max_workers Aufrufe laufen gleichzeitig, höchstens
+max_queue warten auf einen freien Worker. Darüber hinaus wird ein Aufruf
+sofort mit ServerBusyError abgelehnt, statt die Warteschlange (und die
+Antwortzeiten) unbegrenzt wachsen zu lassen.
+
+Abbruch: Bricht der MCP Host einen Tool Aufruf ab, gibt ein wartender Aufruf
+seinen Platz in der Warteschlange sofort frei. Bei einem laufenden Aufruf
+wird sein CancelScope ausgelöst; der blockierende HTTP Request endet dann
+vorzeitig und der Worker wird frei (siehe cancellation.py).
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from .cancellation import CancelScope, cancel_scope
+
+logger = logging.getLogger(__name__)
+
+
+class ServerBusyError(Exception):
+    """Alle Worker belegt und Warteschlange voll"""
+
+
+class ToolExecutor:
+    """
+    Begrenzter Thread Pool für blockierende Tool Aufrufe.
+
+    Args:
+        max_workers: Gleichzeitig laufende Tool Aufrufe
+        max_queue: Wartende Tool Aufrufe, bevor neue abgelehnt werden
+    """
+
+    def __init__(self, max_workers: int = 16, max_queue: int = 64):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="mcp-tool"
+        )
+        self._lock = threading.Lock()
+        self.running = 0
+        self.queued = 0
+        self.stats = {
+            "completed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "queue_seconds": 0.0,
+        }
+        self.cancelled = {"queued": 0, "running": 0}
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Führt fn(*args) in einem Worker aus (mit dem aktuellen contextvars Kontext)
+
+        Wird die aufrufende Task abgebrochen, endet auch der Aufruf im Worker
+        (ToolCancelledError in fn) und asyncio.CancelledError wird
+        weitergereicht.
+
+        Raises:
+            ServerBusyError: Wenn max_workers laufen und max_queue warten
+        """
+        with self._lock:
+            if self.running + self.queued >= self.max_workers + self.max_queue:
+                self.stats["rejected"] += 1
+                raise ServerBusyError(
+                    f"Server ausgelastet: {self.running} Tool Aufrufe laufen, "
+                    f"{self.queued} warten"
+                )
+            self.queued += 1
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+        scope = CancelScope()
+        state = {"started": False, "cancelled": False}
+
+        def call():
+            with cancel_scope(scope):
+                return fn(*args)
+
+        def work():
+            with self._lock:
+                if state["cancelled"]:
+                    # Abgebrochen, bevor ein Worker frei wurde
+                    return None
+                state["started"] = True
+                self.queued -= 1
+                self.running += 1
+                self.stats["queue_seconds"] += time.perf_counter() - submitted
+            try:
+                return context.run(call)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.stats["completed"] += 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, work
+            )
+        except asyncio.CancelledError:
+            with self._lock:
+                state["cancelled"] = True
+                stage = "running" if state["started"] else "queued"
+                if stage == "queued":
+                    self.queued -= 1
+                self.stats["cancelled"] += 1
+                self.cancelled[stage] += 1
+            # Worker erst in der nächsten Loop Iteration frei geben: Abbrüche
+            # wartender Aufrufe, die in derselben Iteration angefordert wurden
+            # (z.B. mehrere task.cancel() hintereinander), sind dann schon in
+            # state eingetragen. Später angeforderte Abbrüche deckt das nicht
+            # ab; ein Aufruf, der bis dahin gestartet ist, gilt als laufend.
+            asyncio.get_running_loop().call_soon(scope.cancel)
+            logger.info(f"Tool Aufruf abgebrochen ({stage})")
+            raise
+
+    def metrics(self):
+        """Collector: laufende, wartende, abgelehnte und abgebrochene Tool Aufrufe"""
+        with self._lock:
+            running, queued = self.running, self.queued
+            stats = dict(self.stats)
+            cancelled = dict(self.cancelled)
+        yield "docassemble_mcp_tool_running", {}, running
+        yield "docassemble_mcp_tool_queued", {}, queued
+        yield "docassemble_mcp_tool_rejected_total", {}, stats["rejected"]
+        for stage, count in cancelled.items():
+            yield "docassemble_mcp_tool_cancelled_total", {"stage": stage}, count
+        yield "docassemble_mcp_tool_queue_seconds_total", {}, round(
+            stats["queue_seconds"], 6
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queued": self.queued,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                **self.stats,
+                "queue_seconds": round(self.stats["queue_seconds"], 3),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
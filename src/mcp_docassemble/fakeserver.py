@@ -0,0 +1,796 @@
+"""
+Lokaler Docassemble Stand-in Server
+
+Ein HTTP Server auf Basis der Standardbibliothek, der alle Endpunkte
+beantwortet, die der DocassembleClient verwendet. Gedacht für reproduzierbare
+Durchsatz- und Latenzmessungen ohne Netzwerk und ohne echte Docassemble
+Installation - nicht für funktionale Tests gegen Docassemble Semantik.
+
+Einstellbar sind Latenz (fest plus Jitter), Fehlerquote, Seitengröße der
+paginierten Listen, Anzahl der Einträge und Größe der Nutzdaten. Alle
+Zufallswerte stammen aus einem Generator mit festem Seed.
+
+Verwendung:
+    with FakeDocassembleServer(latency=0.005, page_size=50) as fake:
+        client = DocassembleClient(fake.base_url, "beliebiger-key")
+        client.list_users()
+"""
+
+import email.parser
+import email.policy
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+FAKE_VERSION = "1.6.0-fake"
+
+Response = Tuple[int, Any]
+
+# Fragen des simulierten Interviews; eine Frage gilt als beantwortet, sobald
+# alle ihre Variablen gesetzt sind
+FAKE_INTERVIEW = [
+    {
+        "_question_name": "name",
+        "questionType": "fields",
+        "questionText": "Wie heißen Sie?",
+        "fields": [
+            {"variable_name": "user_name", "datatype": "text", "label": "Name"},
+            {"variable_name": "user_email", "datatype": "email", "label": "E-Mail"},
+        ],
+    },
+    {
+        "_question_name": "terms",
+        "questionType": "yesno",
+        "questionText": "Akzeptieren Sie die Bedingungen?",
+        "fields": [{"variable_name": "accepts_terms", "datatype": "boolean"}],
+    },
+    {
+        "_question_name": "age",
+        "questionType": "fields",
+        "questionText": "Wie alt sind Sie?",
+        "fields": [{"variable_name": "user_age", "datatype": "integer"}],
+    },
+    {
+        "_question_name": "final",
+        "questionType": "deadend",
+        "questionText": "Vielen Dank!",
+        "fields": [],
+    },
+]
+
+
+class _FakeState:
+    """Deterministischer Datenbestand des Stand-in Servers"""
+
+    def __init__(self, total_items: int, payload_bytes: int, seed: int):
+        rng = random.Random(seed)
+        self.payload_bytes = payload_bytes
+        self.lock = threading.Lock()
+        self.users: Dict[int, Dict[str, Any]] = {
+            user_id: {
+                "id": user_id,
+                "email": f"user{user_id}@example.com",
+                "first_name": f"Vorname{user_id}",
+                "last_name": f"Nachname{user_id}",
+                "privileges": ["admin"] if user_id == 1 else ["user"],
+                "active": True,
+            }
+            for user_id in range(1, total_items + 1)
+        }
+        self.sessions: List[Dict[str, Any]] = [
+            {
+                "i": f"docassemble.demo:data/questions/interview{n % 10}.yml",
+                "session": f"session{n:06d}",
+                "user_id": rng.randint(1, max(1, total_items)),
+                "modtime": f"2025-01-01T00:{n % 60:02d}:00",
+                "starttime": "2025-01-01T00:00:00",
+                "tags": ["demo"] if n % 2 else [],
+                "title": f"Interview {n % 10}",
+                "utc_modtime": "2025-01-01T00:00:00",
+                "valid": True,
+            }
+            for n in range(total_items)
+        ]
+        self.interviews: List[Dict[str, Any]] = [
+            {
+                "filename": f"docassemble.demo:data/questions/interview{n}.yml",
+                "link": f"/interview?i=docassemble.demo:data/questions/interview{n}.yml",
+                "title": f"Interview {n}",
+                "subtitle": "",
+                "status_required": False,
+                "tags": ["demo"],
+                "metadata": {"title": f"Interview {n}"},
+            }
+            for n in range(10)
+        ]
+        self.packages: List[Dict[str, Any]] = [
+            {"name": "docassemble.base", "version": FAKE_VERSION, "type": "pip"},
+            {"name": "docassemble.demo", "version": FAKE_VERSION, "type": "pip"},
+        ]
+        self.playground: Dict[Tuple[str, str], Dict[str, bytes]] = {}
+        self.projects: List[str] = ["default"]
+        self.stash: Dict[str, Any] = {}
+        self.answers: Dict[str, Dict[str, Any]] = {}
+        self.restarts: Dict[str, float] = {}
+        self.api_keys: Dict[str, Dict[str, Any]] = {}
+        self.traces: List[Dict[str, Any]] = []
+        self.config: Dict[str, Any] = {
+            "version": FAKE_VERSION,
+            "debug": False,
+            "appname": "Docassemble (fake)",
+        }
+
+    def padding(self) -> str:
+        return "x" * self.payload_bytes
+
+
+def _parse_multipart(content_type: str, body: bytes) -> Tuple[Dict, Dict]:
+    """Zerlegt multipart/form-data in Formularfelder und Dateien"""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    fields: Dict[str, str] = {}
+    files: Dict[str, Tuple[str, bytes]] = {}
+    for part in message.iter_parts():
+        name = str(part.get_param("name", header="content-disposition") or "")
+        filename = part.get_filename()
+        payload = part.get_payload(decode=True)
+        if not isinstance(payload, bytes):
+            payload = b""
+        if filename is not None:
+            files[name] = (filename, payload)
+        elif name:
+            fields[name] = payload.decode("utf-8", "replace")
+    return fields, files
+
+
+class FakeDocassembleServer:
+    """
+    Stand-in für die Docassemble REST API.
+
+    Args:
+        host: Bind Adresse
+        port: Port (0 = freier Port)
+        api_key: Erwarteter X-API-Key (None akzeptiert jeden Schlüssel)
+        latency: Feste Verzögerung pro Request in Sekunden
+        latency_jitter: Zusätzliche gleichverteilte Verzögerung 0..jitter Sekunden
+        error_rate: Anteil der Requests (0..1), die mit error_status beantwortet werden
+        error_status: HTTP Status der injizierten Fehler
+        page_size: Einträge pro Seite bei paginierten Listen (user_list, interviews)
+        total_items: Anzahl generierter Benutzer und Sessions
+        payload_bytes: Größe des Füllfelds pro Listeneintrag und Session Variablen
+        restart_seconds: Dauer eines simulierten Server Restarts
+        seed: Seed für Daten, Latenz-Jitter und Fehlerinjektion
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        api_key: Optional[str] = None,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        page_size: int = 100,
+        total_items: int = 250,
+        payload_bytes: int = 0,
+        restart_seconds: float = 0.0,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.api_key = api_key
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.page_size = max(1, page_size)
+        self.restart_seconds = restart_seconds
+        self.seed = seed
+        self.state = _FakeState(total_items, payload_bytes, seed)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {}
+        self.reset_stats()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes: List[Tuple[str, "re.Pattern[str]", Callable[..., Response]]] = []
+        self._register_routes()
+
+    # ----------------------------------------------------------------
+    # Lebenszyklus
+    # ----------------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _bind(self) -> ThreadingHTTPServer:
+        handler = type("FakeHandler", (_FakeRequestHandler,), {"fake": self})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        return self._httpd
+
+    def start(self) -> "FakeDocassembleServer":
+        """Startet den Server in einem Hintergrund-Thread"""
+        httpd = self._bind()
+        self._thread = threading.Thread(
+            target=httpd.serve_forever, name="fake-docassemble", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Fake Docassemble Server läuft auf {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        """Startet den Server im aktuellen Thread (blockierend)"""
+        self._bind().serve_forever()
+
+    def stop(self):
+        """Stoppt den Server"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "FakeDocassembleServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_stats(self):
+        """Setzt die Request Statistik zurück"""
+        with self._stats_lock:
+            self.stats = {"requests": 0, "injected_errors": 0, "endpoints": {}}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {**self.stats, "endpoints": dict(self.stats["endpoints"])}
+
+    # ----------------------------------------------------------------
+    # Request Verarbeitung
+    # ----------------------------------------------------------------
+
+    def _draw(self) -> Tuple[float, bool]:
+        """Zieht Verzögerung und Fehlerentscheidung aus dem geseedeten Generator"""
+        with self._rng_lock:
+            delay = self.latency + (
+                self._rng.uniform(0, self.latency_jitter) if self.latency_jitter else 0
+            )
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, fail
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        body: Dict[str, Any],
+        files: Dict[str, Tuple[str, bytes]],
+        headers: Any,
+    ) -> Response:
+        """Beantwortet einen Request (ohne HTTP Schicht)"""
+        delay, fail = self._draw()
+        if delay:
+            time.sleep(delay)
+
+        route = f"{method} {path}"
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["endpoints"][route] = self.stats["endpoints"].get(route, 0) + 1
+            if fail:
+                self.stats["injected_errors"] += 1
+        if fail:
+            return self.error_status, "Injected error"
+
+        if self.api_key is not None:
+            supplied = headers.get("X-API-Key") or ""
+            auth = headers.get("Authorization") or ""
+            if supplied != self.api_key and auth != f"Bearer {self.api_key}":
+                return 403, "Access denied."
+
+        for route_method, pattern, func in self._routes:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match:
+                args = {**query, **body}
+                return func(args, files, **match.groupdict())
+        return 404, f"Unknown endpoint {method} {path}"
+
+    def _route(self, method: str, path: str):
+        pattern = re.compile(re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path))
+
+        def register(func):
+            self._routes.append((method, pattern, func))
+            return func
+
+        return register
+
+    def _page(self, items: List[Dict[str, Any]], next_id: Optional[str]) -> Dict:
+        """Liefert eine Seite im Docassemble Format {items, next_id}"""
+        start = int(next_id) if next_id else 0
+        page = items[start : start + self.page_size]
+        padding = self.state.padding()
+        if padding:
+            page = [{**item, "data": padding} for item in page]
+        end = start + self.page_size
+        return {"items": page, "next_id": str(end) if end < len(items) else None}
+
+    def _restart(self, args: Dict[str, Any]) -> Response:
+        if str(args.get("restart", "1")) == "0":
+            return 204, None
+        task_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.restarts[task_id] = time.monotonic() + self.restart_seconds
+        return 200, {"task_id": task_id}
+
+    def _register_routes(self):
+        state = self.state
+        route = self._route
+
+        # Server / Konfiguration
+        route("GET", "/health_check")(lambda args, files: (200, "OK"))
+
+        @route("GET", "/api/config")
+        def get_config(args, files):
+            return 200, state.config
+
+        @route("POST", "/api/config")
+        def write_config(args, files):
+            config = args.get("config")
+            if isinstance(config, str):
+                config = json.loads(config)
+            state.config = dict(config or {})
+            return 204, None
+
+        @route("PATCH", "/api/config")
+        def patch_config(args, files):
+            changes = args.get("config_changes")
+            if isinstance(changes, str):
+                changes = json.loads(changes)
+            state.config.update(changes or {})
+            return 204, None
+
+        @route("GET", "/api/package")
+        def list_packages(args, files):
+            return 200, state.packages
+
+        @route("POST", "/api/package")
+        def install_package(args, files):
+            name = args.get("pip") or args.get("github_url") or "docassemble.upload"
+            with state.lock:
+                state.packages.append(
+                    {"name": name, "version": FAKE_VERSION, "type": "pip"}
+                )
+            return 200, {"task_id": uuid.uuid4().hex}
+
+        @route("DELETE", "/api/package")
+        def uninstall_package(args, files):
+            with state.lock:
+                state.packages = [
+                    p for p in state.packages if p["name"] != args.get("package")
+                ]
+            return 200, {"task_id": uuid.uuid4().hex}
+
+        @route("GET", "/api/package_update_status")
+        def package_status(args, files):
+            return 200, {"status": "completed", "ok": True}
+
+        @route("POST", "/api/restart")
+        def restart(args, files):
+            return self._restart({})
+
+        @route("GET", "/api/restart_status")
+        def restart_status(args, files):
+            ready_at = state.restarts.get(args.get("task_id", ""))
+            if ready_at is None:
+                return 200, {"status": "unknown"}
+            done = time.monotonic() >= ready_at
+            return 200, {"status": "completed" if done else "working"}
+
+        @route("POST", "/api/clear_cache")
+        def clear_cache(args, files):
+            return 204, None
+
+        # Benutzer
+        @route("GET", "/api/user")
+        def current_user(args, files):
+            return 200, state.users.get(1, {"id": 1, "email": "admin@example.com"})
+
+        @route("PATCH", "/api/user")
+        def update_current_user(args, files):
+            return 204, None
+
+        @route("GET", "/api/user_list")
+        def user_list(args, files):
+            users = list(state.users.values())
+            return 200, self._page(users, args.get("next_id"))
+
+        @route("GET", "/api/user_info")
+        def user_info(args, files):
+            for user in state.users.values():
+                if user["email"] == args.get("username"):
+                    return 200, user
+            return 404, "User not found"
+
+        @route("POST", "/api/user/new")
+        def create_user(args, files):
+            with state.lock:
+                user_id = max(state.users, default=0) + 1
+                state.users[user_id] = {
+                    "id": user_id,
+                    "email": args.get("username"),
+                    "privileges": args.get("privileges") or ["user"],
+                    "active": True,
+                }
+            return 200, {"user_id": user_id, "password": "fake-password"}
+
+        @route("POST", "/api/user_invite")
+        def invite(args, files):
+            emails = args.get("email_addresses") or []
+            if isinstance(emails, str):
+                emails = json.loads(emails)
+            return 200, [{"email": e, "url": f"/invite/{e}"} for e in emails]
+
+        @route("GET", "/api/user/{user_id}")
+        def get_user(args, files, user_id):
+            user = state.users.get(int(user_id))
+            return (200, user) if user else (404, "User not found")
+
+        @route("PATCH", "/api/user/{user_id}")
+        def update_user(args, files, user_id):
+            return 204, None
+
+        @route("DELETE", "/api/user/{user_id}")
+        def delete_user(args, files, user_id):
+            with state.lock:
+                state.users.pop(int(user_id), None)
+            return 204, None
+
+        @route("GET", "/api/privileges")
+        def privileges(args, files):
+            return 200, ["admin", "developer", "advocate", "user"]
+
+        @route("POST", "/api/privileges")
+        def add_privilege(args, files):
+            return 204, None
+
+        @route("DELETE", "/api/privileges")
+        def remove_privilege(args, files):
+            return 204, None
+
+        @route("POST", "/api/user/{user_id}/privileges")
+        def give_privilege(args, files, user_id):
+            return 204, None
+
+        @route("DELETE", "/api/user/{user_id}/privileges")
+        def take_privilege(args, files, user_id):
+            return 204, None
+
+        # API Keys
+        def list_keys(args, files, user_id="1"):
+            keys = [k for k in state.api_keys.values() if k["user_id"] == user_id]
+            if args.get("api_key"):
+                keys = [k for k in keys if k["key"] == args["api_key"]]
+            if args.get("name"):
+                keys = [k for k in keys if k["name"] == args["name"]]
+            return 200, keys
+
+        def create_key(args, files, user_id="1"):
+            key = uuid.uuid4().hex
+            with state.lock:
+                state.api_keys[key] = {
+                    "key": key,
+                    "name": args.get("name", "key"),
+                    "method": args.get("method", "none"),
+                    "constraints": args.get("allowed", []),
+                    "user_id": user_id,
+                }
+            return 200, key
+
+        def delete_key(args, files, user_id="1"):
+            with state.lock:
+                state.api_keys.pop(args.get("api_key", ""), None)
+            return 204, None
+
+        def update_key(args, files, user_id="1"):
+            return 204, None
+
+        for path in ("/api/user/api", "/api/user/{user_id}/api"):
+            route("GET", path)(list_keys)
+            route("POST", path)(create_key)
+            route("DELETE", path)(delete_key)
+            route("PATCH", path)(update_key)
+
+        # Interview Sessions
+        def filtered_sessions(args, user_id=None):
+            sessions = state.sessions
+            if user_id is not None:
+                sessions = [s for s in sessions if s["user_id"] == int(user_id)]
+            if args.get("i"):
+                sessions = [s for s in sessions if s["i"] == args["i"]]
+            if args.get("session"):
+                sessions = [s for s in sessions if s["session"] == args["session"]]
+            if args.get("tag"):
+                sessions = [s for s in sessions if args["tag"] in s["tags"]]
+            return sessions
+
+        def list_sessions(args, files, user_id=None):
+            return 200, self._page(
+                filtered_sessions(args, user_id), args.get("next_id")
+            )
+
+        def delete_sessions(args, files, user_id=None):
+            doomed = {id(s) for s in filtered_sessions(args, user_id)}
+            with state.lock:
+                state.sessions = [s for s in state.sessions if id(s) not in doomed]
+            return 204, None
+
+        route("GET", "/api/interviews")(list_sessions)
+        route("DELETE", "/api/interviews")(delete_sessions)
+        route("GET", "/api/user/{user_id}/interviews")(list_sessions)
+        route("DELETE", "/api/user/{user_id}/interviews")(delete_sessions)
+        route("GET", "/api/user/interviews")(
+            lambda args, files: list_sessions(args, files, user_id=1)
+        )
+        route("DELETE", "/api/user/interviews")(
+            lambda args, files: delete_sessions(args, files, user_id=1)
+        )
+
+        @route("GET", "/api/list")
+        def advertised(args, files):
+            interviews = state.interviews
+            if args.get("tag"):
+                interviews = [i for i in interviews if args["tag"] in i["tags"]]
+            return 200, interviews
+
+        @route("GET", "/api/interview_data")
+        def interview_data(args, files):
+            return 200, {
+                "items": [
+                    {"question": f"Frage {n}", "variables": [f"var{n}"]}
+                    for n in range(5)
+                ],
+                "i": args.get("i"),
+            }
+
+        @route("GET", "/api/session/new")
+        def new_session(args, files):
+            session_id = uuid.uuid4().hex[:16]
+            return 200, {"i": args.get("i"), "session": session_id, "encrypted": False}
+
+        def answers(args) -> Dict[str, Any]:
+            with state.lock:
+                return dict(state.answers.get(args.get("session") or "", {}))
+
+        def variables(args):
+            result = {"i": args.get("i"), "session": args.get("session")}
+            result.update({f"var{n}": f"Wert {n}" for n in range(10)})
+            result.update(answers(args))
+            if state.payload_bytes:
+                result["data"] = state.padding()
+            return result
+
+        def question(args):
+            known = answers(args)
+            current = next(
+                q
+                for q in FAKE_INTERVIEW
+                if not q["fields"]
+                or not all(f["variable_name"] in known for f in q["fields"])
+            )
+            result = {**current, "i": args.get("i"), "session": args.get("session")}
+            if current["questionType"] == "deadend":
+                # Dokument, das am Ende des Interviews erzeugt wurde
+                number = sum(map(ord, args.get("session") or "")) or 1
+                result["attachments"] = [
+                    {
+                        "filename": "Zusammenfassung",
+                        "name": "zusammenfassung",
+                        "number": {"pdf": number},
+                        "url": {"pdf": f"{self.base_url}/api/file/{number}"},
+                    }
+                ]
+            return result
+
+        def set_variables(args, files):
+            values = args.get("variables") or {}
+            if isinstance(values, str):
+                values = json.loads(values)
+            with state.lock:
+                stored = state.answers.setdefault(args.get("session") or "", {})
+                stored.update(values)
+                for name in args.get("delete_variables") or []:
+                    stored.pop(name, None)
+            if str(args.get("question", "1")) == "0":
+                return 204, None
+            return 200, question(args)
+
+        route("GET", "/api/session")(lambda args, files: (200, variables(args)))
+        route("POST", "/api/session")(set_variables)
+
+        @route("DELETE", "/api/session")
+        def delete_session(args, files):
+            with state.lock:
+                state.answers.pop(args.get("session") or "", None)
+            return 204, None
+
+        route("GET", "/api/session/question")(lambda args, files: (200, question(args)))
+        route("POST", "/api/session/back")(lambda args, files: (200, question(args)))
+        route("POST", "/api/session/action")(lambda args, files: (204, None))
+
+        @route("GET", "/api/file/{file_number}")
+        def get_file(args, files, file_number):
+            return 200, ("application/octet-stream", b"x" * max(1, state.payload_bytes))
+
+        # URLs und Secrets
+        route("GET", "/api/temp_url")(
+            lambda args, files: (200, f"{self.base_url}/temp/{uuid.uuid4().hex}")
+        )
+        route("POST", "/api/login_url")(
+            lambda args, files: (200, f"{self.base_url}/login/{uuid.uuid4().hex}")
+        )
+        route("POST", "/api/resume_url")(
+            lambda args, files: (200, f"{self.base_url}/resume/{uuid.uuid4().hex}")
+        )
+        route("GET", "/api/secret")(lambda args, files: (200, uuid.uuid4().hex))
+
+        @route("GET", "/api/retrieve_stashed_data")
+        def retrieve_stash(args, files):
+            data = state.stash.get(args.get("stash_key", ""))
+            return (200, data) if data is not None else (404, "Stash not found")
+
+        # Templates
+        @route("POST", "/api/fields")
+        def fields(args, files):
+            template = files.get("template")
+            if template is None:
+                return 400, "No template"
+            count = max(1, len(template[1]) // 1024)
+            names = [f"field_{n}" for n in range(min(count, 100))]
+            return 200, {"fields": names}
+
+        # Playground
+        def folder_files(args) -> Dict[str, bytes]:
+            key = (args.get("project", "default"), args.get("folder", "static"))
+            with state.lock:
+                return state.playground.setdefault(key, {})
+
+        @route("GET", "/api/playground")
+        def list_playground(args, files):
+            entries = folder_files(args)
+            if args.get("filename"):
+                content = entries.get(args["filename"])
+                if content is None:
+                    return 404, "File not found"
+                return 200, ("application/octet-stream", content)
+            return 200, sorted(entries)
+
+        @route("POST", "/api/playground")
+        def upload_playground(args, files):
+            entries = folder_files(args)
+            with state.lock:
+                for filename, content in files.values():
+                    entries[filename] = content
+            if args.get("folder") == "modules":
+                return self._restart(args)
+            return 204, None
+
+        @route("DELETE", "/api/playground")
+        def delete_playground(args, files):
+            entries = folder_files(args)
+            with state.lock:
+                if entries.pop(args.get("filename", ""), None) is None:
+                    return 404, "File not found"
+            if args.get("folder") == "modules":
+                return self._restart(args)
+            return 204, None
+
+        @route("POST", "/api/playground_install")
+        def playground_install(args, files):
+            return self._restart(args)
+
+        @route("POST", "/api/playground/pull")
+        def playground_pull(args, files):
+            return self._restart(args)
+
+        @route("GET", "/api/playground/project")
+        def list_projects(args, files):
+            return 200, list(state.projects)
+
+        @route("POST", "/api/projects")
+        @route("POST", "/api/playground/project")
+        def create_project(args, files):
+            with state.lock:
+                if args.get("project") not in state.projects:
+                    state.projects.append(args.get("project"))
+            return 204, None
+
+        # OTLP/HTTP Collector Stand-in für Tracing
+        @route("POST", "/v1/traces")
+        def collect_traces(args, files):
+            with state.lock:
+                state.traces.append(args)
+            return 200, {}
+
+        @route("DELETE", "/api/projects")
+        @route("DELETE", "/api/playground/project")
+        def delete_project(args, files):
+            with state.lock:
+                if args.get("project") in state.projects:
+                    state.projects.remove(args.get("project"))
+            return 204, None
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    """HTTP Schicht: zerlegt Requests und serialisiert Antworten"""
+
+    fake: FakeDocassembleServer
+    protocol_version = "HTTP/1.1"
+    # Header und Body werden getrennt geschrieben; ohne TCP_NODELAY führt das
+    # mit Delayed ACK zu ~40 ms Verzögerung pro Keep-Alive Request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        content_type = self.headers.get("Content-Type", "")
+
+        body: Dict[str, Any] = {}
+        files: Dict[str, Tuple[str, bytes]] = {}
+        if raw:
+            if content_type.startswith("application/json"):
+                body = json.loads(raw)
+            elif content_type.startswith("multipart/form-data"):
+                body, files = _parse_multipart(content_type, raw)
+            else:
+                body = {k: v[-1] for k, v in parse_qs(raw.decode("utf-8")).items()}
+
+        try:
+            status, payload = self.fake.handle(
+                self.command, parts.path, query, body, files, self.headers
+            )
+        except Exception as e:
+            logger.exception(f"Fake Server Fehler bei {self.command} {parts.path}")
+            status, payload = 500, f"Fake server error: {e}"
+        self._send(status, payload)
+
+    def _send(self, status: int, payload: Any):
+        if payload is None:
+            data, content_type = b"", None
+        elif isinstance(payload, tuple):
+            content_type, data = payload
+        elif isinstance(payload, (dict, list)):
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        else:
+            data, content_type = str(payload).encode("utf-8"), "text/plain"
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
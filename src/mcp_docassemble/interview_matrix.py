@@ -0,0 +1,223 @@
+"""
+Test-Matrix für Interviews
+
+Führt dasselbe Interview mit vielen Antwort-Kombinationen aus: jeder Fall
+bekommt eine eigene Session, die Fälle laufen parallel in einem Worker Pool
+mit fester Obergrenze. Pro Fall werden Status, finale Variablen und
+Referenzen auf erzeugte Dateien gesammelt; die Sessions werden danach
+gelöscht.
+
+Fälle können angegeben werden als
+- Liste: Antworten (wie bei run_interview_script) oder {"name": ..., "answers": ...}
+- Dict mit "matrix" (Variable → Liste möglicher Werte, kartesisches Produkt)
+  und optional "base" (gemeinsame Antworten für alle Fälle)
+"""
+
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from . import progress
+from .interview_script import InterviewScript
+from .loadtest import percentiles
+from .tracing import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+
+def expand_cases(cases: Any) -> List[Dict[str, Any]]:
+    """Normalisiert die Fall-Angabe zu [{"name": ..., "answers": ...}]"""
+    if isinstance(cases, dict):
+        matrix = cases.get("matrix") or {}
+        base = cases.get("base") or {}
+        names = list(matrix)
+        expanded = []
+        for values in itertools.product(*(matrix[name] for name in names)):
+            combination = dict(zip(names, values))
+            expanded.append(
+                {
+                    "name": ",".join(f"{k}={v}" for k, v in combination.items())
+                    or "base",
+                    "answers": {**base, **combination},
+                }
+            )
+        return expanded
+    if not isinstance(cases, list):
+        raise ValueError("cases muss eine Liste oder ein Dict mit 'matrix' sein")
+    return [
+        (
+            {"name": case.get("name") or f"case{n}", "answers": case["answers"]}
+            if isinstance(case, dict) and "answers" in case
+            else {"name": f"case{n}", "answers": case}
+        )
+        for n, case in enumerate(cases, 1)
+    ]
+
+
+def file_references(
+    question: Optional[Dict[str, Any]], variables: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Erzeugte Dateien aus den Attachments der letzten Frage und DAFile Variablen"""
+    references = []
+    for attachment in (question or {}).get("attachments") or []:
+        numbers = attachment.get("number") or {}
+        urls = attachment.get("url") or {}
+        for extension, number in numbers.items():
+            references.append(
+                {
+                    "source": "attachment",
+                    "name": attachment.get("filename") or attachment.get("name"),
+                    "format": extension,
+                    "number": number,
+                    "url": urls.get(extension),
+                }
+            )
+
+    def scan(value: Any, path: str):
+        if isinstance(value, dict):
+            if "DAFile" in str(value.get("_class", "")) and value.get("number"):
+                references.append(
+                    {
+                        "source": "variable",
+                        "variable": path,
+                        "name": value.get("filename"),
+                        "number": value["number"],
+                        "mimetype": value.get("mimetype"),
+                    }
+                )
+                return
+            for key, item in value.items():
+                scan(item, f"{path}.{key}" if path else key)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                scan(item, f"{path}[{index}]")
+
+    scan(variables or {}, "")
+    return references
+
+
+class InterviewMatrix:
+    """
+    Führt viele Fälle eines Interviews parallel aus.
+
+    Args:
+        client: DocassembleClient
+        i: Interview Dateiname
+        cases: Fälle (siehe expand_cases)
+        max_workers: Maximale Anzahl gleichzeitiger Sessions
+        variables: Namen der Variablen, die pro Fall gesammelt werden
+            (None = alle außer internen, [] = keine)
+        cleanup: Ob die Sessions nach dem Fall gelöscht werden
+        max_steps: Maximale Anzahl Fragen pro Fall
+        url_args: url_args für jede neue Session
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        i: str,
+        cases: Any,
+        max_workers: int = 8,
+        variables: Optional[List[str]] = None,
+        cleanup: bool = True,
+        max_steps: int = 50,
+        url_args: Optional[Dict[str, Any]] = None,
+    ):
+        self.client = client
+        self.i = i
+        self.cases = expand_cases(cases)
+        self.max_workers = max(1, max_workers)
+        self.variables = variables
+        self.cleanup = cleanup
+        self.max_steps = max_steps
+        self.url_args = url_args
+
+    def _collect_variables(self, session: str, secret: Optional[str]) -> Dict:
+        if self.variables is not None and not self.variables:
+            return {}
+        values = self.client.get_interview_variables(self.i, session, secret=secret)
+        if self.variables is None:
+            return {k: v for k, v in values.items() if not k.startswith("_")}
+        return {name: values.get(name) for name in self.variables}
+
+    def _run_case(self, case: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"name": case["name"]}
+        # Die Session ID steht in script.session, sobald sie angelegt ist; so
+        # wird sie auch gelöscht, wenn der Fall danach mit einer Exception endet
+        script = InterviewScript(
+            self.client,
+            self.i,
+            case["answers"],
+            max_steps=self.max_steps,
+            url_args=self.url_args,
+        )
+        try:
+            outcome = script.run()
+            session = outcome["session"]
+            question = outcome["question"]
+            variables = None
+            if outcome["status"] != "error":
+                variables = self._collect_variables(session, outcome.get("secret"))
+            result.update(
+                {
+                    "status": outcome["status"],
+                    "session": session,
+                    "steps": len(outcome["steps"]),
+                    "question": (question or {}).get("_question_name"),
+                    "variables": variables,
+                    "files": file_references(question, variables),
+                }
+            )
+            if outcome.get("error"):
+                result["error"] = outcome["error"]
+        except Exception as e:
+            # Ein fehlerhafter Fall darf die übrigen Fälle nicht abbrechen
+            logger.warning(f"Interview Matrix Fall {case['name']} fehlgeschlagen: {e}")
+            result.update(
+                {
+                    "status": "error",
+                    "session": script.session,
+                    "error": f"{type(e).__name__}: {e}",
+                }
+            )
+        finally:
+            session = script.session
+            if self.cleanup and session:
+                try:
+                    self.client.delete_interview_session(self.i, session)
+                    result["deleted"] = True
+                except Exception as e:
+                    logger.warning(f"Session {session} nicht gelöscht: {e}")
+                    result["deleted"] = False
+        result["seconds"] = round(time.perf_counter() - started, 4)
+        return result
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        progress.phase(len(self.cases), f"Interview Matrix {self.i}")
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                submit_in_context(executor, self._run_case, case) for case in self.cases
+            ]
+            for future in futures:
+                results.append(future.result())
+                progress.step(f"{results[-1]['name']}: {results[-1]['status']}")
+        duration = time.perf_counter() - started
+
+        by_status: Dict[str, int] = {}
+        for result in results:
+            by_status[result["status"]] = by_status.get(result["status"], 0) + 1
+        return {
+            "i": self.i,
+            "cases": len(results),
+            "by_status": by_status,
+            "max_workers": self.max_workers,
+            "duration_seconds": round(duration, 3),
+            "cases_per_second": round(len(results) / duration, 2) if duration else 0.0,
+            "case_latency_ms": percentiles([r["seconds"] for r in results]),
+            "results": results,
+        }
@@ -0,0 +1,200 @@
+"""
+Interview Skripte
+
+Führt eine Interview Session mit vorbereiteten Antworten bis zum Ende (oder
+bis zur ersten unbekannten Frage) durch. set_interview_variables liefert die
+nächste Frage direkt mit, daher braucht jeder Schritt genau einen Request
+statt set_interview_variables + get_current_question, und der MCP Client nur
+einen Tool Aufruf statt zwei pro Frage.
+
+Antworten können angegeben werden als
+- Liste: ein Dict mit Variablen pro Schritt, in Reihenfolge
+- Dict: Variable → Wert; pro Frage werden die passenden Variablen gesetzt
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from .client import DocassembleAPIError
+
+logger = logging.getLogger(__name__)
+
+# Fragetypen, nach denen das Interview keine weiteren Antworten erwartet
+TERMINAL_QUESTION_TYPES = {
+    "deadend",
+    "exit",
+    "exit_logout",
+    "leave",
+    "logout",
+    "new_session",
+    "redirect",
+    "response",
+    "restart",
+    "sendfile",
+}
+
+Answers = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+
+def question_variables(question: Dict[str, Any]) -> List[str]:
+    """Variablen, die eine Frage setzen möchte (aus fields und variable_name)"""
+    names = [
+        field["variable_name"]
+        for field in question.get("fields") or []
+        if isinstance(field, dict) and field.get("variable_name")
+    ]
+    if question.get("variable_name") and question["variable_name"] not in names:
+        names.append(question["variable_name"])
+    return names
+
+
+def question_label(question: Dict[str, Any]) -> Optional[str]:
+    name = question.get("_question_name") or question.get("questionName")
+    if name:
+        return name
+    text = question.get("questionText")
+    return text[:80] if isinstance(text, str) else None
+
+
+class InterviewScript:
+    """
+    Beantwortet Fragen einer Interview Session in einer Schleife.
+
+    Args:
+        client: DocassembleClient
+        i: Interview Dateiname
+        answers: Antwortplan (Liste) oder Zuordnung Variable → Wert (Dict)
+        session: Bestehende Session (None startet eine neue)
+        secret: Entschlüsselungskey der Session
+        max_steps: Obergrenze für beantwortete Fragen
+        url_args: url_args für eine neu gestartete Session
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        i: str,
+        answers: Answers,
+        session: Optional[str] = None,
+        secret: Optional[str] = None,
+        max_steps: int = 50,
+        url_args: Optional[Dict[str, Any]] = None,
+    ):
+        if not isinstance(answers, (list, dict)):
+            raise ValueError("answers muss eine Liste oder ein Dict sein")
+        self.client = client
+        self.i = i
+        self.answers = answers
+        self.session = session
+        self.secret = secret
+        self.max_steps = max_steps
+        self.url_args = url_args or {}
+
+    def _next_values(
+        self, step: int, question: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Variablen für den nächsten Schritt oder None, wenn keine passen"""
+        if isinstance(self.answers, list):
+            return self.answers[step] if step < len(self.answers) else None
+        values = {
+            name: self.answers[name]
+            for name in question_variables(question)
+            if name in self.answers
+        }
+        return values or None
+
+    def _unused_answers(self, steps: List[Dict[str, Any]]) -> Any:
+        if isinstance(self.answers, list):
+            return len(self.answers) - len(steps)
+        used = {name for step in steps for name in step["variables"]}
+        return sorted(set(self.answers) - used)
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        round_trips = 0
+        new_session = self.session is None
+        if new_session:
+            created = self.client.start_interview(
+                self.i, secret=self.secret, **self.url_args
+            )
+            self.session = created["session"]
+            self.secret = created.get("secret") or self.secret
+            round_trips += 1
+
+        steps: List[Dict[str, Any]] = []
+        status = "max_steps"
+        error = None
+        try:
+            question = self.client.get_current_question(
+                self.i, self.session, secret=self.secret
+            )
+            round_trips += 1
+            previous = None
+            while len(steps) < self.max_steps:
+                if question.get("questionType") in TERMINAL_QUESTION_TYPES:
+                    status = "completed"
+                    break
+                values = self._next_values(len(steps), question)
+                if values is None:
+                    status = (
+                        "plan_exhausted"
+                        if isinstance(self.answers, list)
+                        else "needs_input"
+                    )
+                    break
+                label = question_label(question)
+                if previous == (label, values):
+                    # Dieselbe Frage kam mit denselben Antworten zurück
+                    # (z.B. Validierungsfehler)
+                    status = "stuck"
+                    break
+                previous = (label, values)
+
+                step_started = time.perf_counter()
+                question = (
+                    self.client.set_interview_variables(
+                        self.i,
+                        self.session,
+                        secret=self.secret,
+                        variables=values,
+                        question_name=question.get("_question_name"),
+                    )
+                    or {}
+                )
+                round_trips += 1
+                steps.append(
+                    {
+                        "step": len(steps) + 1,
+                        "question": label,
+                        "variables": sorted(values),
+                        "seconds": round(time.perf_counter() - step_started, 4),
+                    }
+                )
+        except DocassembleAPIError as e:
+            # Bisheriger Fortschritt (Session, Schritte) bleibt für den Aufrufer nutzbar
+            logger.warning(f"Interview Skript für {self.i} abgebrochen: {e}")
+            status = "error"
+            error = str(e)
+            question = None
+
+        # Ohne Skript: start_interview, get_current_question und pro Schritt
+        # set_interview_variables + get_current_question
+        individual_calls = int(new_session) + 1 + 2 * len(steps)
+        result = {
+            "i": self.i,
+            "session": self.session,
+            "status": status,
+            "question": question,
+            "steps": steps,
+            "round_trips": round_trips,
+            "round_trips_saved": len(steps),
+            "tool_calls_saved": individual_calls - 1,
+            "unused_answers": self._unused_answers(steps),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        if self.secret:
+            result["secret"] = self.secret
+        if error:
+            result["error"] = error
+        return result
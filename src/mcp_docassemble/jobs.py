@@ -0,0 +1,303 @@
+"""
+Hintergrund Jobs für lang laufende Operationen
+
+Package Installationen mit anschließendem Restart, Playground Syncs oder
+Interview Matrizen sollen keinen MCP Request minutenlang belegen. Der
+JobManager führt solche Tool Aufrufe in einem eigenen, begrenzten Thread Pool
+aus (getrennt vom ToolExecutor); der Host fragt Status und Ergebnis später
+über docassemble_job_status und docassemble_job_result ab.
+
+- Höchstens max_workers Jobs laufen gleichzeitig, höchstens max_queue warten;
+  weitere werden mit ServerBusyError abgelehnt
+- Abgeschlossene Jobs bleiben retention_seconds abrufbar, höchstens
+  max_finished von ihnen; ältere werden verdrängt
+- Mit state_file wird der Zustand aller Jobs (ohne Argumente, die Passwörter
+  o.ä. enthalten können) nach jeder Statusänderung atomar als JSON
+  geschrieben. Nach einem Neustart sind abgeschlossene Jobs wieder abrufbar;
+  Jobs, die beim Beenden noch liefen, gelten als "interrupted". Die Datei
+  enthält die Ergebnisse im Klartext (z.B. Passwörter aus create_user, User
+  Secrets, API Keys, Server Konfiguration) und ist nur für den Besitzer
+  lesbar (0600)
+- Jobs gehören dem Mandanten, gegen den sie laufen; get() und list_jobs()
+  liefern nur Jobs des angegebenen Mandanten
+- Fortschrittsmeldungen der Operation (siehe progress.py) landen im Job
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .executor import ServerBusyError
+from .progress import ProgressReporter, reporting
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "completed", "failed", "interrupted")
+FINISHED = ("completed", "failed", "interrupted")
+
+
+class Job:
+    """Zustand eines Hintergrund Jobs"""
+
+    __slots__ = (
+        "job_id",
+        "tool",
+        "tenant",
+        "status",
+        "submitted_at",
+        "started_at",
+        "finished_at",
+        "result",
+        "error",
+        "progress",
+        "total",
+        "message",
+    )
+
+    def __init__(self, tool: str, tenant: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.tool = tool
+        self.tenant = tenant
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.progress: Optional[float] = None
+        self.total: Optional[float] = None
+        self.message: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        if not include_result:
+            del data["result"]
+        end = self.finished_at or time.time()
+        data["duration_seconds"] = (
+            round(end - self.started_at, 3) if self.started_at else None
+        )
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data["tool"], data.get("tenant"))
+        for name in cls.__slots__:
+            if name in data:
+                setattr(job, name, data[name])
+        return job
+
+
+class JobManager:
+    """
+    Begrenzter Thread Pool für Hintergrund Jobs mit Aufbewahrung der Ergebnisse.
+
+    Args:
+        max_workers: Gleichzeitig laufende Jobs
+        max_queue: Wartende Jobs, bevor neue abgelehnt werden
+        retention_seconds: Aufbewahrung abgeschlossener Jobs
+        max_finished: Maximale Anzahl aufbewahrter abgeschlossener Jobs
+        state_file: JSON Datei für den Zustand über Neustarts hinweg (None = aus)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 32,
+        retention_seconds: float = 3600,
+        max_finished: int = 100,
+        state_file: Optional[str] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retention_seconds = retention_seconds
+        self.max_finished = max(1, max_finished)
+        self.state_file = os.path.expanduser(state_file) if state_file else None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="mcp-job"
+        )
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self.stats = {"submitted": 0, "rejected": 0, "evicted": 0}
+        if self.state_file:
+            self._load()
+
+    def submit(
+        self, tool: str, fn: Callable[[], Any], tenant: Optional[str] = None
+    ) -> Job:
+        """
+        Startet fn() als Job im Hintergrund
+
+        Args:
+            tool: Name des Tools (für Status und Logging)
+            fn: Blockierende Operation; ihr Rückgabewert ist das Job Ergebnis
+            tenant: Mandant, gegen den der Job läuft (nur zur Anzeige)
+
+        Returns:
+            Der neue Job (Status "queued")
+
+        Raises:
+            ServerBusyError: Wenn bereits max_queue Jobs warten
+        """
+        job = Job(tool, tenant)
+        with self._lock:
+            queued = sum(1 for other in self._jobs.values() if other.status == "queued")
+            if queued >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise ServerBusyError(
+                    f"Job Warteschlange voll: {queued} Jobs warten auf einen Worker"
+                )
+            self._jobs[job.job_id] = job
+            self.stats["submitted"] += 1
+            self._evict()
+        self._executor.submit(self._run, job, fn)
+        logger.info(f"Job {job.job_id} ({tool}) eingereiht")
+        self._save()
+        return job
+
+    def get(self, job_id: str, tenant: Optional[str] = None) -> Job:
+        """
+        Args:
+            job_id: ID aus submit()
+            tenant: Mandant des Aufrufers; Jobs anderer Mandanten gelten als unbekannt
+
+        Raises:
+            KeyError: Unbekannter, bereits verdrängter oder fremder Job
+        """
+        with self._lock:
+            self._evict()
+            job = self._jobs[job_id]
+            if job.tenant != tenant:
+                raise KeyError(job_id)
+            return job
+
+    def list_jobs(self, tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Alle bekannten Jobs des Mandanten ohne Ergebnisse, neueste zuerst"""
+        with self._lock:
+            self._evict()
+            jobs = sorted(
+                (job for job in self._jobs.values() if job.tenant == tenant),
+                key=lambda job: -job.submitted_at,
+            )
+            return [job.to_dict() for job in jobs]
+
+    def _run(self, job: Job, fn: Callable[[], Any]):
+        with self._lock:
+            job.status = "running"
+            job.started_at = time.time()
+        self._save()
+
+        def record(progress: float, total: Optional[float], message: Optional[str]):
+            with self._lock:
+                job.progress, job.total, job.message = progress, total, message
+
+        try:
+            with reporting(ProgressReporter(record, min_interval=0)):
+                result = fn()
+            status, error = "completed", None
+        except Exception as e:
+            logger.warning(f"Job {job.job_id} ({job.tool}) fehlgeschlagen: {e}")
+            result, status, error = None, "failed", f"{type(e).__name__}: {e}"
+        with self._lock:
+            job.result, job.status, job.error = result, status, error
+            job.finished_at = time.time()
+            self._evict()
+        logger.info(
+            f"Job {job.job_id} ({job.tool}) {status} nach "
+            f"{job.finished_at - job.started_at:.2f}s"
+        )
+        self._save()
+
+    def _evict(self):
+        """Verdrängt abgelaufene bzw. überzählige abgeschlossene Jobs (unter _lock)"""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job.finished_at or 0,
+        )
+        cutoff = time.time() - self.retention_seconds
+        excess = len(finished) - self.max_finished
+        for n, job in enumerate(finished):
+            if n < excess or (job.finished_at or 0) < cutoff:
+                del self._jobs[job.job_id]
+                self.stats["evicted"] += 1
+
+    def _save(self):
+        if not self.state_file:
+            return
+        with self._save_lock:
+            with self._lock:
+                jobs = [job.to_dict(include_result=True) for job in self._jobs.values()]
+            tmp_path = f"{self.state_file}.tmp"
+            try:
+                # Ergebnisse können Secrets enthalten: nur für den Besitzer lesbar
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                if hasattr(os, "fchmod"):
+                    os.fchmod(fd, 0o600)
+                with open(fd, "w", encoding="utf-8") as handle:
+                    json.dump({"jobs": jobs}, handle, ensure_ascii=False, default=str)
+                os.replace(tmp_path, self.state_file)
+            except OSError as e:
+                logger.warning(
+                    f"Job Zustand nicht gespeichert ({self.state_file}): {e}"
+                )
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, encoding="utf-8") as handle:
+                entries = json.load(handle).get("jobs", [])
+            jobs = [Job.from_dict(entry) for entry in entries]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Job Zustand {self.state_file} unlesbar, starte leer: {e}")
+            return
+        for job in jobs:
+            if not job.finished:
+                # Lief beim Beenden noch; das Ergebnis ist verloren
+                job.status = "interrupted"
+                job.error = "Server wurde beendet, bevor der Job abgeschlossen war"
+                job.finished_at = time.time()
+            self._jobs[job.job_id] = job
+        with self._lock:
+            self._evict()
+        logger.info(f"{len(self._jobs)} Jobs aus {self.state_file} geladen")
+
+    def _counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATUSES, 0)
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def metrics(self):
+        """Collector: Jobs nach Status, eingereichte, abgelehnte und verdrängte Jobs"""
+        with self._lock:
+            counts = self._counts()
+            stats = dict(self.stats)
+        for status, count in counts.items():
+            yield "docassemble_mcp_jobs", {"status": status}, count
+        yield "docassemble_mcp_jobs_submitted_total", {}, stats["submitted"]
+        yield "docassemble_mcp_jobs_rejected_total", {}, stats["rejected"]
+        yield "docassemble_mcp_jobs_evicted_total", {}, stats["evicted"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counts(),
+                **self.stats,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+            }
+
+    def shutdown(self):
+        """Beendet den Pool; laufende Jobs gelten nach einem Neustart als interrupted"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._save()
@@ -0,0 +1,315 @@
+"""
+Lastgenerator für Docassemble Client Operationen
+
+Führt eine gewichtete Mischung von Client Operationen gegen einen echten
+Docassemble Server oder den lokalen Stand-in aus und berichtet Durchsatz,
+Latenz-Perzentile und Fehler nach Art.
+
+Zwei Betriebsarten:
+- geschlossen (nur concurrency): N Worker führen Operationen so schnell wie
+  möglich nacheinander aus
+- offen (rps gesetzt): Operationen werden in festem Takt gestartet; die Latenz
+  wird ab dem geplanten Startzeitpunkt gemessen, damit Warteschlangen im
+  Client nicht verschwinden (keine "coordinated omission")
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Die CLI liest DEFAULT_MIX schon für --help; requests wird erst mit dem
+    # Client geladen
+    from .client import DocassembleClient
+
+DEFAULT_INTERVIEW = "docassemble.demo:data/questions/questions.yml"
+DEFAULT_MIX = "interview_flow=4,list_users=2,list_interview_sessions=2,list_advertised_interviews=1,retrieve_file=1"
+
+Step = Tuple[str, Callable[["DocassembleClient", Dict[str, Any]], Any]]
+
+# Aufräumschritte laufen auch, wenn ein vorheriger Schritt fehlgeschlagen ist
+CLEANUP_STEPS = ("delete_interview_session",)
+
+
+def interview_flow_steps(interview: str) -> List[Step]:
+    """
+    start_interview → set_interview_variables → get_current_question →
+    delete_interview_session
+
+    Jeder Durchlauf löscht seine Session wieder, damit ein Lasttest gegen
+    einen echten Server keine Sessions hinterlässt.
+    """
+
+    def start(client, state):
+        started = client.start_interview(interview)
+        state["session"] = started["session"]
+        state["secret"] = started.get("secret")
+
+    def set_variables(client, state):
+        client.set_interview_variables(
+            interview,
+            state["session"],
+            secret=state["secret"],
+            variables={"loadtest_value": random.randint(0, 1000)},
+        )
+
+    def question(client, state):
+        client.get_current_question(interview, state["session"], secret=state["secret"])
+
+    def delete(client, state):
+        if state.get("session"):
+            client.delete_interview_sessions(i=interview, session=state["session"])
+
+    return [
+        ("start_interview", start),
+        ("set_interview_variables", set_variables),
+        ("get_current_question", question),
+        ("delete_interview_session", delete),
+    ]
+
+
+def build_operations(interview: str, file_number: int) -> Dict[str, List[Step]]:
+    """Verfügbare Operationen, jeweils als Liste benannter Schritte"""
+    return {
+        "interview_flow": interview_flow_steps(interview),
+        "list_users": [("list_users", lambda c, s: c.list_users())],
+        "list_interview_sessions": [
+            ("list_interview_sessions", lambda c, s: c.list_interview_sessions())
+        ],
+        "list_advertised_interviews": [
+            (
+                "list_advertised_interviews",
+                lambda c, s: c.list_advertised_interviews(use_cache=False),
+            )
+        ],
+        "get_current_user": [("get_current_user", lambda c, s: c.get_current_user())],
+        "retrieve_file": [
+            ("retrieve_stored_file", lambda c, s: c.retrieve_stored_file(file_number))
+        ],
+        "list_playground_files": [
+            ("list_playground_files", lambda c, s: c.list_playground_files())
+        ],
+    }
+
+
+def parse_mix(spec: str, available: List[str]) -> Dict[str, float]:
+    """Zerlegt 'op=gewicht,op2=gewicht' in ein Dict"""
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in available:
+            raise ValueError(
+                f"Unbekannte Operation '{name}' (verfügbar: {', '.join(sorted(available))})"
+            )
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Mix enthält keine Operation mit positivem Gewicht")
+    return mix
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """Nearest-rank Perzentile in Millisekunden"""
+    if not samples:
+        return {"p50": None, "p90": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        index = max(0, min(len(ordered) - 1, int(q * len(ordered) + 0.5) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": rank(0.50),
+        "p90": rank(0.90),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def error_kind(error: Exception) -> str:
+    from .client import DocassembleAPIError
+
+    if isinstance(error, DocassembleAPIError):
+        return f"HTTP {error.status_code}" if error.status_code else "connection"
+    return type(error).__name__
+
+
+class LoadTest:
+    """
+    Führt den Lasttest aus.
+
+    Args:
+        client: DocassembleClient (wird von allen Workern geteilt)
+        mix: Gewichte je Operation (siehe build_operations)
+        concurrency: Maximale Anzahl gleichzeitiger Operationen
+        rps: Startrate pro Sekunde (None = geschlossen, so schnell wie möglich)
+        duration: Laufzeit in Sekunden (wenn requests nicht gesetzt)
+        requests: Anzahl Operationen insgesamt (hat Vorrang vor duration)
+        interview: Interview für interview_flow
+        file_number: Datei für retrieve_file
+        seed: Seed für die Auswahl der Operationen
+    """
+
+    def __init__(
+        self,
+        client: "DocassembleClient",
+        mix: Dict[str, float],
+        concurrency: int = 10,
+        rps: Optional[float] = None,
+        duration: float = 30.0,
+        requests: Optional[int] = None,
+        interview: str = DEFAULT_INTERVIEW,
+        file_number: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.client = client
+        self.operations = build_operations(interview, file_number)
+        self.mix = mix
+        self.concurrency = max(1, concurrency)
+        self.rps = rps
+        self.duration = duration
+        self.requests = requests
+        self._rng = random.Random(seed)
+        self._names = list(mix)
+        self._weights = [mix[name] for name in self._names]
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = {name: [] for name in mix}
+        self._errors: Dict[str, int] = {}
+        self._error_counts: Dict[str, int] = {name: 0 for name in mix}
+        self._issued = 0
+
+    def _next_operation(self) -> Optional[str]:
+        """Wählt die nächste Operation oder None, wenn das Limit erreicht ist"""
+        with self._lock:
+            if self.requests is not None and self._issued >= self.requests:
+                return None
+            self._issued += 1
+            return self._rng.choices(self._names, self._weights)[0]
+
+    def _run_operation(self, name: str, scheduled: float):
+        state: Dict[str, Any] = {}
+        error_key = None
+        for step, func in self.operations[name]:
+            if error_key and step not in CLEANUP_STEPS:
+                continue
+            try:
+                func(self.client, state)
+            except Exception as e:
+                error_key = error_key or f"{name}.{step}: {error_kind(e)}"
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            self._latencies[name].append(latency)
+            if error_key:
+                self._error_counts[name] += 1
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+
+    def _closed_loop(self, deadline: float):
+        def worker():
+            while time.perf_counter() < deadline:
+                name = self._next_operation()
+                if name is None:
+                    return
+                self._run_operation(name, time.perf_counter())
+
+        threads = [
+            threading.Thread(target=worker, name=f"loadtest-{n}", daemon=True)
+            for n in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _open_loop(self, deadline: float, rps: float):
+        interval = 1.0 / rps
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            next_start = time.perf_counter()
+            while next_start < deadline:
+                name = self._next_operation()
+                if name is None:
+                    break
+                delay = next_start - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._run_operation, name, next_start)
+                next_start += interval
+
+    def run(self) -> Dict[str, Any]:
+        """Führt den Test aus und liefert den Bericht"""
+        started = time.perf_counter()
+        # Mit requests-Limit läuft der Test bis alle Operationen erledigt sind
+        deadline = (
+            float("inf") if self.requests is not None else started + self.duration
+        )
+        if self.rps:
+            self._open_loop(deadline, self.rps)
+        else:
+            self._closed_loop(deadline)
+        elapsed = time.perf_counter() - started
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            all_latencies = [x for values in self._latencies.values() for x in values]
+            total = len(all_latencies)
+            errors = sum(self._error_counts.values())
+            return {
+                "base_url": self.client.base_url,
+                "mode": "open" if self.rps else "closed",
+                "concurrency": self.concurrency,
+                "target_rps": self.rps,
+                "duration_seconds": round(elapsed, 3),
+                "operations": total,
+                "errors": errors,
+                "error_rate": round(errors / total, 4) if total else 0.0,
+                "throughput_ops": round(total / elapsed, 2) if elapsed else 0.0,
+                "latency_ms": percentiles(all_latencies),
+                "per_operation": {
+                    name: {
+                        "count": len(values),
+                        "errors": self._error_counts[name],
+                        "latency_ms": percentiles(values),
+                    }
+                    for name, values in self._latencies.items()
+                },
+                "errors_by_type": dict(
+                    sorted(self._errors.items(), key=lambda item: -item[1])
+                ),
+            }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Menschenlesbare Zusammenfassung des Berichts"""
+    latency = report["latency_ms"]
+    lines = [
+        f"Ziel: {report['base_url']} ({report['mode']}, concurrency {report['concurrency']}"
+        + (f", {report['target_rps']} rps" if report["target_rps"] else "")
+        + ")",
+        f"Operationen: {report['operations']} in {report['duration_seconds']}s "
+        f"→ {report['throughput_ops']} ops/s, Fehler: {report['errors']} "
+        f"({report['error_rate']:.1%})",
+        f"Latenz ms: p50 {latency['p50']}  p90 {latency['p90']}  "
+        f"p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}",
+        "",
+        f"{'Operation':<28}{'Anzahl':>8}{'Fehler':>8}{'p50':>10}{'p95':>10}{'p99':>10}",
+    ]
+    for name, stats in report["per_operation"].items():
+        op_latency = stats["latency_ms"]
+        lines.append(
+            f"{name:<28}{stats['count']:>8}{stats['errors']:>8}"
+            f"{str(op_latency['p50']):>10}{str(op_latency['p95']):>10}"
+            f"{str(op_latency['p99']):>10}"
+        )
+    if report["errors_by_type"]:
+        lines.append("")
+        lines.append("Fehler nach Art:")
+        for key, count in report["errors_by_type"].items():
+            lines.append(f"  {count:>6}  {key}")
+    return "\n".join(lines)
@@ -15,16 +15,14 @@ Oder direkt:
     python main.py
 """
 
-import asyncio
 import logging
-import os
 import sys
 from pathlib import Path
 
 # Add src directory to path for local imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from mcp_docassemble import create_server
+logger = logging.getLogger(__name__)
 
 
 def setup_logging():
@@ -39,20 +37,18 @@ def setup_logging():
 
 
 def validate_environment():
-    """Validiert erforderliche Umgebungsvariablen"""
-    required_vars = {
-        "DOCASSEMBLE_BASE_URL": "Base URL der Docassemble Installation",
-        "DOCASSEMBLE_API_KEY": "API Key für Authentifizierung",
-    }
-
-    missing_vars = []
-    for var, description in required_vars.items():
-        if not os.getenv(var):
-            missing_vars.append(f"  {var}: {description}")
-
-    if missing_vars:
-        print("Fehler: Erforderliche Umgebungsvariablen fehlen:", file=sys.stderr)
-        print("\n".join(missing_vars), file=sys.stderr)
+    """
+    Lädt und prüft die Konfiguration (.env und Umgebungsvariablen)
+
+    Returns:
+        ServerConfig (siehe mcp_docassemble.config)
+    """
+    from mcp_docassemble.config import load_config
+
+    try:
+        return load_config()
+    except ValueError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
         print("\nBeispiel:", file=sys.stderr)
         print(
             "export DOCASSEMBLE_BASE_URL=https://docassemble.example.com",
@@ -65,14 +61,15 @@ def validate_environment():
 async def main():
     """Hauptfunktion - startet den MCP Server"""
     setup_logging()
-    validate_environment()
+    config = validate_environment()
 
-    logger = logging.getLogger(__name__)
+    # Erst hier: der Import lädt das mcp SDK
+    from mcp_docassemble import create_server
 
     try:
         logger.info("Starte Docassemble MCP Server...")
         server = create_server()
-        await server.run()
+        await server.run(config)
 
     except KeyboardInterrupt:
         logger.info("Server durch Benutzer gestoppt")
@@ -83,4 +80,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    import asyncio
+
     asyncio.run(main())
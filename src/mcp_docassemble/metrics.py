@@ -0,0 +1,539 @@
+"""
+Latenz- und Durchsatz-Metriken
+
+MetricsRegistry sammelt Zähler und Histogramme für Docassemble API Requests
+(pro Endpunkt und Phase: Verbindungsaufbau, Serverzeit, JSON Decoding) und
+MCP Tool Aufrufe (Ausführung und Serialisierung). Die Werte sind über das
+MCP Tool docassemble_client_metrics als JSON abrufbar und können optional im
+Prometheus Textformat in eine Datei geschrieben oder per HTTP bereitgestellt
+werden.
+"""
+
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .cancellation import ToolCancelledError, current_scope
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+METRIC_HELP = {
+    "docassemble_client_request_seconds": (
+        "histogram",
+        "Gesamtdauer von Docassemble API Requests",
+    ),
+    "docassemble_client_server_seconds": (
+        "histogram",
+        "Zeit bis zum Eingang der Response Header (Serverzeit inkl. Netzwerk)",
+    ),
+    "docassemble_client_decode_seconds": (
+        "histogram",
+        "Dauer des JSON Decodings von Responses",
+    ),
+    "docassemble_client_connect_seconds": (
+        "histogram",
+        "Dauer von DNS Auflösung, TCP und TLS Verbindungsaufbau",
+    ),
+    "docassemble_client_connections_total": ("counter", "Neu aufgebaute Verbindungen"),
+    "docassemble_client_responses_total": ("counter", "Responses nach Statuscode"),
+    "docassemble_client_bytes_sent_total": ("counter", "Gesendete Body Bytes"),
+    "docassemble_client_bytes_received_total": ("counter", "Empfangene Body Bytes"),
+    "docassemble_client_retries_total": ("counter", "Wiederholte Requests"),
+    "docassemble_client_cache_hits_total": ("counter", "Treffer im Client Cache"),
+    "docassemble_client_cache_misses_total": (
+        "counter",
+        "Fehlzugriffe im Client Cache",
+    ),
+    "docassemble_client_sessions_live": (
+        "gauge",
+        "Vom Client erzeugte, noch nicht gelöschte Interview Sessions",
+    ),
+    "docassemble_client_sessions_reaped_total": (
+        "counter",
+        "Vom Session Reaper bearbeitete Sessions nach Ergebnis",
+    ),
+    "docassemble_client_failovers_total": (
+        "counter",
+        "Requests, die auf einem anderen Knoten wiederholt wurden",
+    ),
+    "docassemble_client_node_requests_total": ("counter", "Requests pro Knoten"),
+    "docassemble_client_node_errors_total": (
+        "counter",
+        "Verbindungsfehler und 502/503/504 pro Knoten",
+    ),
+    "docassemble_client_node_healthy": ("gauge", "1 wenn der Knoten verfügbar ist"),
+    "docassemble_client_node_outstanding": ("gauge", "Offene Requests pro Knoten"),
+    "docassemble_client_requests_cancelled_total": (
+        "counter",
+        "Durch den Abbruch eines Tool Aufrufs beendete Requests",
+    ),
+    "docassemble_client_rate_limited_total": (
+        "counter",
+        "Requests, die auf das Rate Limit gewartet haben",
+    ),
+    "docassemble_client_rate_limit_wait_seconds_total": (
+        "counter",
+        "Summe der Wartezeit durch das Rate Limit",
+    ),
+    "docassemble_mcp_tenant_clients": ("gauge", "Aktive Clients pro Mandant (0/1)"),
+    "docassemble_mcp_tenant_clients_created_total": (
+        "counter",
+        "Erzeugte Mandanten Clients",
+    ),
+    "docassemble_mcp_tenant_clients_evicted_total": (
+        "counter",
+        "Wegen Inaktivität oder Obergrenze geschlossene Mandanten Clients",
+    ),
+    "docassemble_mcp_tool_running": ("gauge", "Laufende Tool Aufrufe"),
+    "docassemble_mcp_tool_queued": ("gauge", "Auf einen Worker wartende Tool Aufrufe"),
+    "docassemble_mcp_tool_rejected_total": (
+        "counter",
+        "Wegen voller Warteschlange abgelehnte Tool Aufrufe",
+    ),
+    "docassemble_mcp_tool_cancelled_total": (
+        "counter",
+        "Vom MCP Host abgebrochene Tool Aufrufe (wartend oder laufend)",
+    ),
+    "docassemble_mcp_tool_queue_seconds_total": (
+        "counter",
+        "Summe der Wartezeit von Tool Aufrufen auf einen Worker",
+    ),
+    "docassemble_mcp_jobs": ("gauge", "Hintergrund Jobs nach Status"),
+    "docassemble_mcp_jobs_submitted_total": ("counter", "Eingereichte Jobs"),
+    "docassemble_mcp_jobs_rejected_total": (
+        "counter",
+        "Wegen voller Job Warteschlange abgelehnte Jobs",
+    ),
+    "docassemble_mcp_jobs_evicted_total": (
+        "counter",
+        "Nach Ablauf der Aufbewahrung verdrängte Jobs",
+    ),
+    "docassemble_mcp_tool_seconds": ("histogram", "Ausführungsdauer von MCP Tools"),
+    "docassemble_mcp_tool_serialize_seconds": (
+        "histogram",
+        "Dauer der JSON Serialisierung von Tool Ergebnissen",
+    ),
+    "docassemble_mcp_tool_calls_total": ("counter", "MCP Tool Aufrufe nach Ergebnis"),
+    "docassemble_mcp_tool_response_bytes_total": (
+        "counter",
+        "Größe der serialisierten Tool Ergebnisse",
+    ),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Ersetzt numerische Pfadsegmente, damit Label-Kardinalität begrenzt bleibt"""
+    return _ID_SEGMENT.sub("/{id}", endpoint.split("?", 1)[0])
+
+
+def _labels(labels: Optional[Dict[str, Any]]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _matches(labels: Labels, match: Optional[Labels]) -> bool:
+    return not match or set(match) <= set(labels)
+
+
+class Histogram:
+    """Kumulatives Histogramm mit festen Bucket-Grenzen (Prometheus Semantik)"""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Any:
+        """Obere Bucket-Grenze, unter der q Anteil der Beobachtungen liegt"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return "+Inf"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-sichere Sammlung von Zählern und Histogrammen.
+
+    Collectors sind Funktionen, die beim Export zusätzliche Zählerstände
+    liefern (z.B. Cache Treffer aus dem Cache Backend), statt sie doppelt
+    mitzuzählen.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Dict, float]]]] = []
+        self.started_at = time.time()
+
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, value=1):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict] = None):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, Dict, float]]]):
+        """Registriert eine Funktion, die (name, labels, wert) Zählerstände liefert"""
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable):
+        try:
+            self._collectors.remove(collector)
+        except ValueError:
+            pass
+
+    def _collected(self, match: Optional[Labels] = None) -> Dict[str, Dict]:
+        collected: Dict[str, Dict[Labels, float]] = {}
+        for collector in list(self._collectors):
+            try:
+                for name, labels, value in collector():
+                    key = _labels(labels)
+                    if _matches(key, match):
+                        collected.setdefault(name, {})[key] = value
+            except Exception as e:
+                logger.debug(f"Metrics Collector fehlgeschlagen: {e}")
+        return collected
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    # ----------------------------------------------------------------
+    # Export
+    # ----------------------------------------------------------------
+
+    def _series(self, match: Optional[Labels], histogram: Callable) -> Tuple:
+        """Kopie der Zähler und Histogramme, optional gefiltert nach Labels"""
+        with self._lock:
+            counters = {
+                name: {k: v for k, v in series.items() if _matches(k, match)}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {k: histogram(h) for k, h in series.items() if _matches(k, match)}
+                for name, series in self._histograms.items()
+            }
+        counters.update(self._collected(match))
+        return (
+            {name: series for name, series in counters.items() if series},
+            {name: series for name, series in histograms.items() if series},
+        )
+
+    def snapshot(self, match: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Alle Metriken (bzw. die Serien mit den Labels aus match) als Dict"""
+        counters, histograms = self._series(_labels(match), Histogram.to_dict)
+
+        def flatten(series):
+            return [
+                {"labels": dict(labels), **(v if isinstance(v, dict) else {"value": v})}
+                for labels, v in sorted(series.items())
+            ]
+
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "counters": {name: flatten(s) for name, s in sorted(counters.items())},
+            "histograms": {name: flatten(s) for name, s in sorted(histograms.items())},
+        }
+
+    def to_prometheus(self, match: Optional[Dict[str, Any]] = None) -> str:
+        """Alle Metriken (bzw. die Serien mit den Labels aus match) als Prometheus Text"""
+        counters, histograms = self._series(
+            _labels(match), lambda h: (list(h.counts), h.count, h.sum)
+        )
+
+        lines: List[str] = []
+
+        def header(name: str, default_type: str):
+            kind, text = METRIC_HELP.get(name, (default_type, name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name in sorted(counters):
+            header(name, "counter")
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for name in sorted(histograms):
+            header(name, "histogram")
+            for labels, (counts, count, total) in sorted(histograms[name].items()):
+                running = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    running += bucket_count
+                    bucket_labels = labels + (("le", repr(bound)),)
+                    lines.append(
+                        f"{name}_bucket{_format_labels(bucket_labels)} {running}"
+                    )
+                inf_labels = labels + (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{_format_labels(inf_labels)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class LabelledMetrics:
+    """
+    Sicht auf eine gemeinsame MetricsRegistry mit festen Labels.
+
+    Mehrere Clients (z.B. einer pro Mandant) schreiben so in eine Registry und
+    einen Exporter; snapshot() und to_prometheus() zeigen nur die eigenen
+    Serien. close() entfernt die Collectors der Sicht wieder.
+
+    Args:
+        registry: Gemeinsame MetricsRegistry
+        labels: Feste Labels, z.B. {"tenant": "acme"}
+    """
+
+    def __init__(self, registry: MetricsRegistry, labels: Dict[str, Any]):
+        self.registry = registry
+        self.labels = {k: str(v) for k, v in labels.items()}
+        self._collectors: List[Callable] = []
+
+    @property
+    def started_at(self) -> float:
+        return self.registry.started_at
+
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, value=1):
+        self.registry.inc(name, {**(labels or {}), **self.labels}, value)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict] = None):
+        self.registry.observe(name, value, {**(labels or {}), **self.labels})
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, Dict, float]]]):
+        def labelled():
+            for name, labels, value in collector():
+                yield name, {**labels, **self.labels}, value
+
+        self._collectors.append(labelled)
+        self.registry.add_collector(labelled)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.registry.snapshot(match=self.labels)
+
+    def to_prometheus(self) -> str:
+        return self.registry.to_prometheus(match=self.labels)
+
+    def close(self):
+        for collector in self._collectors:
+            self.registry.remove_collector(collector)
+        self._collectors.clear()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+# --------------------------------------------------------------------
+# Verbindungsaufbau messen
+# --------------------------------------------------------------------
+
+
+def _timed_pool(
+    pool_cls: type, connection_cls: type, registry: MetricsRegistry
+) -> type:
+    """
+    ConnectionPool Unterklasse, deren Verbindungen connect() messen
+
+    Außerdem meldet sich jede Verbindung für die Dauer eines Requests beim
+    CancelScope des laufenden Tool Aufrufs an, damit ein Abbruch den
+    blockierenden Request beenden kann.
+    """
+
+    class TimedConnection(connection_cls):
+        cancel_scope = None
+
+        def request(self, *args, **kwargs):
+            scope = current_scope()
+            if scope is not None:
+                scope.attach(self)
+                self.cancel_scope = scope
+            return super().request(*args, **kwargs)
+
+        def connect(self):
+            started = time.perf_counter()
+            super().connect()
+            # Abbruch zwischen attach() und dem Verbindungsaufbau: cancel() hat
+            # noch keinen Socket gesehen, den es schließen könnte
+            if self.cancel_scope is not None and self.cancel_scope.cancelled:
+                self.close()
+                raise ToolCancelledError()
+            labels = {"host": self.host}
+            registry.observe(
+                "docassemble_client_connect_seconds",
+                time.perf_counter() - started,
+                labels,
+            )
+            registry.inc("docassemble_client_connections_total", labels)
+
+    def _put_conn(self, conn):
+        scope = getattr(conn, "cancel_scope", None)
+        if scope is not None:
+            scope.detach(conn)
+            conn.cancel_scope = None
+        super(pool, self)._put_conn(conn)
+
+    pool = type(
+        pool_cls.__name__,
+        (pool_cls,),
+        {"ConnectionCls": TimedConnection, "_put_conn": _put_conn},
+    )
+    return pool
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, der DNS/Connect/TLS Dauer und neue Verbindungen erfasst"""
+
+    def __init__(self, registry: MetricsRegistry, *args, **kwargs):
+        self.registry = registry
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _timed_pool(HTTPConnectionPool, HTTPConnection, self.registry),
+            "https": _timed_pool(HTTPSConnectionPool, HTTPSConnection, self.registry),
+        }
+
+
+# --------------------------------------------------------------------
+# Prometheus Export
+# --------------------------------------------------------------------
+
+
+class MetricsFileWriter:
+    """Schreibt die Metriken periodisch atomar als Prometheus Textdatei"""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 15.0):
+        self.registry = registry
+        self.path = os.path.expanduser(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(self.registry.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Metrics Datei {self.path} nicht schreibbar: {e}")
+
+    def start(self) -> "MetricsFileWriter":
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._loop, name="metrics-file", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.write()
+
+
+def start_metrics_server(
+    registry: MetricsRegistry, port: int, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """Stellt /metrics im Prometheus Format auf host:port bereit"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"metrics {format % args}")
+
+    httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(
+        target=httpd.serve_forever, name="metrics-http", daemon=True
+    )
+    thread.start()
+    logger.info(f"Prometheus Metriken unter http://{host}:{httpd.server_port}/metrics")
+    return httpd
@@ -0,0 +1,270 @@
+"""
+Playground Projekt Synchronisation
+
+Gleicht einen lokalen Projektordner (questions, templates, static, modules,
+sources) mit einem Docassemble Playground Projekt ab. Ein lokales Manifest mit
+SHA-256 Hashes sorgt dafür, dass nur geänderte Dateien hochgeladen werden.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import progress
+from .tracing import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+SYNC_FOLDERS = ("questions", "templates", "static", "modules", "sources")
+MANIFEST_FILENAME = ".docassemble-sync.json"
+
+
+def file_sha256(path: Path) -> str:
+    """Berechnet den SHA-256 Hash einer Datei"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncManifest:
+    """
+    Lokales Manifest der zuletzt hochgeladenen Datei-Hashes.
+
+    Einträge sind pro Ziel (Base URL + Projekt) getrennt, damit derselbe
+    Ordner gegen mehrere Server synchronisiert werden kann.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._data: Dict[str, Dict[str, str]] = {}
+        if path.exists():
+            try:
+                self._data = json.loads(path.read_text(encoding="utf-8")).get(
+                    "targets", {}
+                )
+            except (OSError, ValueError) as e:
+                logger.warning(f"Sync Manifest {path} unlesbar, starte neu: {e}")
+
+    def hashes(self, target: str) -> Dict[str, str]:
+        return self._data.setdefault(target, {})
+
+    def save(self):
+        """Schreibt das Manifest atomar"""
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"targets": self._data}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+
+def _remote_names(listing: Any) -> List[str]:
+    """Normalisiert die Antwort von list_playground_files auf Dateinamen"""
+    if not isinstance(listing, list):
+        return []
+    names = []
+    for entry in listing:
+        if isinstance(entry, str):
+            names.append(entry)
+        elif isinstance(entry, dict):
+            name = entry.get("filename") or entry.get("name")
+            if name:
+                names.append(name)
+    return names
+
+
+class PlaygroundSync:
+    """Synchronisiert einen lokalen Ordner mit einem Playground Projekt"""
+
+    def __init__(
+        self,
+        client: Any,
+        local_dir: str,
+        project: str = "default",
+        user_id: Optional[int] = None,
+        delete_orphans: bool = True,
+        max_workers: int = 4,
+        manifest_path: Optional[str] = None,
+    ):
+        self.client = client
+        self.local_dir = Path(local_dir)
+        self.project = project
+        self.user_id = user_id
+        self.delete_orphans = delete_orphans
+        self.max_workers = max(1, max_workers)
+        self.manifest = SyncManifest(
+            Path(manifest_path) if manifest_path else self.local_dir / MANIFEST_FILENAME
+        )
+        self.target = f"{client.base_url}|{project}"
+
+    def _local_folders(self) -> List[str]:
+        """Playground Ordner, die lokal als Verzeichnis existieren"""
+        return [folder for folder in SYNC_FOLDERS if (self.local_dir / folder).is_dir()]
+
+    def _local_files(self, folders) -> Dict[Tuple[str, str], Path]:
+        """Sammelt alle lokalen Dateien je (Ordner, Dateiname)"""
+        files = {}
+        for folder in folders:
+            for path in sorted((self.local_dir / folder).iterdir()):
+                if path.is_file() and not path.name.startswith("."):
+                    files[(folder, path.name)] = path
+        return files
+
+    def _remote_files(self, folders) -> Dict[str, List[str]]:
+        """Listet die Dateien der betroffenen Playground Ordner"""
+        remote = {}
+        for folder in folders:
+            listing = self.client.list_playground_files(
+                user_id=self.user_id, folder=folder, project=self.project
+            )
+            remote[folder] = _remote_names(listing)
+        return remote
+
+    def _upload(self, folder: str, path: Path):
+        with open(path, "rb") as handle:
+            content = handle.read()
+        return self.client.upload_playground_files(
+            files={"file": (path.name, content)},
+            user_id=self.user_id,
+            folder=folder,
+            project=self.project,
+        )
+
+    def _delete(self, folder: str, filename: str):
+        return self.client.delete_playground_file(
+            filename,
+            user_id=self.user_id,
+            folder=folder,
+            project=self.project,
+        )
+
+    def run(
+        self, dry_run: bool = False, wait_for_restart: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Führt die Synchronisation aus
+
+        Restarts durch Modul-Änderungen werden über client.restart_batch()
+        zu einem einzigen Restart am Ende zusammengefasst. Abgeglichen (und
+        ggf. bereinigt) werden nur Ordner, die lokal existieren; fehlt z.B.
+        static/ lokal, bleiben die Remote Dateien in static unangetastet.
+
+        Args:
+            dry_run: Nur geplante Änderungen ermitteln, nichts hochladen/löschen
+            wait_for_restart: Ob auf Abschluss des Restarts gewartet werden soll
+
+        Returns:
+            Dict mit hochgeladenen, unveränderten, gelöschten und fehlgeschlagenen Dateien
+        """
+        started = time.monotonic()
+        folders = self._local_folders()
+        local_files = self._local_files(folders)
+        known_hashes = self.manifest.hashes(self.target)
+        remote = self._remote_files(folders)
+
+        uploads = []
+        unchanged = []
+        current_hashes = {}
+        for (folder, name), path in local_files.items():
+            key = f"{folder}/{name}"
+            digest = file_sha256(path)
+            current_hashes[key] = digest
+            if known_hashes.get(key) == digest and name in remote.get(folder, []):
+                unchanged.append(key)
+            else:
+                uploads.append((folder, name, path))
+
+        deletions = []
+        if self.delete_orphans:
+            for folder, names in remote.items():
+                for name in names:
+                    if (folder, name) not in local_files:
+                        deletions.append((folder, name))
+
+        result: Dict[str, Any] = {
+            "project": self.project,
+            "uploaded": [],
+            "unchanged": unchanged,
+            "deleted": [],
+            "failed": [],
+            "restart": None,
+            "dry_run": dry_run,
+        }
+
+        if dry_run:
+            result["uploaded"] = [f"{folder}/{name}" for folder, name, _ in uploads]
+            result["deleted"] = [f"{folder}/{name}" for folder, name in deletions]
+            return result
+
+        progress.phase(len(uploads) + len(deletions), f"Playground Sync {self.project}")
+        with (
+            self.client.restart_batch(wait=wait_for_restart) as restart,
+            ThreadPoolExecutor(max_workers=self.max_workers) as executor,
+        ):
+            futures = {
+                submit_in_context(executor, self._upload, folder, path): (
+                    "upload",
+                    folder,
+                    name,
+                )
+                for folder, name, path in uploads
+            }
+            futures.update(
+                {
+                    submit_in_context(executor, self._delete, folder, name): (
+                        "delete",
+                        folder,
+                        name,
+                    )
+                    for folder, name in deletions
+                }
+            )
+            for future in as_completed(futures):
+                action, folder, name = futures[future]
+                key = f"{folder}/{name}"
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning(
+                        f"Playground Sync {action} {key} fehlgeschlagen: {e}"
+                    )
+                    result["failed"].append(
+                        {"file": key, "action": action, "error": str(e)}
+                    )
+                    progress.step(f"{action} {key} fehlgeschlagen")
+                    continue
+
+                progress.step(f"{action} {key}")
+
+                if action == "upload":
+                    known_hashes[key] = current_hashes[key]
+                    result["uploaded"].append(key)
+                else:
+                    known_hashes.pop(key, None)
+                    result["deleted"].append(key)
+
+        result["restart"] = restart["restart"]
+
+        # Manifest Einträge für lokal entfernte Dateien bereinigen
+        for key in list(known_hashes):
+            if key not in current_hashes:
+                known_hashes.pop(key)
+
+        self.manifest.save()
+
+        result["uploaded"].sort()
+        result["deleted"].sort()
+        result["duration_seconds"] = round(time.monotonic() - started, 3)
+        logger.info(
+            f"Playground Sync {self.project}: {len(result['uploaded'])} hochgeladen, "
+            f"{len(unchanged)} unverändert, {len(result['deleted'])} gelöscht, "
+            f"{len(result['failed'])} fehlgeschlagen"
+        )
+        return result
@@ -0,0 +1,110 @@
+"""
+Fortschrittsmeldungen für lang laufende Tool Aufrufe
+
+Playground Syncs, Restarts, Template Batches und Interview Matrizen dauern
+leicht Minuten. Schickt der MCP Host mit dem Request ein progressToken, meldet
+der Server währenddessen notifications/progress; Hosts können so kurze
+Timeouts verwenden, ohne noch laufende Operationen erneut auszulösen.
+
+Die Client Operationen rufen nur phase() und step() auf. Ohne aktiven
+ProgressReporter (kein Tool Aufruf, kein progressToken) sind beide no-ops.
+Der Reporter steht in einer ContextVar und erreicht damit auch Worker
+Threads, die mit submit_in_context gestartet werden.
+
+Der gemeldete Fortschritt steigt streng monoton (MCP Vorgabe), auch über
+mehrere Phasen hinweg: eine neue Phase beginnt beim bisherigen Stand, ihr
+total wird darauf addiert.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# send(progress, total, message)
+SendProgress = Callable[[float, Optional[float], Optional[str]], None]
+
+
+class ProgressReporter:
+    """
+    Zählt Fortschritt eines Tool Aufrufs und sendet ihn gedrosselt.
+
+    Args:
+        send: Funktion, die eine Fortschrittsmeldung verschickt
+        min_interval: Mindestabstand zwischen zwei Meldungen in Sekunden; das
+            Ende einer Phase wird immer gemeldet
+    """
+
+    def __init__(self, send: SendProgress, min_interval: float = 0.25):
+        self.send = send
+        self.min_interval = min_interval
+        self.progress = 0.0
+        self.total: Optional[float] = None
+        self.message: Optional[str] = None
+        self.sent = 0
+        self._last_sent = 0.0
+        self._lock = threading.Lock()
+
+    def phase(self, total: Optional[float] = None, message: Optional[str] = None):
+        """
+        Beginnt einen Abschnitt
+
+        Args:
+            total: Schritte des Abschnitts (None = unbekannt)
+            message: Default Text für die Meldungen des Abschnitts
+        """
+        with self._lock:
+            self.total = None if total is None else self.progress + total
+            self.message = message
+
+    def step(self, message: Optional[str] = None, amount: float = 1):
+        """Meldet amount erledigte Schritte der aktuellen Phase"""
+        with self._lock:
+            self.progress += amount
+            now = time.monotonic()
+            finished = self.total is not None and self.progress >= self.total
+            if not finished and now - self._last_sent < self.min_interval:
+                return
+            self._last_sent = now
+            self.sent += 1
+            progress, total = self.progress, self.total
+            message = message or self.message
+        try:
+            self.send(progress, total, message)
+        except Exception as e:
+            logger.debug(f"Fortschrittsmeldung fehlgeschlagen: {e}")
+
+
+_current: contextvars.ContextVar[Optional[ProgressReporter]] = contextvars.ContextVar(
+    "progress_reporter", default=None
+)
+
+
+def current_reporter() -> Optional[ProgressReporter]:
+    return _current.get()
+
+
+@contextmanager
+def reporting(reporter: Optional[ProgressReporter]) -> Iterator[None]:
+    """Macht reporter für den Block (und kopierte Kontexte) zum aktuellen Reporter"""
+    token = _current.set(reporter)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def phase(total: Optional[float] = None, message: Optional[str] = None):
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.phase(total, message)
+
+
+def step(message: Optional[str] = None, amount: float = 1):
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.step(message, amount)
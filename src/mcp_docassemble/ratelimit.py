@@ -0,0 +1,84 @@
+"""
+Rate Limit für Docassemble API Requests
+
+TokenBucket begrenzt die Request Rate eines Clients: pro Sekunde kommen rate
+Tokens hinzu, höchstens burst liegen bereit. Ist kein Token frei, wartet der
+aufrufende Thread, bis eines nachgefüllt ist (Backpressure statt Fehler).
+Wird der Tool Aufruf währenddessen abgebrochen, endet die Wartezeit sofort
+und das reservierte Token geht an den Bucket zurück.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import cancellation
+from .cancellation import ToolCancelledError
+
+
+class TokenBucket:
+    """
+    Thread-sicherer Token Bucket.
+
+    Args:
+        rate: Erlaubte Requests pro Sekunde (> 0)
+        burst: Maximale Anzahl Requests ohne Wartezeit (Default: aufgerundete rate)
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate muss größer als 0 sein")
+        self.rate = rate
+        self.burst = max(1, burst or math.ceil(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def _reserve(self) -> float:
+        """Reserviert ein Token und liefert die nötige Wartezeit in Sekunden"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Negativer Bestand reserviert Tokens für bereits wartende Threads
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.stats["acquired"] += 1
+            if wait:
+                self.stats["throttled"] += 1
+                self.stats["wait_seconds"] += wait
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Wartet, bis ein Request gesendet werden darf
+
+        Returns:
+            Gewartete Zeit in Sekunden
+
+        Raises:
+            ToolCancelledError: Wenn der Tool Aufruf beim Warten abgebrochen wird
+        """
+        cancellation.raise_if_cancelled()
+        wait = self._reserve()
+        if wait:
+            try:
+                cancellation.sleep(wait)
+            except ToolCancelledError:
+                with self._lock:
+                    self._tokens = min(self.burst, self._tokens + 1)
+                raise
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "wait_seconds": round(self.stats["wait_seconds"], 3),
+                "rate": self.rate,
+                "burst": self.burst,
+            }
@@ -0,0 +1,216 @@
+"""
+Restart Coalescing
+
+Docassemble startet den Server nach Modul-Uploads, Modul-Löschungen und
+Package-Installationen neu. Jeder Restart dauert zehn Sekunden oder mehr und
+blockiert alle laufenden Sessions. Der RestartCoalescer sammelt solche
+Operationen (mit restart=0) und löst danach genau einen Restart aus.
+
+Ein batch() gilt nur für den Aufrufer (contextvars Kontext, der mit
+submit_in_context auch an dessen Worker Threads geht). Parallele Tool Aufrufe
+auf demselben Client werden nicht in fremde Batches gezogen: ihre
+Operationen würden sonst womöglich erst nach dem Restart des Batches fertig
+und nie geladen.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import cancellation, progress
+
+logger = logging.getLogger(__name__)
+
+
+class RestartCoalescer:
+    """
+    Fasst Restart-auslösende Operationen zu einem einzigen Restart zusammen.
+
+    Zwei Betriebsarten:
+    - batch(): alle Operationen innerhalb des with-Blocks werden gesammelt,
+      beim Verlassen wird einmal restartet.
+    - debounce_seconds > 0: jede Operation startet ein Zeitfenster neu, nach
+      dessen Ablauf ohne weitere Operationen einmal restartet wird.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        debounce_seconds: float = 0,
+        poll_interval: float = 1.0,
+        wait_timeout: float = 300.0,
+    ):
+        self.client = client
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self._lock = threading.RLock()
+        # Operationen des batch(), in dem der aktuelle Aufrufer läuft
+        self._batch: contextvars.ContextVar[Optional[List[str]]] = (
+            contextvars.ContextVar(f"restart_batch_{id(self)}", default=None)
+        )
+        self._pending: List[str] = []
+        self._timer: Optional[threading.Timer] = None
+        self.stats = {
+            "deferred_operations": 0,
+            "restarts_triggered": 0,
+            "restarts_avoided": 0,
+        }
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def active(self) -> bool:
+        """Ob Operationen des aktuellen Aufrufers aufgeschoben werden"""
+        return self._batch.get() is not None or self.debounce_seconds > 0
+
+    def defer(self, operation: str) -> bool:
+        """
+        Registriert eine Restart-auslösende Operation
+
+        Args:
+            operation: Name der Operation (für Logging und Statistik)
+
+        Returns:
+            True wenn der Restart aufgeschoben wird (Aufrufer sendet restart=0)
+        """
+        batch = self._batch.get()
+        with self._lock:
+            if batch is not None:
+                batch.append(operation)
+            elif self.debounce_seconds > 0:
+                self._pending.append(operation)
+                self._schedule()
+            else:
+                return False
+            self.stats["deferred_operations"] += 1
+            return True
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce_seconds, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Aufgeschobener Restart fehlgeschlagen: {e}")
+
+    @contextmanager
+    def batch(self, wait: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Sammelt Restarts innerhalb des with-Blocks und restartet einmal am Ende
+
+        Liefert ein Dict, dessen Schlüssel "restart" nach Verlassen des Blocks
+        das Ergebnis des Restarts enthält (None wenn kein Restart nötig war).
+        Verschachtelte Blöcke gehören zum äußersten; nur er restartet.
+        """
+        outcome: Dict[str, Any] = {"restart": None}
+        if self._batch.get() is not None:
+            yield outcome
+            return
+        operations: List[str] = []
+        token = self._batch.set(operations)
+        try:
+            yield outcome
+        finally:
+            self._batch.reset(token)
+            with self._lock:
+                pending = list(operations)
+            if pending:
+                outcome["restart"] = self._restart(pending, wait)
+
+    def flush(self, wait: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Löst den aufgeschobenen Restart aus, falls Operationen anstehen
+
+        Schlägt das Auslösen fehl (HTTP Fehler, Abbruch), bleiben die
+        Operationen vorgemerkt; der nächste flush() (im Debounce Betrieb nach
+        erneutem Ablauf des Zeitfensters) versucht den Restart noch einmal.
+        Das gilt auch für die Operationen eines fehlgeschlagenen batch().
+
+        Args:
+            wait: Ob auf Abschluss des Restarts gewartet werden soll
+
+        Returns:
+            Dict mit Task ID, Status und vermiedenen Restarts oder None
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, []
+        if not pending:
+            return None
+        return self._restart(pending, wait)
+
+    def _restart(self, pending: List[str], wait: bool) -> Dict[str, Any]:
+        """Löst einen Restart für pending aus und wartet ggf. auf sein Ende"""
+        started = time.monotonic()
+        try:
+            task = self.client.trigger_server_restart()
+        except BaseException:
+            with self._lock:
+                self._pending = pending + self._pending
+                if self.debounce_seconds > 0:
+                    self._schedule()
+            logger.warning(
+                f"Restart für {len(pending)} Operationen nicht ausgelöst, "
+                "bleibt vorgemerkt"
+            )
+            raise
+        avoided = len(pending) - 1
+        with self._lock:
+            self.stats["restarts_triggered"] += 1
+            self.stats["restarts_avoided"] += avoided
+
+        result: Dict[str, Any] = {
+            "task_id": task.get("task_id") if isinstance(task, dict) else None,
+            "operations": pending,
+            "restarts_avoided": avoided,
+            "status": "triggered",
+        }
+        if wait and result["task_id"]:
+            result["status"] = self._wait(result["task_id"])
+        result["duration_seconds"] = round(time.monotonic() - started, 3)
+        logger.info(
+            f"Restart nach {len(pending)} Operationen ausgelöst, "
+            f"{avoided} Restarts vermieden"
+        )
+        self.last_result = result
+        return result
+
+    def _wait(self, task_id: str) -> str:
+        """Wartet per get_restart_status auf das Ende des Restarts"""
+        deadline = time.monotonic() + self.wait_timeout
+        status = "working"
+        progress.phase(message="Server Restart")
+        while time.monotonic() < deadline:
+            try:
+                info = self.client.get_restart_status(task_id)
+            except Exception as e:
+                # Während des Restarts ist der Server kurzzeitig nicht erreichbar
+                logger.debug(f"Restart Status noch nicht verfügbar: {e}")
+                info = None
+            if isinstance(info, dict):
+                status = info.get("status", status)
+            progress.step(f"Server Restart: {status}")
+            if status != "working":
+                return status
+            cancellation.sleep(self.poll_interval)
+        return "timeout"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistik über aufgeschobene und vermiedene Restarts"""
+        with self._lock:
+            return {
+                **self.stats,
+                "pending_operations": len(self._pending),
+                "debounce_seconds": self.debounce_seconds,
+                "last_restart": self.last_result,
+            }
@@ -9,44 +9,117 @@ import asyncio
 import json
 import logging
 import os
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-
-    # Look for .env file in project root
-    env_path = Path(__file__).parent.parent.parent / ".env"
-    if env_path.exists():
-        load_dotenv(env_path)
-        logging.info(f"Loaded environment from {env_path}")
-    else:
-        # Also try current working directory
-        load_dotenv()
-except ImportError:
-    # python-dotenv not installed - use environment variables only
-    pass
-
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import (
-    CallToolRequest,
     CallToolResult,
-    JSONRPCError,
+    InitializedNotification,
     ListToolsRequest,
     ListToolsResult,
     TextContent,
     Tool,
 )
-from pydantic import BaseModel
 
+from .cache import create_cache_backend
 from .client import DocassembleAPIError, DocassembleClient
+from .executor import ServerBusyError, ToolExecutor
+from .jobs import JobManager
+from .metrics import MetricsFileWriter, start_metrics_server
+from .progress import ProgressReporter, reporting
+from .slowcalls import SlowCallMonitor, ToolCall
+from .tracing import create_tracer
+from .warmup import WarmUp
+
+if TYPE_CHECKING:
+    from .config import ServerConfig
+    from .tenants import TenantPool
 
 logger = logging.getLogger(__name__)
 
+# Tool Name → Client Methode
+TOOL_METHODS = {
+    # Benutzer-Management
+    "docassemble_create_user": "create_user",
+    "docassemble_invite_users": "invite_users",
+    "docassemble_list_users": "list_users",
+    "docassemble_get_user_by_username": "get_user_by_username",
+    "docassemble_get_current_user": "get_current_user",
+    "docassemble_update_current_user": "update_current_user",
+    "docassemble_get_user_by_id": "get_user_by_id",
+    "docassemble_deactivate_user": "deactivate_user",
+    "docassemble_update_user": "update_user",
+    # Berechtigungen
+    "docassemble_list_privileges": "list_privileges",
+    "docassemble_give_user_privilege": "give_user_privilege",
+    "docassemble_remove_user_privilege": "remove_user_privilege",
+    # Interview Sessions
+    "docassemble_list_interview_sessions": "list_interview_sessions",
+    "docassemble_delete_interview_sessions": "delete_interview_sessions",
+    "docassemble_list_advertised_interviews": "list_advertised_interviews",
+    "docassemble_get_user_secret": "get_user_secret",
+    "docassemble_get_login_url": "get_login_url",
+    # Interview Operations
+    "docassemble_start_interview": "start_interview",
+    "docassemble_get_interview_variables": "get_interview_variables",
+    "docassemble_set_interview_variables": "set_interview_variables",
+    "docassemble_get_current_question": "get_current_question",
+    "docassemble_run_interview_action": "run_interview_action",
+    "docassemble_run_interview_script": "run_interview_script",
+    "docassemble_run_interview_matrix": "run_interview_matrix",
+    "docassemble_go_back_in_interview": "go_back_in_interview",
+    "docassemble_delete_interview_session": "delete_interview_session",
+    # Playground
+    "docassemble_list_playground_files": "list_playground_files",
+    "docassemble_delete_playground_file": "delete_playground_file",
+    "docassemble_list_playground_projects": "list_playground_projects",
+    "docassemble_create_playground_project": "create_playground_project",
+    "docassemble_delete_playground_project": "delete_playground_project",
+    "docassemble_clear_interview_cache": "clear_interview_cache",
+    "docassemble_sync_playground_project": "sync_playground_project",
+    # System Administration
+    "docassemble_get_server_config": "get_server_config",
+    "docassemble_list_installed_packages": "list_installed_packages",
+    "docassemble_install_package": "install_or_update_package",
+    "docassemble_uninstall_package": "uninstall_package",
+    "docassemble_get_package_update_status": "get_package_update_status",
+    "docassemble_trigger_server_restart": "trigger_server_restart",
+    "docassemble_get_restart_status": "get_restart_status",
+    "docassemble_flush_restarts": "flush_restarts",
+    "docassemble_get_cache_stats": "get_cache_stats",
+    "docassemble_get_session_stats": "get_session_stats",
+    "docassemble_get_node_stats": "get_node_stats",
+    "docassemble_reap_sessions": "reap_sessions",
+    "docassemble_client_metrics": "get_metrics",
+    # API Key Management
+    "docassemble_get_user_api_keys": "get_user_api_keys",
+    "docassemble_create_user_api_key": "create_user_api_key",
+    "docassemble_delete_user_api_key": "delete_user_api_key",
+    # File Operations
+    "docassemble_get_interview_data": "get_interview_data",
+    "docassemble_extract_template_fields": "extract_template_fields",
+    "docassemble_extract_template_fields_batch": "extract_template_fields_batch",
+    # Data Stashing
+    "docassemble_retrieve_stashed_data": "retrieve_stashed_data",
+}
+
+# Tool Argumente mit lokalen Pfaden; über HTTP nur unterhalb von local_root
+LOCAL_PATH_ARGUMENTS = {
+    "docassemble_sync_playground_project": ("local_dir",),
+    "docassemble_extract_template_fields": ("template_file",),
+    "docassemble_extract_template_fields_batch": ("directory",),
+}
+
+JOB_TOOLS = (
+    "docassemble_job_submit",
+    "docassemble_job_status",
+    "docassemble_job_result",
+)
+
 
 class DocassembleServer:
     """MCP Server für umfassende Docassemble API Integration"""
@@ -54,6 +127,16 @@ class DocassembleServer:
     def __init__(self):
         self.server = Server("docassemble-mcp")
         self.client: Optional[DocassembleClient] = None
+        self.tenants: Optional["TenantPool"] = None
+        self.default_tenant: Optional[str] = None
+        self.config: Optional["ServerConfig"] = None
+        self.warmup: Optional[WarmUp] = None
+        # Ohne local_root sind lokale Pfade nur über stdio erlaubt
+        self.local_root: Optional[str] = None
+        self.allow_local_paths = True
+        self.slow_calls = SlowCallMonitor()
+        self.executor = ToolExecutor()
+        self.jobs = JobManager()
         self._setup_handlers()
 
     def _setup_handlers(self):
@@ -454,6 +537,7 @@ class DocassembleServer:
                     Parameter (optional):
                     - tag: Tag Filter für Interviews
                     - absolute_urls: Ob absolute URLs zurückgegeben werden sollen (default: true)
+                    - use_cache: Lokalen Metadaten Cache verwenden (default: true)
                     
                     Rückgabe: Liste der verfügbaren Interviews mit Metadaten""",
                     inputSchema={
@@ -461,6 +545,7 @@ class DocassembleServer:
                         "properties": {
                             "tag": {"type": "string"},
                             "absolute_urls": {"type": "boolean"},
+                            "use_cache": {"type": "boolean"},
                         },
                     },
                 ),
@@ -626,6 +711,82 @@ class DocassembleServer:
                         "required": ["i", "session"],
                     },
                 ),
+                Tool(
+                    name="docassemble_run_interview_script",
+                    description="""Beantwortet mehrere Fragen eines Interviews in einem Aufruf.
+                    
+                    Startet optional eine neue Session und setzt Antworten Frage für Frage,
+                    bis das Interview endet, eine Frage ohne passende Antwort erscheint oder
+                    der Antwortplan aufgebraucht ist. Pro Frage fällt nur ein Request an.
+                    
+                    Erforderliche Berechtigungen: Keine
+                    
+                    Parameter:
+                    - i (erforderlich): Interview Dateiname
+                    - answers (erforderlich): Liste mit einem Variablen-Objekt pro Schritt
+                      oder Objekt Variable → Wert (passende Variablen werden pro Frage gesetzt)
+                    - session (optional): Bestehende Session ID (sonst neue Session)
+                    - secret (optional): Entschlüsselungskey
+                    - max_steps (optional): Maximale Anzahl Schritte (default: 50)
+                    - url_args (optional): url_args für eine neue Session
+                    
+                    Rückgabe: Status (completed, needs_input, plan_exhausted, stuck, max_steps,
+                    error), letzte Frage, Schritte mit Dauer und eingesparte Round Trips""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "i": {"type": "string"},
+                            "answers": {
+                                "oneOf": [
+                                    {"type": "array", "items": {"type": "object"}},
+                                    {"type": "object"},
+                                ]
+                            },
+                            "session": {"type": "string"},
+                            "secret": {"type": "string"},
+                            "max_steps": {"type": "integer", "default": 50},
+                            "url_args": {"type": "object"},
+                        },
+                        "required": ["i", "answers"],
+                    },
+                ),
+                Tool(
+                    name="docassemble_run_interview_matrix",
+                    description="""Führt ein Interview mit vielen Antwort-Kombinationen parallel aus.
+                    
+                    Jeder Fall läuft in einer eigenen Session bis zum Ende (wie
+                    docassemble_run_interview_script). Gesammelt werden Status, finale
+                    Variablen und Referenzen auf erzeugte Dateien; die Sessions werden
+                    danach gelöscht.
+                    
+                    Erforderliche Berechtigungen: Keine
+                    
+                    Parameter:
+                    - i (erforderlich): Interview Dateiname
+                    - cases (erforderlich): Liste von Antworten bzw. {"name", "answers"} Objekten
+                      oder Objekt {"base": {...}, "matrix": {"variable": [werte, ...]}}
+                      (kartesisches Produkt der matrix Werte)
+                    - max_workers (optional): Maximale Anzahl gleichzeitiger Sessions (default: 8)
+                    - variables (optional): Zu sammelnde Variablen (default: alle)
+                    - cleanup (optional): Sessions löschen (default: true)
+                    - max_steps (optional): Maximale Anzahl Fragen pro Fall (default: 50)
+                    - url_args (optional): url_args für jede neue Session
+                    
+                    Rückgabe: Ergebnisse pro Fall, Anzahl pro Status, Dauer und Fälle pro Sekunde""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "i": {"type": "string"},
+                            "cases": {"oneOf": [{"type": "array"}, {"type": "object"}]},
+                            "max_workers": {"type": "integer", "default": 8},
+                            "variables": {"type": "array", "items": {"type": "string"}},
+                            "cleanup": {"type": "boolean", "default": True},
+                            "max_steps": {"type": "integer", "default": 50},
+                            "url_args": {"type": "object"},
+                        },
+                        "required": ["i", "cases"],
+                    },
+                ),
                 Tool(
                     name="docassemble_run_interview_action",
                     description="""Führt eine Aktion in einem Interview aus.
@@ -811,6 +972,37 @@ class DocassembleServer:
                         "required": ["project"],
                     },
                 ),
+                Tool(
+                    name="docassemble_sync_playground_project",
+                    description="""Synchronisiert einen lokalen Projektordner mit einem Playground Projekt.
+                    
+                    Erforderliche Berechtigungen: admin, developer oder playground_control
+                    
+                    Lädt nur geänderte Dateien hoch (SHA-256 Manifest im lokalen Ordner),
+                    löscht verwaiste Playground Dateien und löst höchstens einen Restart aus.
+                    
+                    Parameter:
+                    - local_dir (erforderlich): Lokaler Ordner mit questions/templates/static/modules/sources
+                    - project (optional): Projekt Name (default: 'default')
+                    - user_id (optional): Benutzer ID
+                    - delete_orphans (optional): Verwaiste Dateien in lokal vorhandenen Ordnern löschen (default: true)
+                    - dry_run (optional): Nur geplante Änderungen anzeigen
+                    - max_workers (optional): Parallele Uploads (default: 4)
+                    
+                    Rückgabe: Hochgeladene, unveränderte, gelöschte und fehlgeschlagene Dateien""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "local_dir": {"type": "string"},
+                            "project": {"type": "string"},
+                            "user_id": {"type": "integer"},
+                            "delete_orphans": {"type": "boolean"},
+                            "dry_run": {"type": "boolean"},
+                            "max_workers": {"type": "integer", "minimum": 1},
+                        },
+                        "required": ["local_dir"],
+                    },
+                ),
                 Tool(
                     name="docassemble_clear_interview_cache",
                     description="""Löscht den Interview Cache, damit YAML neu gelesen wird.
@@ -827,8 +1019,14 @@ class DocassembleServer:
                     
                     Erforderliche Berechtigungen: admin
                     
-                    Rückgabe: Server Konfiguration als JSON""",
-                    inputSchema={"type": "object", "properties": {}},
+                    Rückgabe: Server Konfiguration als JSON
+                    
+                    Parameter:
+                    - use_cache (optional): Lokalen Konfigurations Cache verwenden (default: true)""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {"use_cache": {"type": "boolean"}},
+                    },
                 ),
                 Tool(
                     name="docassemble_list_installed_packages",
@@ -836,8 +1034,14 @@ class DocassembleServer:
                     
                     Erforderliche Berechtigungen: admin oder developer
                     
-                    Rückgabe: Liste der installierten Packages mit Details""",
-                    inputSchema={"type": "object", "properties": {}},
+                    Rückgabe: Liste der installierten Packages mit Details
+                    
+                    Parameter:
+                    - use_cache (optional): Lokalen Package Cache verwenden (default: true)""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {"use_cache": {"type": "boolean"}},
+                    },
                 ),
                 Tool(
                     name="docassemble_install_package",
@@ -925,6 +1129,99 @@ class DocassembleServer:
                         "required": ["task_id"],
                     },
                 ),
+                Tool(
+                    name="docassemble_flush_restarts",
+                    description="""Löst einen aufgeschobenen Server Restart sofort aus.
+                    
+                    Erforderliche Berechtigungen: admin, developer oder playground_control
+                    
+                    Ist DOCASSEMBLE_RESTART_DEBOUNCE gesetzt, werden Restarts von Modul-Uploads,
+                    Modul-Löschungen und Package-Installationen gesammelt und nach Ablauf des
+                    Zeitfensters einmalig ausgelöst. Dieses Tool erzwingt den Restart sofort.
+                    
+                    Parameter:
+                    - wait (optional): Auf Abschluss des Restarts warten (default: true)
+                    
+                    Rückgabe: Restart Ergebnis und Anzahl vermiedener Restarts""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {"wait": {"type": "boolean"}},
+                    },
+                ),
+                Tool(
+                    name="docassemble_get_cache_stats",
+                    description="""Statistik der client-seitigen Caches.
+                    
+                    Erforderliche Berechtigungen: keine (lokal)
+                    
+                    Rückgabe: Backend (memory/SQLite), Einträge, Bytes, Treffer, Verdrängungen""",
+                    inputSchema={"type": "object", "properties": {}},
+                ),
+                Tool(
+                    name="docassemble_get_session_stats",
+                    description="""Statistik der vom MCP Server erzeugten Interview Sessions.
+                    
+                    Erforderliche Berechtigungen: keine (lokal)
+                    
+                    Sessions, die länger als DOCASSEMBLE_SESSION_TIMEOUT unbenutzt sind,
+                    werden automatisch im Hintergrund gelöscht.
+                    
+                    Rückgabe: Lebende, abgelaufene, gelöschte und fehlgeschlagene Sessions, TTL""",
+                    inputSchema={"type": "object", "properties": {}},
+                ),
+                Tool(
+                    name="docassemble_reap_sessions",
+                    description="""Löscht abgelaufene, vom MCP Server erzeugte Interview Sessions sofort.
+                    
+                    Erforderliche Berechtigungen: Keine (eigene Sessions)
+                    
+                    Parameter:
+                    - force (optional): Alle eigenen Sessions löschen, nicht nur abgelaufene
+                    
+                    Rückgabe: Anzahl gelöschter Sessions und aktuelle Session Statistik""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {"force": {"type": "boolean", "default": False}},
+                    },
+                ),
+                Tool(
+                    name="docassemble_get_node_stats",
+                    description="""Zustand der Docassemble Knoten bei mehreren Base URLs.
+                    
+                    Erforderliche Berechtigungen: keine (lokal)
+                    
+                    Ist DOCASSEMBLE_BASE_URL eine kommagetrennte Liste, verteilt der Client
+                    Requests auf die Knoten (wenigste offene Requests, Session Affinität
+                    für /api/session*) und weicht bei Ausfällen automatisch aus.
+                    
+                    Rückgabe: Pro Knoten Gesundheit, offene Requests, Anzahl, Fehler und Latenz
+                    (EWMA, p50, p95) sowie Anzahl der Failover""",
+                    inputSchema={"type": "object", "properties": {}},
+                ),
+                Tool(
+                    name="docassemble_client_metrics",
+                    description="""Latenz- und Durchsatz-Metriken des MCP Servers.
+                    
+                    Erforderliche Berechtigungen: keine (lokal)
+                    
+                    Enthält Latenz-Histogramme pro API Endpunkt (gesamt, Serverzeit,
+                    JSON Decoding) und pro Tool (Ausführung, Serialisierung), Verbindungsaufbau,
+                    Statuscode-Zähler, gesendete/empfangene Bytes, Retries und Cache Treffer.
+                    
+                    Parameter:
+                    - format (optional): 'json' (default) oder 'prometheus'
+                    
+                    Rückgabe: Metriken als JSON oder Prometheus Text""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "format": {
+                                "type": "string",
+                                "enum": ["json", "prometheus"],
+                            }
+                        },
+                    },
+                ),
                 # ====================================================================
                 # API KEY MANAGEMENT (6 Tools)
                 # ====================================================================
@@ -1002,6 +1299,9 @@ class DocassembleServer:
                     
                     Parameter:
                     - i (erforderlich): Interview Dateiname
+                    - use_cache (optional): Lokalen Metadaten Cache verwenden (default: true).
+                      Der Cache wird durch clear_interview_cache, Package-Installationen
+                      und Playground-Uploads invalidiert.
                     
                     Rückgabe: Interview Datenanalyse mit Variablen, Modulen, etc.""",
                     inputSchema={
@@ -1010,11 +1310,61 @@ class DocassembleServer:
                             "i": {
                                 "type": "string",
                                 "description": "Interview Dateiname",
-                            }
+                            },
+                            "use_cache": {"type": "boolean"},
                         },
                         "required": ["i"],
                     },
                 ),
+                Tool(
+                    name="docassemble_extract_template_fields",
+                    description="""Extrahiert Felder aus einer lokalen Template Datei (PDF, DOCX, Markdown).
+                    
+                    Erforderliche Berechtigungen: admin, developer oder template_parse
+                    
+                    Ergebnisse werden per SHA-256 des Dateiinhalts gecacht; wiederholte
+                    Analysen derselben Datei erfolgen ohne erneuten Upload.
+                    
+                    Parameter:
+                    - template_file (erforderlich): Lokaler Pfad zur Template Datei
+                    - format (optional): Ausgabeformat ('json' oder 'yaml', default: 'json')
+                    - use_cache (optional): Template Cache verwenden (default: true)
+                    
+                    Rückgabe: Feldinformationen als JSON oder YAML""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "template_file": {"type": "string"},
+                            "format": {"type": "string", "enum": ["json", "yaml"]},
+                            "use_cache": {"type": "boolean"},
+                        },
+                        "required": ["template_file"],
+                    },
+                ),
+                Tool(
+                    name="docassemble_extract_template_fields_batch",
+                    description="""Extrahiert Felder aller Templates eines lokalen Verzeichnisses parallel.
+                    
+                    Erforderliche Berechtigungen: admin, developer oder template_parse
+                    
+                    Parameter:
+                    - directory (erforderlich): Verzeichnis mit PDF/DOCX/Markdown Templates
+                    - format (optional): Ausgabeformat ('json' oder 'yaml', default: 'json')
+                    - max_workers (optional): Parallele Analysen (default: 4)
+                    - use_cache (optional): Template Cache verwenden (default: true)
+                    
+                    Rückgabe: Ergebnisse je Datei, fehlgeschlagene Dateien und Cache Statistik""",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "directory": {"type": "string"},
+                            "format": {"type": "string", "enum": ["json", "yaml"]},
+                            "max_workers": {"type": "integer", "minimum": 1},
+                            "use_cache": {"type": "boolean"},
+                        },
+                        "required": ["directory"],
+                    },
+                ),
                 # ====================================================================
                 # DATA STASHING (1 Tool)
                 # ====================================================================
@@ -1044,110 +1394,455 @@ class DocassembleServer:
                 ),
             ]
 
+            if self.tenants is not None:
+                tools = [self._with_tenant_argument(tool) for tool in tools]
+                tools.append(
+                    Tool(
+                        name="docassemble_list_tenants",
+                        description="""Listet die konfigurierten Mandanten (Docassemble Installationen).
+
+                    Erforderliche Berechtigungen: Keine (lokale Server Statistik)
+
+                    Parameter: Keine
+
+                    Rückgabe: Pro Mandant Base URL, Rate Limit und Zustand des Clients
+                    (offene Aufrufe, Leerlaufzeit, eigene Sessions) sowie Anzahl erzeugter
+                    und geschlossener Clients""",
+                        inputSchema={"type": "object", "properties": {}},
+                    )
+                )
+
+            job_tools = self._job_tools()
+            if self.tenants is not None:
+                job_tools = [self._with_tenant_argument(tool) for tool in job_tools]
+            tools.extend(job_tools)
+
             return ListToolsResult(tools=tools)
 
         @self.server.call_tool()
-        async def call_tool(request: CallToolRequest) -> CallToolResult:
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
             """Führt Docassemble API Aufrufe aus"""
 
+            if name in JOB_TOOLS:
+                return self._call_job_tool(name, dict(arguments or {}))
+
+            if self.tenants is not None:
+                return await self._call_tenant_tool(name, dict(arguments or {}))
+
             if not self.client:
-                raise JSONRPCError(
-                    code=-1,
-                    message="Docassemble Client nicht initialisiert. Base URL und API Key erforderlich.",
+                return self._error_result(
+                    "Docassemble Client nicht initialisiert. Base URL und API Key erforderlich."
                 )
 
-            try:
-                result = await self._execute_tool(
-                    request.params.name, request.params.arguments or {}
-                )
+            return await self._traced_call(self.client, name, arguments)
 
-                return CallToolResult(
-                    content=[
-                        TextContent(
-                            type="text",
-                            text=json.dumps(result, indent=2, ensure_ascii=False),
-                        )
-                    ]
-                )
+        async def initialized(notification: InitializedNotification):
+            # Erst nach dem Handshake: das Warm-up darf ihn nie verzögern
+            if self.warmup is not None and self.warmup.start():
+                logger.info(f"Warm-up gestartet (Budget {self.warmup.budget:g}s)")
+
+        self.server.notification_handlers[InitializedNotification] = initialized
+
+    def _with_tenant_argument(self, tool: Tool) -> Tool:
+        """Ergänzt das inputSchema eines Tools um den Parameter tenant"""
+        schema = dict(tool.inputSchema)
+        schema["properties"] = {
+            **schema.get("properties", {}),
+            "tenant": {
+                "type": "string",
+                "enum": self.tenants.names(),
+                "description": "Mandant (Docassemble Installation)"
+                + (f", Default: {self.default_tenant}" if self.default_tenant else ""),
+            },
+        }
+        if not self.default_tenant:
+            schema["required"] = [*schema.get("required", []), "tenant"]
+        return tool.model_copy(update={"inputSchema": schema})
+
+    async def _call_tenant_tool(
+        self, name: str, arguments: Dict[str, Any]
+    ) -> CallToolResult:
+        """Führt ein Tool mit dem Client des Mandanten aus dem Argument tenant aus"""
+        if name == "docassemble_list_tenants":
+            return self._json_result(self.tenants.get_stats())
+
+        tenant = arguments.pop("tenant", None) or self.default_tenant
+        error = self._tenant_error(tenant)
+        if error:
+            return self._error_result(error)
+        with self.tenants.lease(tenant) as client:
+            return await self._traced_call(client, name, arguments)
+
+    def _tenant_error(self, tenant: Optional[str]) -> Optional[str]:
+        """Fehlermeldung, wenn tenant fehlt oder nicht konfiguriert ist"""
+        if not tenant:
+            return f"Parameter tenant erforderlich: {', '.join(self.tenants.names())}"
+        if tenant not in self.tenants.tenants:
+            return (
+                f"Unbekannter Mandant: {tenant} "
+                f"(verfügbar: {', '.join(self.tenants.names())})"
+            )
+        return None
+
+    def _job_tools(self) -> List[Tool]:
+        """Tools für Hintergrund Jobs (docassemble_job_submit zuerst)"""
+        return [
+            Tool(
+                name="docassemble_job_submit",
+                description="""Startet ein Tool als Hintergrund Job und kehrt sofort zurück.
+
+                Erforderliche Berechtigungen: die des ausgeführten Tools
+
+                Für lang laufende Operationen wie Package Installationen mit Restart,
+                Playground Syncs oder Interview Matrizen, die sonst den MCP Request
+                minutenlang belegen. Status und Ergebnis per docassemble_job_status
+                und docassemble_job_result abfragen.
+
+                Parameter:
+                - tool (erforderlich): Name des Tools, z.B. 'docassemble_sync_playground_project'
+                - arguments (optional): Argumente des Tools
+
+                Rückgabe: job_id und Status 'queued'""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "tool": {"type": "string", "enum": list(TOOL_METHODS)},
+                        "arguments": {"type": "object"},
+                    },
+                    "required": ["tool"],
+                },
+            ),
+            Tool(
+                name="docassemble_job_status",
+                description="""Zeigt den Status eines Hintergrund Jobs oder aller Jobs.
+
+                Erforderliche Berechtigungen: Keine (lokaler Server Zustand)
+
+                Parameter:
+                - job_id (optional): Job ID aus docassemble_job_submit; ohne sie werden alle
+                  bekannten Jobs gelistet
+
+                Rückgabe: Status (queued, running, completed, failed, interrupted), Zeiten,
+                Fortschritt (progress/total/message) und ggf. Fehler""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {"job_id": {"type": "string"}},
+                },
+            ),
+            Tool(
+                name="docassemble_job_result",
+                description="""Liefert das Ergebnis eines abgeschlossenen Hintergrund Jobs.
+
+                Erforderliche Berechtigungen: Keine (lokaler Server Zustand)
+
+                Ergebnisse werden nur begrenzt lange aufbewahrt (DOCASSEMBLE_JOB_RETENTION_SECONDS).
+
+                Parameter:
+                - job_id (erforderlich): Job ID aus docassemble_job_submit
+
+                Rückgabe: Ergebnis des Tools; Fehler, wenn der Job noch läuft oder
+                fehlgeschlagen ist""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {"job_id": {"type": "string"}},
+                    "required": ["job_id"],
+                },
+            ),
+        ]
+
+    def _call_job_tool(self, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Reicht Jobs ein bzw. liefert Status und Ergebnis"""
+        if name == "docassemble_job_submit":
+            return self._submit_job(arguments)
+
+        # Status und Ergebnisse nur für Jobs des eigenen Mandanten
+        tenant = None
+        if self.tenants is not None:
+            tenant = arguments.get("tenant") or self.default_tenant
+            error = self._tenant_error(tenant)
+            if error:
+                return self._error_result(error)
+
+        job_id = arguments.get("job_id")
+        if name == "docassemble_job_status" and not job_id:
+            return self._json_result(
+                {
+                    "jobs": self.jobs.list_jobs(tenant),
+                    "stats": self.jobs.get_stats(),
+                }
+            )
+        try:
+            job = self.jobs.get(job_id, tenant)
+        except KeyError:
+            return self._error_result(
+                f"Unbekannter Job: {job_id} (nie eingereicht oder bereits verdrängt)"
+            )
+        if name == "docassemble_job_status":
+            return self._json_result(job.to_dict())
+        if not job.finished:
+            return self._error_result(
+                f"Job {job_id} ist noch nicht abgeschlossen (Status: {job.status})"
+            )
+        if job.status != "completed":
+            return self._error_result(f"Job {job_id} {job.status}: {job.error}")
+        return self._json_result(job.result)
+
+    def _submit_job(self, arguments: Dict[str, Any]) -> CallToolResult:
+        tool = arguments.get("tool")
+        if tool not in TOOL_METHODS:
+            return self._error_result(f"Unbekanntes Tool für Job: {tool}")
+        tool_arguments = dict(arguments.get("arguments") or {})
+        error = self._local_path_error(tool, tool_arguments)
+        if error:
+            return self._error_result(error)
+
+        tenant = None
+        if self.tenants is not None:
+            tenant = arguments.get("tenant") or self.default_tenant
+            error = self._tenant_error(tenant)
+            if error:
+                return self._error_result(error)
+        elif not self.client:
+            return self._error_result(
+                "Docassemble Client nicht initialisiert. Base URL und API Key erforderlich."
+            )
+
+        def run():
+            if self.tenants is None:
+                return self._run_job_tool(self.client, tool, tool_arguments)
+            # Der Lease hält den Mandanten Client für die Dauer des Jobs offen
+            with self.tenants.lease(tenant) as client:
+                return self._run_job_tool(client, tool, tool_arguments)
+
+        try:
+            job = self.jobs.submit(tool, run, tenant=tenant)
+        except ServerBusyError as e:
+            return self._error_result(f"{e}. Bitte später erneut versuchen.")
+        return self._json_result(job.to_dict())
+
+    def _run_job_tool(
+        self, client: DocassembleClient, tool: str, arguments: Dict[str, Any]
+    ) -> Any:
+        method_name = TOOL_METHODS[tool]
+        with client.tracer.span(
+            f"mcp.job {tool}", {"mcp.tool": tool, "code.function": method_name}
+        ):
+            return self._invoke(tool, getattr(client, method_name), arguments)
+
+    async def _traced_call(
+        self, client: DocassembleClient, name: str, arguments: Dict[str, Any]
+    ) -> CallToolResult:
+        arguments = dict(arguments or {})
+        error = self._local_path_error(name, arguments)
+        if error:
+            return self._error_result(error)
+        with (
+            client.tracer.span(
+                f"mcp.tool {name}", {"mcp.tool": name}, kind="server"
+            ) as span,
+            self.slow_calls.track(name, arguments or {}) as call,
+        ):
+            return await self._call_tool(name, arguments, span, call, client)
+
+    async def _call_tool(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        span: Any,
+        call: ToolCall,
+        client: Optional[DocassembleClient] = None,
+    ) -> CallToolResult:
+        """Führt ein Tool aus, serialisiert das Ergebnis und erfasst Metriken"""
+        client = client or self.client
+        metrics = client.metrics
+        labels = {"tool": name}
+        started = time.perf_counter()
+        try:
+            result = await self._execute_tool(name, dict(arguments or {}), client, call)
+            executed = time.perf_counter()
+            text = (
+                result
+                if isinstance(result, str) and name == "docassemble_client_metrics"
+                else json.dumps(result, indent=2, ensure_ascii=False)
+            )
+            metrics.observe("docassemble_mcp_tool_seconds", executed - started, labels)
+            metrics.observe(
+                "docassemble_mcp_tool_serialize_seconds",
+                time.perf_counter() - executed,
+                labels,
+            )
+            metrics.inc("docassemble_mcp_tool_calls_total", {**labels, "result": "ok"})
+            metrics.inc("docassemble_mcp_tool_response_bytes_total", labels, len(text))
+            span.set_attribute("mcp.response_bytes", len(text))
+            call.response_bytes = len(text)
+
+            return CallToolResult(content=[TextContent(type="text", text=text)])
+
+        except DocassembleAPIError as e:
+            error_msg = f"Docassemble API Fehler: {str(e)}"
+            if e.status_code:
+                error_msg += f" (Status: {e.status_code})"
+            if e.response_data:
+                error_msg += f"\nResponse: {e.response_data}"
+
+            self._record_tool_error(metrics, name, started)
+            span.set_error(error_msg)
+            call.error = f"DocassembleAPIError {e.status_code or ''}".strip()
+            return self._error_result(error_msg)
+
+        except asyncio.CancelledError:
+            # Vom Host abgebrochen; es wird kein Ergebnis mehr gesendet
+            metrics.inc(
+                "docassemble_mcp_tool_calls_total", {**labels, "result": "cancelled"}
+            )
+            span.set_error("cancelled")
+            call.error = "cancelled"
+            raise
+
+        except ServerBusyError as e:
+            metrics.inc(
+                "docassemble_mcp_tool_calls_total", {**labels, "result": "busy"}
+            )
+            span.set_error(str(e))
+            call.error = "ServerBusyError"
+            return self._error_result(f"{e}. Bitte später erneut versuchen.")
+
+        except Exception as e:
+            self._record_tool_error(metrics, name, started)
+            span.set_error(f"{type(e).__name__}: {e}")
+            call.error = type(e).__name__
+            return self._error_result(f"Unerwarteter Fehler bei {name}: {str(e)}")
 
-            except DocassembleAPIError as e:
-                error_msg = f"Docassemble API Fehler: {str(e)}"
-                if e.status_code:
-                    error_msg += f" (Status: {e.status_code})"
-                if e.response_data:
-                    error_msg += f"\nResponse: {e.response_data}"
+    def _local_path_error(self, tool: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Prüft lokale Pfad Argumente eines Tools gegen local_root
 
-                raise JSONRPCError(code=-1, message=error_msg)
+        Relative Pfade gelten relativ zu local_root; arguments enthält danach
+        die aufgelösten Pfade (Symlinks eingeschlossen).
 
-            except Exception as e:
-                raise JSONRPCError(
-                    code=-1,
-                    message=f"Unerwarteter Fehler bei {request.params.name}: {str(e)}",
+        Returns:
+            Fehlermeldung oder None, wenn das Tool ausgeführt werden darf
+        """
+        names = LOCAL_PATH_ARGUMENTS.get(tool)
+        if not names or (self.local_root is None and self.allow_local_paths):
+            return None
+        if self.local_root is None:
+            return (
+                f"{tool} greift auf lokale Dateien zu und ist über HTTP nur mit "
+                "DOCASSEMBLE_LOCAL_ROOT verfügbar"
+            )
+        for name in names:
+            value = arguments.get(name)
+            if not isinstance(value, str):
+                continue
+            path = os.path.realpath(os.path.join(self.local_root, value))
+            if os.path.commonpath([self.local_root, path]) != self.local_root:
+                return f"{name} liegt außerhalb von {self.local_root}: {value}"
+            arguments[name] = path
+        return None
+
+    @staticmethod
+    def _record_tool_error(metrics: Any, name: str, started: float):
+        labels = {"tool": name}
+        metrics.observe(
+            "docassemble_mcp_tool_seconds", time.perf_counter() - started, labels
+        )
+        metrics.inc("docassemble_mcp_tool_calls_total", {**labels, "result": "error"})
+
+    @staticmethod
+    def _json_result(data: Any) -> CallToolResult:
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text", text=json.dumps(data, indent=2, ensure_ascii=False)
                 )
+            ]
+        )
 
-    async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Führt das angegebene Tool aus"""
-
-        # Map tool names to client methods
-        tool_mapping = {
-            # Benutzer-Management
-            "docassemble_create_user": "create_user",
-            "docassemble_invite_users": "invite_users",
-            "docassemble_list_users": "list_users",
-            "docassemble_get_user_by_username": "get_user_by_username",
-            "docassemble_get_current_user": "get_current_user",
-            "docassemble_update_current_user": "update_current_user",
-            "docassemble_get_user_by_id": "get_user_by_id",
-            "docassemble_deactivate_user": "deactivate_user",
-            "docassemble_update_user": "update_user",
-            # Berechtigungen
-            "docassemble_list_privileges": "list_privileges",
-            "docassemble_give_user_privilege": "give_user_privilege",
-            "docassemble_remove_user_privilege": "remove_user_privilege",
-            # Interview Sessions
-            "docassemble_list_interview_sessions": "list_interview_sessions",
-            "docassemble_delete_interview_sessions": "delete_interview_sessions",
-            "docassemble_list_advertised_interviews": "list_advertised_interviews",
-            "docassemble_get_user_secret": "get_user_secret",
-            "docassemble_get_login_url": "get_login_url",
-            # Interview Operations
-            "docassemble_start_interview": "start_interview",
-            "docassemble_get_interview_variables": "get_interview_variables",
-            "docassemble_set_interview_variables": "set_interview_variables",
-            "docassemble_get_current_question": "get_current_question",
-            "docassemble_run_interview_action": "run_interview_action",
-            "docassemble_go_back_in_interview": "go_back_in_interview",
-            "docassemble_delete_interview_session": "delete_interview_session",
-            # Playground
-            "docassemble_list_playground_files": "list_playground_files",
-            "docassemble_delete_playground_file": "delete_playground_file",
-            "docassemble_list_playground_projects": "list_playground_projects",
-            "docassemble_create_playground_project": "create_playground_project",
-            "docassemble_delete_playground_project": "delete_playground_project",
-            "docassemble_clear_interview_cache": "clear_interview_cache",
-            # System Administration
-            "docassemble_get_server_config": "get_server_config",
-            "docassemble_list_installed_packages": "list_installed_packages",
-            "docassemble_install_package": "install_or_update_package",
-            "docassemble_uninstall_package": "uninstall_package",
-            "docassemble_get_package_update_status": "get_package_update_status",
-            "docassemble_trigger_server_restart": "trigger_server_restart",
-            "docassemble_get_restart_status": "get_restart_status",
-            # API Key Management
-            "docassemble_get_user_api_keys": "get_user_api_keys",
-            "docassemble_create_user_api_key": "create_user_api_key",
-            "docassemble_delete_user_api_key": "delete_user_api_key",
-            # File Operations
-            "docassemble_get_interview_data": "get_interview_data",
-            # Data Stashing
-            "docassemble_retrieve_stashed_data": "retrieve_stashed_data",
-        }
+    @staticmethod
+    def _error_result(message: str) -> CallToolResult:
+        """Tool Fehler als MCP Ergebnis mit isError=True"""
+        return CallToolResult(
+            content=[TextContent(type="text", text=message)], isError=True
+        )
+
+    async def _execute_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        client: Optional[DocassembleClient] = None,
+        call: Optional[ToolCall] = None,
+    ) -> Any:
+        """
+        Führt das angegebene Tool aus (mit client oder dem Client des Servers)
 
-        method_name = tool_mapping.get(tool_name)
+        Die blockierende Client Methode läuft im ToolExecutor, der Event Loop
+        bleibt für andere Nachrichten und Sessions frei.
+        """
+        client = client or self.client
+
+        method_name = TOOL_METHODS.get(tool_name)
         if not method_name:
             raise ValueError(f"Unbekanntes Tool: {tool_name}")
 
-        method = getattr(self.client, method_name)
+        method = getattr(client, method_name)
+
+        def invoke():
+            with (
+                client.tracer.span(
+                    f"client.{method_name}", {"code.function": method_name}
+                ),
+                self.slow_calls.profiling(call),
+            ):
+                return self._invoke(tool_name, method, arguments)
+
+        reporter, sent = self._progress_reporter()
+        with reporting(reporter):
+            result = await self.executor.run(invoke)
+        # Fortschrittsmeldungen gehen vor dem Ergebnis raus
+        pending = [asyncio.wrap_future(future) for future in sent if not future.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return result
+
+    def _progress_reporter(self) -> Tuple[Optional[ProgressReporter], List[Any]]:
+        """
+        ProgressReporter für notifications/progress des laufenden Requests
+
+        Returns:
+            Reporter (None, wenn der Host kein progressToken mitschickt) und
+            die Liste der Futures bereits gesendeter Meldungen
+        """
+        sent: List[Any] = []
+        try:
+            context = self.server.request_context
+        except LookupError:
+            return None, sent
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None, sent
+        loop = asyncio.get_running_loop()
+
+        def send(progress: float, total: Optional[float], message: Optional[str]):
+            # Läuft im Worker Thread; die Session gehört dem Event Loop
+            sent.append(
+                asyncio.run_coroutine_threadsafe(
+                    context.session.send_progress_notification(
+                        token,
+                        progress,
+                        total,
+                        message,
+                        related_request_id=str(context.request_id),
+                    ),
+                    loop,
+                )
+            )
+
+        return ProgressReporter(send), sent
+
+    @staticmethod
+    def _invoke(tool_name: str, method: Any, arguments: Dict[str, Any]) -> Any:
+        """Ruft die Client Methode mit den Tool Argumenten auf"""
 
         # Special handling for start_interview which accepts **kwargs
         if tool_name == "docassemble_start_interview":
@@ -1158,40 +1853,185 @@ class DocassembleServer:
 
         return method(**arguments)
 
-    def setup_client(self, base_url: str, api_key: str):
+    def setup_client(self, base_url: str, api_key: str, **client_options):
         """Konfiguriert den Docassemble Client"""
-        self.client = DocassembleClient(base_url, api_key)
+        self.client = DocassembleClient(base_url, api_key, **client_options)
+        self.client.metrics.add_collector(self.executor.metrics)
+        self.client.metrics.add_collector(self.jobs.metrics)
+
+    def setup_tenants(
+        self,
+        tenants: Dict[str, Dict[str, Any]],
+        default_tenant: Optional[str] = None,
+        **pool_options,
+    ):
+        """
+        Konfiguriert den mandantenfähigen Betrieb
+
+        Args:
+            tenants: Name → Client Einstellungen (siehe tenants.load_tenants)
+            default_tenant: Mandant für Tool Aufrufe ohne Parameter tenant
+            **pool_options: Weitere Argumente für TenantPool
+        """
+        from .tenants import TenantPool
+
+        if default_tenant and default_tenant not in tenants:
+            raise ValueError(f"Default Mandant {default_tenant} ist nicht konfiguriert")
+        if not default_tenant and len(tenants) == 1:
+            default_tenant = next(iter(tenants))
+        self.tenants = TenantPool(tenants, **pool_options)
+        self.tenants.metrics.add_collector(self.executor.metrics)
+        self.tenants.metrics.add_collector(self.jobs.metrics)
+        self.default_tenant = default_tenant
+
+    def setup_warmup(self, budget: float = 5.0, connections: int = 4):
+        """
+        Wärmt den Client nach dem MCP Handshake vor (siehe warmup.WarmUp)
+
+        Im Mandantenbetrieb wird nur der Default Mandant vorgewärmt.
+
+        Args:
+            budget: Maximale Dauer des Warm-ups in Sekunden
+            connections: Verbindungen, die pro Knoten geöffnet werden
+        """
+        if self.tenants is not None:
+            if not self.default_tenant:
+                logger.info("Warm-up übersprungen: kein Default Mandant")
+                return
+            tenant = self.default_tenant
+
+            def client():
+                return self.tenants.get(tenant)
+
+        else:
+            client = self.client
+        self.warmup = WarmUp(client, budget=budget, connections=connections)
 
-    async def run(self):
-        """Startet den MCP Server"""
-        # Check for required environment variables
-        base_url = os.getenv("DOCASSEMBLE_BASE_URL")
-        api_key = os.getenv("DOCASSEMBLE_API_KEY")
+    def start_metrics_exporters(self, config: Optional["ServerConfig"] = None):
+        """Startet optionale Prometheus Exporter (Datei und/oder HTTP Port)"""
+        from .config import load_config
 
-        if not base_url or not api_key:
-            logger.error(
-                "DOCASSEMBLE_BASE_URL und DOCASSEMBLE_API_KEY Umgebungsvariablen sind erforderlich"
+        config = config or self.config or load_config()
+        registry = self.tenants.metrics if self.tenants else self.client.metrics
+        if config.metrics_file:
+            MetricsFileWriter(
+                registry, config.metrics_file, interval=config.metrics_interval
+            ).start()
+            logger.info(f"Schreibe Prometheus Metriken nach {config.metrics_file}")
+
+        if config.metrics_port:
+            start_metrics_server(
+                registry, config.metrics_port, host=config.metrics_host
             )
-            raise ValueError("Docassemble Konfiguration fehlt")
 
-        # Setup client
-        self.setup_client(base_url, api_key)
+    async def run(self, config: Optional["ServerConfig"] = None):
+        """
+        Startet den MCP Server
 
-        # Start server
-        logger.info(f"Starte Docassemble MCP Server für {base_url}")
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="docassemble-mcp",
-                    server_version="0.1.0",
-                    capabilities=self.server.get_capabilities(
-                        notification_options=None,
-                        experimental_capabilities=None,
-                    ),
-                ),
+        Args:
+            config: Fertige Konfiguration; ohne sie werden .env und die
+                Umgebungsvariablen einmal gelesen und geprüft (load_config)
+        """
+        # Erst beim Start: der Import von server bleibt ohne Seiteneffekte
+        from .config import load_config
+        from .tenants import load_tenants
+        from .transport import create_http_app, serve_http
+
+        config = self.config = config or load_config()
+        self.local_root = (
+            os.path.realpath(config.local_root) if config.local_root else None
+        )
+        self.allow_local_paths = config.mcp_transport == "stdio"
+
+        self.executor = ToolExecutor(
+            max_workers=config.mcp_workers, max_queue=config.mcp_max_queue
+        )
+        self.jobs.shutdown()
+        self.jobs = JobManager(
+            max_workers=config.job_workers,
+            max_queue=config.job_max_queue,
+            retention_seconds=config.job_retention_seconds,
+            max_finished=config.job_max_results,
+            state_file=config.job_state_file,
+        )
+
+        # Gemeinsame Einstellungen; im Mandantenbetrieb Defaults pro Mandant
+        client_options = config.client_options()
+        client_options["tracer"] = create_tracer(
+            trace_file=config.trace_file,
+            otlp_endpoint=config.trace_otlp_endpoint,
+            sample_rate=config.trace_sample_rate,
+        )
+
+        if config.tenants_file:
+            tenants = load_tenants(config.tenants_file)
+            cache_dir = client_options.pop("cache_dir")
+            cache_max_bytes = client_options.pop("cache_max_bytes")
+            # Ein Cache Backend für alle Mandanten, getrennt über Namespaces
+            client_options["cache_backend"] = create_cache_backend(
+                cache_dir, cache_max_bytes
             )
+            self.setup_tenants(
+                tenants,
+                default_tenant=config.default_tenant,
+                client_options=client_options,
+                idle_seconds=config.tenant_idle_seconds,
+                max_clients=config.max_tenant_clients,
+            )
+            target = f"{len(tenants)} Mandanten ({', '.join(self.tenants.names())})"
+        else:
+            self.setup_client(config.base_url, config.api_key, **client_options)
+            target = config.base_url
+
+        self.slow_calls = SlowCallMonitor(
+            threshold_seconds=config.slow_call_seconds,
+            profile_dir=config.profile_dir,
+            profile_sample_rate=config.profile_sample_rate,
+        )
+        self.start_metrics_exporters(config)
+        if config.warmup_seconds:
+            self.setup_warmup(config.warmup_seconds, config.warmup_connections)
+
+        # Start server
+        transport = config.mcp_transport
+        logger.info(f"Starte Docassemble MCP Server für {target} ({transport})")
+        try:
+            if transport == "stdio":
+                async with stdio_server() as (read_stream, write_stream):
+                    await self.server.run(
+                        read_stream, write_stream, self.initialization_options()
+                    )
+            else:
+                host, port, path = config.mcp_host, config.mcp_port, config.mcp_path
+                logger.info(
+                    f"MCP {transport} unter http://{host}:{port}{path} "
+                    f"({self.executor.max_workers} Worker, "
+                    f"Warteschlange {self.executor.max_queue})"
+                )
+                app = create_http_app(
+                    self,
+                    transport,
+                    path,
+                    host=host,
+                    port=port,
+                    auth_token=config.mcp_auth_token,
+                    extra_hosts=(config.mcp_allowed_hosts or "").split(","),
+                )
+                await serve_http(app, host, port)
+        finally:
+            self.executor.shutdown()
+            self.jobs.shutdown()
+
+    def initialization_options(self) -> InitializationOptions:
+        """Server Name, Version und Capabilities für den MCP Handshake"""
+        return InitializationOptions(
+            server_name="docassemble-mcp",
+            server_version="0.1.0",
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
+            ),
+        )
 
 
 def create_server() -> DocassembleServer:
@@ -0,0 +1,184 @@
+"""
+Lebenszyklus von Interview Sessions
+
+SessionRegistry merkt sich alle Sessions, die der Client mit start_interview
+erzeugt hat (Interview, Secret, Erstellungs- und letzte Nutzungszeit). Ein
+Hintergrund-Thread löscht Sessions, die länger als session_timeout nicht
+benutzt wurden, gebündelt über delete_interview_session, damit Agenten keine
+Sessions in der Docassemble Datenbank zurücklassen.
+
+Der Reaper-Thread startet erst mit der ersten registrierten Session.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .tracing import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+
+class TrackedSession:
+    """Eine vom Client erzeugte Interview Session"""
+
+    __slots__ = ("i", "session", "secret", "created_at", "last_used")
+
+    def __init__(self, i: str, session: str, secret: Optional[str] = None):
+        self.i = i
+        self.session = session
+        self.secret = secret
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+
+class SessionRegistry:
+    """
+    Registry der eigenen Sessions mit TTL-basiertem Aufräumen.
+
+    Args:
+        client: DocassembleClient (für delete_interview_session)
+        ttl: Sekunden ohne Nutzung, nach denen eine Session gelöscht wird (0 = nie)
+        reap_interval: Abstand der Reaper Läufe in Sekunden (0 = kein Hintergrund-Thread)
+        batch_size: Maximale Anzahl Löschungen pro Reaper Lauf
+        max_workers: Parallele Löschungen innerhalb eines Laufs
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: float = 3600,
+        reap_interval: float = 60,
+        batch_size: int = 100,
+        max_workers: int = 4,
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.reap_interval = reap_interval
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._sessions: Dict[str, TrackedSession] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"registered": 0, "reaped": 0, "already_gone": 0, "failed": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def register(self, i: str, session: str, secret: Optional[str] = None):
+        with self._lock:
+            self._sessions[session] = TrackedSession(i, session, secret)
+            self.stats["registered"] += 1
+        self._ensure_reaper()
+
+    def touch(self, session: str):
+        """Markiert eine Session als benutzt (verschiebt ihren Ablauf)"""
+        tracked = self._sessions.get(session)
+        if tracked is not None:
+            tracked.last_used = time.time()
+
+    def forget(self, session: Optional[str] = None, i: Optional[str] = None):
+        """Entfernt explizit gelöschte Sessions (einzeln oder alle eines Interviews)"""
+        with self._lock:
+            if session is not None:
+                self._sessions.pop(session, None)
+            elif i is not None:
+                for key in [k for k, s in self._sessions.items() if s.i == i]:
+                    del self._sessions[key]
+
+    def expired(self, now: Optional[float] = None) -> List[TrackedSession]:
+        if not self.ttl:
+            return []
+        deadline = (now or time.time()) - self.ttl
+        with self._lock:
+            return [s for s in self._sessions.values() if s.last_used <= deadline]
+
+    def _delete(self, tracked: TrackedSession) -> str:
+        from .client import DocassembleAPIError
+
+        try:
+            self.client.delete_interview_session(tracked.i, tracked.session)
+            return "reaped"
+        except DocassembleAPIError as e:
+            if e.status_code in (400, 404):
+                # Session existiert nicht mehr (z.B. serverseitig abgelaufen)
+                return "already_gone"
+            logger.warning(f"Session {tracked.session} nicht gelöscht: {e}")
+            return "failed"
+
+    def reap(self, force: bool = False) -> Dict[str, int]:
+        """
+        Löscht abgelaufene Sessions (force=True: alle registrierten Sessions)
+
+        Returns:
+            Anzahl gelöschter, bereits verschwundener und fehlgeschlagener Sessions
+        """
+        if force:
+            with self._lock:
+                candidates = list(self._sessions.values())
+        else:
+            candidates = self.expired()[: self.batch_size]
+        outcome = {"reaped": 0, "already_gone": 0, "failed": 0}
+        if not candidates:
+            return outcome
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                (tracked, submit_in_context(executor, self._delete, tracked))
+                for tracked in candidates
+            ]
+            for tracked, future in futures:
+                result = future.result()
+                outcome[result] += 1
+                if result != "failed":
+                    self.forget(tracked.session)
+
+        with self._lock:
+            for key, count in outcome.items():
+                self.stats[key] += count
+        logger.info(
+            f"Session Reaper: {outcome['reaped']} gelöscht, "
+            f"{outcome['already_gone']} bereits weg, {outcome['failed']} fehlgeschlagen"
+        )
+        return outcome
+
+    def _ensure_reaper(self):
+        if not self.reap_interval or not self.ttl or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="session-reaper", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self):
+        while not self._stopped.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.warning(f"Session Reaper fehlgeschlagen: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            live = list(self._sessions.values())
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "live": len(live),
+            "expired": sum(
+                1 for s in live if self.ttl and s.last_used <= now - self.ttl
+            ),
+            "oldest_age_seconds": (
+                round(now - min(s.created_at for s in live), 1) if live else None
+            ),
+            "ttl_seconds": self.ttl,
+            "reap_interval_seconds": self.reap_interval,
+        }
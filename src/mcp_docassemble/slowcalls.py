@@ -0,0 +1,213 @@
+"""
+Slow-Call Log und Profiling für Tool Aufrufe
+
+SlowCallMonitor misst jeden Tool Aufruf und protokolliert Aufrufe oberhalb
+eines Schwellwerts mit:
+- Argument-Form (Typen und Größen, niemals Werte; Secrets nur als Typ)
+- Upstream Zeit (Summe der Docassemble Requests) und lokaler Zeit
+- Anzahl der Requests und Größe der Antwort
+
+Optional wird ein Anteil der Aufrufe mit cProfile aufgezeichnet; die
+Statistiken langsamer Aufrufe landen als .prof (pstats) und .txt Zusammenfassung
+in einem lokalen Verzeichnis.
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_SECRET_KEY = re.compile(r"secret|password|passwd|api_?key|token|key$", re.IGNORECASE)
+
+
+def argument_shape(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Beschreibt Argumente über Typ und Größe, ohne Werte preiszugeben"""
+    shape = {}
+    for key, value in arguments.items():
+        if _SECRET_KEY.search(key):
+            shape[key] = {"type": type(value).__name__, "redacted": True}
+        elif isinstance(value, (str, bytes, list, tuple, dict)):
+            shape[key] = {"type": type(value).__name__, "size": len(value)}
+        else:
+            shape[key] = {"type": type(value).__name__}
+    return shape
+
+
+class UpstreamTimer:
+    """Summiert Dauer und Anzahl der Docassemble Requests eines Tool Aufrufs"""
+
+    __slots__ = ("seconds", "requests", "_lock")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.seconds += seconds
+            self.requests += 1
+
+
+_upstream: contextvars.ContextVar[Optional[UpstreamTimer]] = contextvars.ContextVar(
+    "upstream_timer", default=None
+)
+
+
+def record_upstream(seconds: float):
+    """Wird vom Client pro Request aufgerufen (no-op außerhalb eines Tool Aufrufs)"""
+    timer = _upstream.get()
+    if timer is not None:
+        timer.add(seconds)
+
+
+class ToolCall:
+    """Messdaten eines laufenden Tool Aufrufs"""
+
+    __slots__ = ("tool", "arguments", "response_bytes", "error", "upstream", "profiler")
+
+    def __init__(self, tool: str, arguments: Dict[str, Any]):
+        self.tool = tool
+        self.arguments = arguments
+        self.response_bytes = 0
+        self.error: Optional[str] = None
+        self.upstream = UpstreamTimer()
+        self.profiler: Optional[cProfile.Profile] = None
+
+
+class SlowCallMonitor:
+    """
+    Erkennt langsame Tool Aufrufe und profiliert sie optional.
+
+    Args:
+        threshold_seconds: Aufrufe ab dieser Dauer werden protokolliert (0 = aus)
+        profile_dir: Verzeichnis für Profile langsamer Aufrufe (None = kein Profiling)
+        profile_sample_rate: Anteil der Aufrufe, die mit cProfile laufen
+        history: Anzahl der zuletzt protokollierten Aufrufe, die behalten werden
+    """
+
+    def __init__(
+        self,
+        threshold_seconds: float = 5.0,
+        profile_dir: Optional[str] = None,
+        profile_sample_rate: float = 0.1,
+        history: int = 100,
+    ):
+        self.threshold_seconds = threshold_seconds
+        self.profile_dir = os.path.expanduser(profile_dir) if profile_dir else None
+        self.profile_sample_rate = profile_sample_rate
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        # cProfile erlaubt nur einen aktiven Profiler; parallele Aufrufe
+        # werden dann ohne Profil gemessen
+        self._profile_lock = threading.Lock()
+        self._rng = random.Random()
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+    def _start_profiler(self) -> Optional[cProfile.Profile]:
+        if not self.profile_dir or self._rng.random() >= self.profile_sample_rate:
+            return None
+        if not self._profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Ein anderer Profiler (z.B. Debugger) ist bereits aktiv
+            self._profile_lock.release()
+            return None
+        return profiler
+
+    @contextmanager
+    def track(self, tool: str, arguments: Dict[str, Any]) -> Iterator[ToolCall]:
+        """Misst einen Tool Aufruf; ToolCall.response_bytes setzt der Aufrufer"""
+        call = ToolCall(tool, arguments)
+        token = _upstream.set(call.upstream)
+        started = time.perf_counter()
+        try:
+            yield call
+        except BaseException as e:
+            call.error = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            _upstream.reset(token)
+            if self.threshold_seconds and duration >= self.threshold_seconds:
+                self._report(call, duration, call.profiler)
+
+    @contextmanager
+    def profiling(self, call: Optional[ToolCall]) -> Iterator[None]:
+        """
+        Profiliert den Block für einen Anteil der Aufrufe
+
+        cProfile erfasst nur den Thread, in dem es gestartet wird; der Block
+        muss daher in dem Worker laufen, der die Client Methode ausführt.
+        """
+        profiler = self._start_profiler() if call is not None else None
+        try:
+            yield
+        finally:
+            if call is not None and profiler is not None:
+                profiler.disable()
+                self._profile_lock.release()
+                call.profiler = profiler
+
+    def _report(
+        self, call: ToolCall, duration: float, profiler: Optional[cProfile.Profile]
+    ):
+        upstream = call.upstream.seconds
+        entry = {
+            "tool": call.tool,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration_seconds": round(duration, 4),
+            "upstream_seconds": round(upstream, 4),
+            # Bei parallelen Requests kann die Upstream Summe die Dauer übersteigen
+            "local_seconds": round(max(0.0, duration - upstream), 4),
+            "upstream_requests": call.upstream.requests,
+            "response_bytes": call.response_bytes,
+            "arguments": argument_shape(call.arguments),
+            "error": call.error,
+        }
+        if profiler is not None and self.profile_dir:
+            entry["profile"] = self._write_profile(
+                self.profile_dir, call.tool, duration, profiler
+            )
+        self.recent.append(entry)
+        logger.warning(
+            f"Langsamer Tool Aufruf {call.tool}: {duration:.3f}s "
+            f"(upstream {upstream:.3f}s in {call.upstream.requests} Requests, "
+            f"lokal {entry['local_seconds']:.3f}s, {call.response_bytes} Bytes) "
+            f"{json.dumps(entry['arguments'], sort_keys=True)}"
+        )
+
+    def _write_profile(
+        self, directory: str, tool: str, duration: float, profiler: cProfile.Profile
+    ) -> Optional[str]:
+        """Speichert pstats Dump und Textzusammenfassung, liefert den Pfad"""
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{tool}-{int(duration * 1000)}ms"
+        path = os.path.join(directory, f"{stem}.prof")
+        try:
+            profiler.dump_stats(path)
+            summary = io.StringIO()
+            stats = pstats.Stats(profiler, stream=summary)
+            stats.sort_stats("cumulative").print_stats(30)
+            with open(
+                os.path.join(directory, f"{stem}.txt"), "w", encoding="utf-8"
+            ) as handle:
+                handle.write(summary.getvalue())
+        except OSError as e:
+            logger.warning(f"Profil für {tool} nicht schreibbar: {e}")
+            return None
+        return path
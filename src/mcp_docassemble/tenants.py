@@ -0,0 +1,320 @@
+"""
+Mandantenfähiger Betrieb
+
+Ein MCP Server Prozess bedient mehrere Docassemble Installationen. Die
+Mandanten stehen in einer JSON Datei (Name → base_url, api_key oder
+api_key_env und optionale Client Einstellungen wie rate_limit). TenantPool
+erzeugt den DocassembleClient eines Mandanten erst beim ersten Tool Aufruf,
+jeder Client hat eigene Verbindungen, einen eigenen Cache Namespace, ein
+eigenes Rate Limit und schreibt Metriken mit dem Label tenant in eine
+gemeinsame Registry. Clients, die idle_seconds lang nicht benutzt wurden,
+werden geschlossen; ebenso der am längsten unbenutzte Client, wenn mehr als
+max_clients gleichzeitig offen sind.
+"""
+
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .client import DocassembleClient
+from .metrics import LabelledMetrics, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+TENANT_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def load_tenants(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Liest und prüft die Mandanten Datei
+
+    Args:
+        path: JSON Datei {"name": {"base_url": ..., "api_key" | "api_key_env": ..., ...}}
+
+    Returns:
+        Name → Client Einstellungen (api_key aus api_key_env aufgelöst)
+
+    Raises:
+        ValueError: Bei ungültigen Namen, fehlenden oder unbekannten Einstellungen
+    """
+    with open(os.path.expanduser(path), encoding="utf-8") as handle:
+        raw = json.load(handle)
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError(f"{path}: erwartet ein nicht leeres Objekt Name → Mandant")
+
+    allowed = set(inspect.signature(DocassembleClient.__init__).parameters) - {
+        "self",
+        "metrics",
+        "tracer",
+        # Ein gemeinsames Cache Backend, getrennt über Namespaces
+        "cache_backend",
+        "cache_dir",
+        "cache_max_bytes",
+        "cache_namespace",
+    }
+    tenants = {}
+    for name, config in raw.items():
+        if not TENANT_NAME.match(name):
+            raise ValueError(f"Ungültiger Mandanten Name: {name!r}")
+        config = dict(config)
+        key_env = config.pop("api_key_env", None)
+        if key_env:
+            config["api_key"] = os.getenv(key_env)
+        if not config.get("base_url") or not config.get("api_key"):
+            raise ValueError(f"Mandant {name}: base_url und api_key sind erforderlich")
+        unknown = set(config) - allowed
+        if unknown:
+            raise ValueError(
+                f"Mandant {name}: unbekannte Einstellungen {', '.join(sorted(unknown))}"
+            )
+        tenants[name] = config
+    return tenants
+
+
+class _Entry:
+    __slots__ = ("client", "created_at", "last_used", "active")
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.active = 0
+
+
+class TenantPool:
+    """
+    Lazy erzeugte DocassembleClients pro Mandant.
+
+    Args:
+        tenants: Name → Client Einstellungen (siehe load_tenants)
+        client_options: Gemeinsame Default Einstellungen aller Mandanten
+        idle_seconds: Unbenutzte Clients werden danach geschlossen (0 = nie)
+        max_clients: Maximale Anzahl gleichzeitig offener Clients
+        metrics: Gemeinsame MetricsRegistry (optional, sonst eigene Instanz)
+        factory: Erzeugt den Client (Default: DocassembleClient)
+    """
+
+    def __init__(
+        self,
+        tenants: Dict[str, Dict[str, Any]],
+        client_options: Optional[Dict[str, Any]] = None,
+        idle_seconds: float = 900,
+        max_clients: int = 32,
+        metrics: Optional[MetricsRegistry] = None,
+        factory: Optional[Callable[..., Any]] = None,
+    ):
+        self.tenants = tenants
+        self.client_options = client_options or {}
+        self.idle_seconds = idle_seconds
+        self.max_clients = max(1, max_clients)
+        self.metrics = metrics or MetricsRegistry()
+        self.factory: Callable[..., Any] = factory or DocassembleClient
+        self._clients: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._creating: Dict[str, threading.Lock] = {
+            name: threading.Lock() for name in tenants
+        }
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"created": 0, "evicted": 0}
+        self.metrics.add_collector(self._pool_metrics)
+
+    def names(self) -> List[str]:
+        return sorted(self.tenants)
+
+    def _create(self, name: str) -> Any:
+        options = {**self.client_options, **self.tenants[name]}
+        base_url = options.pop("base_url")
+        api_key = options.pop("api_key")
+        started = time.perf_counter()
+        client = self.factory(
+            base_url,
+            api_key,
+            metrics=LabelledMetrics(self.metrics, {"tenant": name}),
+            cache_namespace=f"tenant:{name}",
+            **options,
+        )
+        logger.info(
+            f"Client für Mandant {name} erzeugt "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+        return client
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """
+        Liefert den Client eines Mandanten für die Dauer des with-Blocks
+
+        Geleaste Clients werden nicht geschlossen. Die Erzeugung läuft unter
+        einem Lock pro Mandant, damit ein langsamer Server die übrigen
+        Mandanten nicht blockiert.
+
+        Raises:
+            KeyError: Unbekannter Mandant
+        """
+        if name not in self.tenants:
+            raise KeyError(name)
+        entry = self._acquire(name)
+        try:
+            yield entry.client
+        finally:
+            with self._lock:
+                entry.active -= 1
+                entry.last_used = time.monotonic()
+
+    def get(self, name: str) -> Any:
+        """Client eines Mandanten ohne Lease (kann danach geschlossen werden)"""
+        with self.lease(name) as client:
+            return client
+
+    def _acquire(self, name: str) -> _Entry:
+        with self._lock:
+            entry = self._clients.get(name)
+            if entry is not None:
+                return self._use(name, entry)
+        with self._creating[name]:
+            with self._lock:
+                entry = self._clients.get(name)
+                if entry is not None:
+                    return self._use(name, entry)
+            entry = _Entry(self._create(name))
+            with self._lock:
+                self._clients[name] = entry
+                self.stats["created"] += 1
+                self._use(name, entry)
+                overflow = self._overflow()
+        for victim, old in overflow:
+            self._close(victim, old, "Obergrenze")
+        self._ensure_evictor()
+        return entry
+
+    def _use(self, name: str, entry: _Entry) -> _Entry:
+        entry.active += 1
+        entry.last_used = time.monotonic()
+        self._clients.move_to_end(name)
+        return entry
+
+    def _evictable(self, entry: _Entry) -> bool:
+        # Clients mit eigenen Sessions bleiben offen, bis deren Reaper sie
+        # gelöscht hat; sonst blieben die Sessions in Docassemble liegen
+        return entry.active == 0 and not len(getattr(entry.client, "sessions", ()))
+
+    def _overflow(self) -> List:
+        """Entfernt die am längsten unbenutzten Clients über max_clients (unter Lock)"""
+        victims = []
+        excess = len(self._clients) - self.max_clients
+        for name, entry in list(self._clients.items()):
+            if excess <= 0:
+                break
+            if self._evictable(entry):
+                victims.append((name, self._clients.pop(name)))
+                self.stats["evicted"] += 1
+                excess -= 1
+        return victims
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Schließt Clients, die länger als idle_seconds unbenutzt sind"""
+        if not self.idle_seconds:
+            return []
+        deadline = (now or time.monotonic()) - self.idle_seconds
+        with self._lock:
+            victims = [
+                (name, entry)
+                for name, entry in self._clients.items()
+                if entry.last_used <= deadline and self._evictable(entry)
+            ]
+            for name, _ in victims:
+                del self._clients[name]
+            self.stats["evicted"] += len(victims)
+        for name, entry in victims:
+            self._close(name, entry, "Inaktivität")
+        return [name for name, _ in victims]
+
+    def _close(self, name: str, entry: _Entry, reason: str):
+        try:
+            entry.client.close()
+        except Exception as e:
+            logger.warning(f"Client für Mandant {name} nicht sauber geschlossen: {e}")
+        close_metrics = getattr(entry.client.metrics, "close", None)
+        if close_metrics is not None:
+            close_metrics()
+        logger.info(f"Client für Mandant {name} geschlossen ({reason})")
+
+    def _ensure_evictor(self):
+        if not self.idle_seconds or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="tenant-evictor", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self):
+        interval = max(1.0, min(60.0, self.idle_seconds / 2))
+        while not self._stopped.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.warning(f"Mandanten Eviction fehlgeschlagen: {e}")
+
+    def stop(self):
+        """Beendet den Eviction Thread und schließt alle Clients"""
+        self._stopped.set()
+        with self._lock:
+            entries = list(self._clients.items())
+            self._clients.clear()
+        for name, entry in entries:
+            self._close(name, entry, "Shutdown")
+
+    def _pool_metrics(self):
+        """Collector: offene, erzeugte und geschlossene Mandanten Clients"""
+        with self._lock:
+            active = set(self._clients)
+            stats = dict(self.stats)
+        for name in self.tenants:
+            yield "docassemble_mcp_tenant_clients", {"tenant": name}, int(
+                name in active
+            )
+        yield "docassemble_mcp_tenant_clients_created_total", {}, stats["created"]
+        yield "docassemble_mcp_tenant_clients_evicted_total", {}, stats["evicted"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            open_clients = {
+                name: {
+                    "active_calls": entry.active,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                    "live_sessions": len(getattr(entry.client, "sessions", ())),
+                }
+                for name, entry in self._clients.items()
+            }
+            stats = dict(self.stats)
+        tenants = []
+        for name in self.names():
+            limit = self.tenants[name].get(
+                "rate_limit", self.client_options.get("rate_limit", 0)
+            )
+            tenants.append(
+                {
+                    "tenant": name,
+                    "base_url": self.tenants[name]["base_url"],
+                    "rate_limit": limit or None,
+                    "client": open_clients.get(name),
+                }
+            )
+        return {
+            **stats,
+            "open_clients": len(open_clients),
+            "max_clients": self.max_clients,
+            "idle_seconds": self.idle_seconds,
+            "tenants": tenants,
+        }
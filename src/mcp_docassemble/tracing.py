@@ -0,0 +1,413 @@
+"""
+Tracing im OpenTelemetry Stil
+
+Spans für MCP Tool Aufrufe, Client Methoden und einzelne HTTP Versuche, so
+dass sich die Latenz eines Tool Aufrufs, der mehrere Docassemble Requests
+auslöst, den einzelnen Requests zuordnen lässt.
+
+Ohne Exporter ist der Tracer deaktiviert und span() kostet nur einen
+Funktionsaufruf. Die Sampling-Entscheidung fällt einmal pro Trace am Root
+Span; nicht gesampelte Traces erzeugen keine Span Objekte.
+
+Exporter:
+- FileSpanExporter: eine JSON Zeile pro Span
+- OTLPHttpSpanExporter: OTLP/HTTP JSON an einen Collector (/v1/traces)
+
+Spans werden über einen BatchSpanProcessor in einem Hintergrund-Thread
+exportiert, damit Aufrufe nicht auf I/O warten.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """Ein abgeschlossener oder laufender Span"""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+    )
+
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = "unset"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.status = "error"
+        self.status_message = message
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "status": self.status,
+            "status_message": self.status_message,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _OTLP_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {
+                "code": 2 if self.status == "error" else 0,
+                "message": self.status_message,
+            },
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Platzhalter für deaktiviertes Tracing und nicht gesampelte Traces"""
+
+    recording = False
+    trace_id = span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_current_span: contextvars.ContextVar[Any] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def current_span() -> Any:
+    """Aktueller Span des Kontexts (oder NOOP_SPAN)"""
+    return _current_span.get() or NOOP_SPAN
+
+
+class FileSpanExporter:
+    """Hängt Spans als JSON Lines an eine Datei an"""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        lines = "".join(
+            json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+            for span in spans
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+    def shutdown(self):
+        pass
+
+
+class OTLPHttpSpanExporter:
+    """
+    Sendet Spans als OTLP/HTTP JSON an einen Collector.
+
+    Args:
+        endpoint: Collector URL, z.B. http://localhost:4318 (/v1/traces wird ergänzt)
+        service_name: Wert für das Resource Attribut service.name
+        headers: Zusätzliche HTTP Header (z.B. Authentifizierung)
+        timeout: Request Timeout in Sekunden
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "mcp-docassemble",
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 5.0,
+    ):
+        endpoint = endpoint.rstrip("/")
+        if not endpoint.endswith("/v1/traces"):
+            endpoint += "/v1/traces"
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        # Eigene Session, damit Export-Requests nicht selbst instrumentiert werden
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.session.headers.update(headers or {})
+
+    def export(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "mcp_docassemble"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        response = self.session.post(
+            self.endpoint, data=json.dumps(payload), timeout=self.timeout
+        )
+        response.raise_for_status()
+
+    def shutdown(self):
+        self.session.close()
+
+
+class BatchSpanProcessor:
+    """
+    Sammelt beendete Spans und exportiert sie gebündelt im Hintergrund.
+
+    Ist die Queue voll, werden Spans verworfen statt den Aufrufer zu blockieren.
+    """
+
+    def __init__(
+        self,
+        exporter: Any,
+        max_queue_size: int = 2048,
+        batch_size: int = 256,
+        interval: float = 2.0,
+    ):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self.exported = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(max_queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name="span-export", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> List[Span]:
+        batch: List[Span] = []
+        while len(batch) < self.batch_size:
+            try:
+                span = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(span)
+        return batch
+
+    def _export(self, batch: List[Span]):
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning(f"Span Export fehlgeschlagen ({len(batch)} Spans): {e}")
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            self.force_flush()
+
+    def force_flush(self):
+        """Exportiert alle wartenden Spans sofort"""
+        while not self._queue.empty():
+            self._export(self._drain())
+
+    def shutdown(self):
+        self._stopped.set()
+        self._thread.join(timeout=5)
+        self.force_flush()
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """
+    Erzeugt Spans und reicht beendete Spans an den Processor weiter.
+
+    Args:
+        exporter: Span Exporter (None deaktiviert Tracing)
+        sample_rate: Anteil der Traces (0..1), die aufgezeichnet werden
+        processor: Eigener Processor statt BatchSpanProcessor (z.B. für Tests)
+    """
+
+    def __init__(
+        self,
+        exporter: Any = None,
+        sample_rate: float = 1.0,
+        processor: Any = None,
+    ):
+        self.sample_rate = sample_rate
+        self.processor = processor or (
+            BatchSpanProcessor(exporter) if exporter is not None else None
+        )
+        self.enabled = self.processor is not None and sample_rate > 0
+        self._rng = random.Random()
+        if self.processor is not None and processor is None:
+            atexit.register(self.shutdown)
+
+    def _new_id(self, bits: int) -> str:
+        return f"{self._rng.getrandbits(bits):0{bits // 4}x}"
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "internal",
+    ) -> Iterator[Any]:
+        """Öffnet einen Span als Kind des aktuellen Spans"""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        if parent is NOOP_SPAN:
+            # Trace wurde am Root nicht gesampelt
+            yield NOOP_SPAN
+            return
+        if parent is None and self._rng.random() >= self.sample_rate:
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else self._new_id(128),
+            span_id=self._new_id(64),
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+            if self.processor is not None:
+                self.processor.on_end(span)
+
+    def force_flush(self):
+        if self.processor is not None and hasattr(self.processor, "force_flush"):
+            self.processor.force_flush()
+
+    def shutdown(self):
+        if self.processor is not None and hasattr(self.processor, "shutdown"):
+            self.processor.shutdown()
+
+
+def create_tracer(
+    trace_file: Optional[str] = None,
+    otlp_endpoint: Optional[str] = None,
+    sample_rate: float = 0.1,
+) -> Tracer:
+    """Tracer mit Datei- oder OTLP Exporter; ohne beide deaktiviert"""
+    if otlp_endpoint:
+        return Tracer(OTLPHttpSpanExporter(otlp_endpoint), sample_rate=sample_rate)
+    if trace_file:
+        return Tracer(FileSpanExporter(trace_file), sample_rate=sample_rate)
+    return Tracer()
+
+
+def submit_in_context(executor: Any, fn: Any, *args, **kwargs):
+    """
+    executor.submit mit einer Kopie des aktuellen contextvars Kontexts,
+    damit Spans aus Worker-Threads dem aufrufenden Trace zugeordnet werden
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
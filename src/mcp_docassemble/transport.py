@@ -0,0 +1,223 @@
+"""
+HTTP Transporte für den MCP Server
+
+Neben stdio kann der Server als langlebiger HTTP Dienst laufen, den viele
+MCP Hosts gleichzeitig nutzen. Caches, Connection Pools und die erkannte
+Docassemble Version bleiben dabei über alle Sessions hinweg warm.
+
+- streamable-http: MCP Streamable HTTP unter <path> (Default /mcp)
+- sse: ältere Clients; Event Stream unter <path>/sse, Nachrichten per POST an
+  <path>/messages/
+
+/healthz liefert den Zustand des ToolExecutors (laufende, wartende und
+abgelehnte Tool Aufrufe), z.B. für Load Balancer oder Container Health Checks.
+
+Absicherung der MCP Endpunkte:
+
+- DNS Rebinding Schutz: Host und Origin müssen zur gebundenen Adresse
+  host:port passen (plus zusätzlich erlaubte Hosts, z.B. hinter einem Reverse
+  Proxy), sonst antwortet der Transport mit 421 bzw. 403.
+- Bearer Token: mit auth_token verlangt jeder Request außer /healthz den
+  Header "Authorization: Bearer <token>", sonst 401. Ohne Token bindet die
+  App nur an Loopback Adressen.
+
+Starlette und uvicorn sind Abhängigkeiten von mcp; sie werden erst beim Start
+eines HTTP Transports importiert.
+"""
+
+import contextlib
+import hmac
+import ipaddress
+import logging
+from typing import Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+# Bind Adressen, die alle Interfaces meinen; Hosts lassen sich daraus nicht ableiten
+WILDCARD_HOSTS = ("", "0.0.0.0", "::")
+
+
+def is_loopback(host: str) -> bool:
+    """True, wenn host nur lokal erreichbar ist (localhost, 127.0.0.0/8, ::1)"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def allowed_hosts(host: str, port: int, extra: Iterable[str] = ()) -> List[str]:
+    """
+    Erlaubte Host Header für die gebundene Adresse host:port
+
+    Args:
+        host: Bind Adresse
+        port: Port
+        extra: Zusätzliche Host Header (z.B. Name hinter einem Reverse Proxy,
+            "host:*" für beliebige Ports)
+
+    Returns:
+        Liste der Host Header Werte
+    """
+    names = [] if host in WILDCARD_HOSTS else [host]
+    if host in WILDCARD_HOSTS or is_loopback(host):
+        names += ["127.0.0.1", "localhost", "::1"]
+    hosts = []
+    for name in dict.fromkeys(names):
+        if ":" in name and not name.startswith("["):
+            name = f"[{name}]"
+        hosts.append(f"{name}:{port}")
+    return hosts + [entry.strip() for entry in extra if entry.strip()]
+
+
+def security_settings(host: str, port: int, extra_hosts: Iterable[str] = ()):
+    """TransportSecuritySettings mit DNS Rebinding Schutz für host:port"""
+    from mcp.server.transport_security import TransportSecuritySettings
+
+    hosts = allowed_hosts(host, port, extra_hosts)
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=hosts,
+        allowed_origins=[
+            f"{scheme}://{entry}" for entry in hosts for scheme in ("http", "https")
+        ],
+    )
+
+
+class _ASGIEndpoint:
+    """Reicht Requests unverändert an eine ASGI Funktion weiter"""
+
+    def __init__(self, handler: Any):
+        self.handler = handler
+
+    async def __call__(self, scope, receive, send):
+        await self.handler(scope, receive, send)
+
+
+class _BearerAuth:
+    """Lässt nur Requests mit "Authorization: Bearer <token>" durch (außer /healthz)"""
+
+    def __init__(self, app: Any, token: str):
+        self.app = app
+        self.expected = f"Bearer {token}".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] != "/healthz":
+            headers = dict(scope.get("headers") or ())
+            if not hmac.compare_digest(
+                headers.get(b"authorization", b""), self.expected
+            ):
+                from starlette.responses import PlainTextResponse
+
+                response = PlainTextResponse(
+                    "Unauthorized",
+                    status_code=401,
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def create_http_app(
+    server: Any,
+    transport: str = "streamable-http",
+    path: str = "/mcp",
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    auth_token: Optional[str] = None,
+    extra_hosts: Iterable[str] = (),
+):
+    """
+    Starlette App für einen HTTP Transport
+
+    Args:
+        server: DocassembleServer
+        transport: 'streamable-http' oder 'sse'
+        path: Basis Pfad des MCP Endpunkts
+        host: Bind Adresse; bestimmt die erlaubten Host und Origin Header
+        port: Port
+        auth_token: Bearer Token für alle MCP Requests
+        extra_hosts: Zusätzlich erlaubte Host Header
+
+    Returns:
+        ASGI App (Starlette)
+
+    Raises:
+        ValueError: Bei unbekanntem Transport oder einer nicht lokalen Bind
+            Adresse ohne auth_token
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Mount, Route
+
+    if not auth_token and not is_loopback(host):
+        raise ValueError(
+            f"{host} ist keine Loopback Adresse; HTTP Transporte brauchen dafür "
+            "ein Bearer Token (DOCASSEMBLE_MCP_AUTH_TOKEN)"
+        )
+    path = "/" + path.strip("/")
+    settings = security_settings(host, port, extra_hosts)
+
+    async def health(request):
+        return JSONResponse({"status": "ok", "tools": server.executor.get_stats()})
+
+    routes: List[Any] = [Route("/healthz", health, methods=["GET"])]
+    lifespan = None
+
+    if transport == "streamable-http":
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+        manager = StreamableHTTPSessionManager(
+            app=server.server, security_settings=settings
+        )
+        routes.append(Route(path, endpoint=_ASGIEndpoint(manager.handle_request)))
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with manager.run():
+                yield
+
+    elif transport == "sse":
+        from mcp.server.sse import SseServerTransport
+
+        base = path.rstrip("/")
+        sse = SseServerTransport(f"{base}/messages/", security_settings=settings)
+
+        async def handle_sse(request):
+            async with sse.connect_sse(
+                request.scope, request.receive, request._send
+            ) as (read_stream, write_stream):
+                await server.server.run(
+                    read_stream, write_stream, server.initialization_options()
+                )
+            return Response()
+
+        routes.append(Route(f"{base}/sse", endpoint=handle_sse, methods=["GET"]))
+        routes.append(Mount(f"{base}/messages/", app=sse.handle_post_message))
+
+    else:
+        raise ValueError(
+            f"Unbekannter HTTP Transport: {transport} (streamable-http oder sse)"
+        )
+
+    app = Starlette(routes=routes, lifespan=lifespan)
+    return _BearerAuth(app, auth_token) if auth_token else app
+
+
+async def serve_http(app: Any, host: str = "127.0.0.1", port: int = 8000):
+    """Startet die App mit uvicorn, bis der Prozess beendet wird"""
+    import uvicorn
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        log_level=logging.getLevelName(logging.getLogger().getEffectiveLevel()).lower(),
+        # Zugriffe protokolliert uvicorn sonst für jede MCP Nachricht
+        access_log=False,
+    )
+    await uvicorn.Server(config).serve()
@@ -0,0 +1,184 @@
+"""
+Warm-up nach dem MCP Handshake
+
+Die ersten Tool Aufrufe nach dem Start sind sonst langsam: TLS Handshakes,
+leere Connection Pools, kalte Caches und die noch nicht ermittelte
+Docassemble Version. WarmUp erledigt das in Hintergrund Threads, sobald der
+Host die Initialisierung abgeschlossen hat (notifications/initialized):
+
+1. Pro Knoten werden parallel connections Verbindungen geöffnet
+   (GET /health_check, ohne API Key)
+2. Die typischen ersten Aufrufe laufen parallel vor (Default:
+   get_current_user, list_privileges, list_advertised_interviews,
+   get_server_config); Server Konfiguration und Interview Liste landen dabei
+   im Cache, die Version wird aus der gecachten Konfiguration gelesen
+
+Alles zusammen darf höchstens budget Sekunden dauern. Was bis dahin nicht
+fertig ist, läuft im Hintergrund zu Ende, wird aber nicht mehr abgewartet.
+Fehler (z.B. fehlende Berechtigungen) werden nur protokolliert.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CALLS = (
+    "get_current_user",
+    "list_privileges",
+    "list_advertised_interviews",
+    "get_server_config",
+)
+
+
+class WarmUp:
+    """
+    Einmaliges Vorwärmen eines DocassembleClients.
+
+    Args:
+        client: Zu wärmender Client, oder eine Funktion, die ihn liefert
+            (z.B. für den Default Mandanten)
+        budget: Maximale Dauer in Sekunden
+        connections: Verbindungen pro Knoten (höchstens pool_maxsize)
+        calls: Client Methoden ohne Argumente, die vorab aufgerufen werden
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        budget: float = 5.0,
+        connections: int = 4,
+        calls: Sequence[str] = WARMUP_CALLS,
+    ):
+        self.client = client
+        self.budget = budget
+        self.connections = connections
+        self.calls = tuple(calls)
+        self.result: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """
+        Startet das Warm-up in einem Hintergrund Thread (nur beim ersten Aufruf)
+
+        Returns:
+            True, wenn dieser Aufruf das Warm-up gestartet hat
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._thread = threading.Thread(
+                target=self._run_logged, name="mcp-warmup", daemon=True
+            )
+        self._thread.start()
+        return True
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run_logged(self):
+        try:
+            result = self.run()
+        except Exception as e:
+            logger.warning(f"Warm-up fehlgeschlagen: {e}")
+            return
+        ok = [name for name, call in result["calls"].items() if call["ok"]]
+        summary = (
+            f"Warm-up in {result['seconds']:.2f}s: {result['connections']} "
+            f"Verbindungen, {len(ok)}/{len(result['calls'])} Aufrufe vorab"
+        )
+        if result["timed_out"]:
+            summary += f", Budget überschritten: {', '.join(result['timed_out'])}"
+        logger.info(summary)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Führt das Warm-up aus und wartet höchstens budget Sekunden
+
+        Returns:
+            Dauer, geöffnete Verbindungen, Ergebnis pro Aufruf und die
+            Schritte, die bei Ablauf des Budgets noch liefen
+        """
+        started = time.monotonic()
+        deadline = started + self.budget
+        client = self.client() if callable(self.client) else self.client
+        per_node = min(self.connections, getattr(client, "pool_maxsize", 10))
+        urls = getattr(client, "base_urls", [client.base_url])
+        workers = max(len(self.calls) + 1, per_node * len(urls))
+        executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="mcp-warmup"
+        )
+        timed_out = []
+        try:
+            # Erst Verbindungen öffnen, damit die Aufrufe sie wiederverwenden
+            opened = [
+                executor.submit(self._open_connection, client, url, deadline)
+                for url in urls
+                for _ in range(per_node)
+            ]
+            done, pending = wait(opened, timeout=max(0, deadline - time.monotonic()))
+            connections = sum(1 for future in done if future.result())
+            if pending:
+                timed_out.append("connections")
+
+            steps = {name: getattr(client, name) for name in self.calls}
+            # Liest die Version aus der Konfiguration; der Cache lädt sie nur
+            # einmal, auch parallel zu get_server_config
+            steps["detect_version"] = lambda: client.da_version
+            calls = {
+                name: executor.submit(self._timed, method)
+                for name, method in steps.items()
+            }
+            wait(calls.values(), timeout=max(0, deadline - time.monotonic()))
+            results = {}
+            for name, future in calls.items():
+                if future.done():
+                    results[name] = future.result()
+                else:
+                    timed_out.append(name)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.result = {
+            "seconds": round(time.monotonic() - started, 3),
+            "budget": self.budget,
+            "connections": connections,
+            "calls": results,
+            "timed_out": timed_out,
+        }
+        return self.result
+
+    @staticmethod
+    def _open_connection(client: Any, url: str, deadline: float) -> bool:
+        timeout = max(0.1, deadline - time.monotonic())
+        try:
+            # Die Antwort wird gelesen, die Verbindung bleibt im Pool. None
+            # entfernt den API Key der Session: /health_check braucht ihn nicht
+            client.session.get(
+                f"{url}/health_check", headers={"X-API-Key": None}, timeout=timeout
+            )
+            return True
+        except Exception as e:
+            logger.debug(f"Warm-up Verbindung zu {url} fehlgeschlagen: {e}")
+            return False
+
+    @staticmethod
+    def _timed(method: Callable[[], Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            method()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+        entry: Dict[str, Any] = {
+            "ok": ok,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        if error:
+            entry["error"] = error
+        return entry
@@ -17,12 +17,15 @@ class APITestBase:
         api_key = os.getenv("DOCASSEMBLE_API_KEY")
 
         if not base_url or not api_key:
-            raise RuntimeError("DOCASSEMBLE_BASE_URL und DOCASSEMBLE_API_KEY müssen gesetzt sein, um die Live-Tests auszuführen")
+            raise RuntimeError(
+                "DOCASSEMBLE_BASE_URL und DOCASSEMBLE_API_KEY müssen gesetzt sein, um die Live-Tests auszuführen"
+            )
 
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.client = DocassembleClient(self.base_url, self.api_key)
         self.delay = 2  # Sekunden zwischen Tests
+        self.latencies: Dict[str, float] = {}  # Dauer pro Endpunkt in ms
 
     def test_endpoint(self, endpoint_name: str, test_function) -> Tuple[bool, str]:
         """
@@ -38,11 +41,9 @@ class APITestBase:
         print(f"\n🔄 Teste: {endpoint_name}")
         print("-" * 50)
 
+        started = time.perf_counter()
         try:
             result = test_function()
-            print(f"✅ ERFOLG: {result}")
-            time.sleep(self.delay)  # Rate limiting
-            return True, f"{endpoint_name} funktioniert korrekt"
 
         except DocassembleAPIError as e:
             print(f"❌ API FEHLER: {e}")
@@ -61,6 +62,14 @@ class APITestBase:
             print(f"❌ SYSTEM FEHLER: {e}")
             return False, f"System-Fehler: {e}"
 
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.latencies[endpoint_name] = round(elapsed_ms, 1)
+
+        print(f"✅ ERFOLG: {result}")
+        time.sleep(self.delay)  # Rate limiting
+        return True, f"{endpoint_name} funktioniert korrekt"
+
     def print_section_header(self, section_name: str, total_endpoints: int):
         """Druckt einen formatierten Abschnittsheader"""
         print(f"\n{'='*60}")
@@ -1,9 +1,1097 @@
 """Lightweight unit tests that are safe to run in CI."""
 
+import pytest
+
 from mcp_docassemble.client import DocassembleClient
+from mcp_docassemble.restarts import RestartCoalescer
 
 
 def test_client_initialization():
     client = DocassembleClient(base_url="https://example.com", api_key="dummy")
     assert client.base_url == "https://example.com"
     assert client.api_key == "dummy"
+
+
+class _PlaygroundStub:
+    """Minimal client double recording playground calls."""
+
+    base_url = "https://example.com"
+
+    def __init__(self, remote=None):
+        self.remote = remote or {}
+        self.uploads = []
+        self.deletes = []
+        self.restarts = 0
+        self.restart_coalescer = RestartCoalescer(self)
+
+    def restart_batch(self, wait=True):
+        return self.restart_coalescer.batch(wait=wait)
+
+    def list_playground_files(self, user_id=None, folder="static", project="default"):
+        return list(self.remote.get(folder, []))
+
+    def upload_playground_files(
+        self, files, user_id=None, folder="static", project="default", restart=True
+    ):
+        if folder == "modules":
+            self.restart_coalescer.defer("upload_playground_files")
+        name = files["file"][0]
+        self.uploads.append(f"{folder}/{name}")
+        self.remote.setdefault(folder, []).append(name)
+
+    def delete_playground_file(
+        self, filename, user_id=None, folder="static", project="default", restart=True
+    ):
+        self.deletes.append(f"{folder}/{filename}")
+        self.remote[folder].remove(filename)
+
+    def trigger_server_restart(self):
+        self.restarts += 1
+        return {"task_id": "restart"}
+
+    def get_restart_status(self, task_id):
+        return {"status": "completed"}
+
+
+def test_playground_sync_uploads_only_changes(tmp_path):
+    from mcp_docassemble.playground_sync import PlaygroundSync
+
+    (tmp_path / "questions").mkdir()
+    (tmp_path / "modules").mkdir()
+    (tmp_path / "static").mkdir()
+    (tmp_path / "questions" / "main.yml").write_text("question: Hi")
+    (tmp_path / "modules" / "helpers.py").write_text("x = 1")
+    stub = _PlaygroundStub(remote={"static": ["old.css"]})
+
+    first = PlaygroundSync(stub, str(tmp_path)).run()
+    assert first["uploaded"] == ["modules/helpers.py", "questions/main.yml"]
+    assert first["deleted"] == ["static/old.css"]
+    assert stub.restarts == 1
+    assert first["restart"]["status"] == "completed"
+
+    (tmp_path / "questions" / "main.yml").write_text("question: Hello")
+    second = PlaygroundSync(stub, str(tmp_path)).run()
+    assert second["uploaded"] == ["questions/main.yml"]
+    assert second["unchanged"] == ["modules/helpers.py"]
+    assert stub.restarts == 1
+
+
+def test_playground_sync_leaves_folders_missing_locally_untouched(tmp_path):
+    from mcp_docassemble.playground_sync import PlaygroundSync
+
+    (tmp_path / "questions").mkdir()
+    (tmp_path / "questions" / "main.yml").write_text("question: Hi")
+    stub = _PlaygroundStub(
+        remote={
+            "questions": ["old.yml"],
+            "static": ["logo.png"],
+            "templates": ["letter.docx"],
+            "modules": ["helpers.py"],
+        }
+    )
+
+    result = PlaygroundSync(stub, str(tmp_path)).run()
+    assert result["uploaded"] == ["questions/main.yml"]
+    assert result["deleted"] == ["questions/old.yml"]
+    assert stub.remote["static"] == ["logo.png"]
+    assert stub.remote["templates"] == ["letter.docx"]
+    assert stub.remote["modules"] == ["helpers.py"]
+
+
+def test_restart_coalescer_batches_restarts():
+    stub = _PlaygroundStub()
+    with stub.restart_batch() as batch:
+        for name in ("a.py", "b.py", "c.py"):
+            stub.upload_playground_files({"file": (name, b"")}, folder="modules")
+    assert stub.restarts == 1
+    assert batch["restart"]["restarts_avoided"] == 2
+    assert stub.restart_coalescer.get_stats()["restarts_avoided"] == 2
+
+
+def test_restart_batch_only_defers_operations_of_its_caller():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from mcp_docassemble.tracing import submit_in_context
+
+    stub = _PlaygroundStub()
+    coalescer = stub.restart_coalescer
+    concurrent = []
+    with stub.restart_batch() as batch:
+        assert coalescer.defer("mine")
+        # Ein paralleler Aufruf ohne den Kontext des Batches restartet selbst
+        other = threading.Thread(target=lambda: concurrent.append(coalescer.defer("x")))
+        other.start()
+        other.join()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert submit_in_context(executor, coalescer.defer, "worker").result()
+    assert concurrent == [False]
+    assert batch["restart"]["operations"] == ["mine", "worker"]
+    assert stub.restarts == 1
+
+
+def test_restart_coalescer_keeps_pending_restart_when_trigger_fails():
+    stub = _PlaygroundStub()
+    trigger = stub.trigger_server_restart
+
+    def failing_trigger():
+        raise RuntimeError("503")
+
+    stub.trigger_server_restart = failing_trigger
+    with pytest.raises(RuntimeError):
+        with stub.restart_batch():
+            stub.upload_playground_files({"file": ("a.py", b"")}, folder="modules")
+    assert stub.restart_coalescer.get_stats()["pending_operations"] == 1
+
+    stub.trigger_server_restart = trigger
+    result = stub.restart_coalescer.flush()
+    assert result["operations"] == ["upload_playground_files"]
+    assert stub.restarts == 1
+
+
+def test_cache_ttl_zero_disables_caching_and_sqlite_file_is_private(tmp_path):
+    import os
+    import stat
+
+    from mcp_docassemble.cache import MISSING, SQLiteCacheBackend
+
+    path = tmp_path / "cache" / "cache.sqlite3"
+    backend = SQLiteCacheBackend(str(path))
+    loads = []
+    for _ in range(2):
+        backend.get_or_load("server", "config", lambda: loads.append(1) or {}, ttl=0)
+    assert len(loads) == 2
+    assert backend.get("server", "config") is MISSING
+    if os.name == "posix":
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_interview_metadata_cache_follows_package_fingerprint(tmp_path):
+    from mcp_docassemble.cache import (
+        InterviewMetadataCache,
+        SQLiteCacheBackend,
+        packages_fingerprint,
+    )
+
+    packages = [{"name": "docassemble.demo", "version": "1.0"}]
+    loads = []
+
+    def make_cache():
+        return InterviewMetadataCache(
+            SQLiteCacheBackend(str(tmp_path / "cache.sqlite3")),
+            "server:interview",
+            lambda: packages_fingerprint(packages),
+            fingerprint_ttl=0,
+        )
+
+    cache = make_cache()
+    assert cache.get_or_load("i", lambda: loads.append(1) or "v1") == "v1"
+    assert make_cache().get_or_load("i", lambda: loads.append(1) or "v2") == "v1"
+
+    packages[0]["version"] = "1.1"
+    assert make_cache().get_or_load("i", lambda: loads.append(1) or "v3") == "v3"
+    assert len(loads) == 2
+
+
+def test_template_field_cache_is_content_addressed(tmp_path):
+    from mcp_docassemble.cache import MISSING, SQLiteCacheBackend, TemplateFieldCache
+
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_bytes=40)
+    cache = TemplateFieldCache(backend)
+    first = TemplateFieldCache.key(b"%PDF-1", "json")
+    assert first == TemplateFieldCache.key(b"%PDF-1", "json")
+    assert first != TemplateFieldCache.key(b"%PDF-1", "yaml")
+
+    cache.put(first, {"fields": ["a"]})
+    assert cache.get(first) == {"fields": ["a"]}
+    cache.put(TemplateFieldCache.key(b"2", "json"), {"fields": ["b"]})
+    cache.put(TemplateFieldCache.key(b"3", "json"), {"fields": ["c"]})
+    stats = backend.get_stats()
+    assert stats["bytes"] <= 40 and stats["evictions"] >= 1
+    assert cache.get(TemplateFieldCache.key(b"missing", "json")) is MISSING
+
+
+def test_fake_server_serves_paginated_client_calls():
+    from mcp_docassemble.client import DocassembleAPIError, DocassembleClient
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+
+    with FakeDocassembleServer(page_size=10, total_items=25, payload_bytes=8) as fake:
+        client = DocassembleClient(fake.base_url, "test-key")
+        assert client.da_version == "1.6.0-fake"
+
+        pages = [client.list_users()]
+        while pages[-1]["next_id"]:
+            pages.append(client.list_users(next_id=pages[-1]["next_id"]))
+        assert [len(page["items"]) for page in pages] == [10, 10, 5]
+        assert pages[0]["items"][0]["data"] == "x" * 8
+
+        client.upload_playground_files({"file": ("a.py", b"x")}, folder="modules")
+        assert client.list_playground_files(folder="modules") == ["a.py"]
+
+        fake.error_rate = 1.0
+        with pytest.raises(DocassembleAPIError):
+            client.get_current_user()
+        assert fake.get_stats()["injected_errors"] == 1
+
+
+def test_call_tool_handler_returns_results_and_errors():
+    import asyncio
+
+    from mcp.types import CallToolRequest, CallToolRequestParams
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.server import DocassembleServer
+
+    def request(name, arguments):
+        return CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(name=name, arguments=arguments),
+        )
+
+    with FakeDocassembleServer() as fake:
+        server = DocassembleServer()
+        server.setup_client(fake.base_url, "test-key")
+        handler = server.server.request_handlers[CallToolRequest]
+
+        ok = asyncio.run(handler(request("docassemble_get_current_user", {}))).root
+        assert not ok.isError and '"id": 1' in ok.content[0].text
+
+        missing = request("docassemble_get_user_by_id", {"user_id": 9999})
+        failed = asyncio.run(handler(missing)).root
+        assert failed.isError and "Status: 404" in failed.content[0].text
+
+
+def test_client_metrics_record_requests_and_export_prometheus():
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+
+    with FakeDocassembleServer() as fake:
+        client = DocassembleClient(fake.base_url, "test-key")
+        client.get_user_by_id(3)
+        client.get_user_by_id(4)
+
+    snapshot = client.get_metrics()
+    responses = snapshot["counters"]["docassemble_client_responses_total"]
+    by_endpoint = {
+        entry["labels"]["endpoint"]: entry["value"]
+        for entry in responses
+        if entry["labels"]["status"] == "200"
+    }
+    assert by_endpoint["/api/user/{id}"] == 2
+    assert snapshot["counters"]["docassemble_client_connections_total"][0]["value"] >= 1
+
+    text = client.get_metrics(format="prometheus")
+    assert "# TYPE docassemble_client_request_seconds histogram" in text
+    assert 'le="+Inf"' in text
+
+
+def test_client_freezes_proxy_and_ca_bundle_at_construction(monkeypatch, tmp_path):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "ALL_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+    monkeypatch.delenv("CURL_CA_BUNDLE", raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", str(tmp_path / "ca.pem"))
+
+    client = DocassembleClient("https://da.example", "k")
+    monkeypatch.setenv("HTTPS_PROXY", "http://other.example:3128")
+    assert client.session.trust_env is False
+    assert client.session.proxies["https"] == "http://proxy.example:3128"
+    assert client.session.verify == str(tmp_path / "ca.pem")
+    client.close()
+
+    # NO_PROXY trifft nur einen Knoten: Proxies weiter pro Request auflösen
+    monkeypatch.setenv("NO_PROXY", "da1.example")
+    client = DocassembleClient(
+        "https://da1.example,https://da2.example", "k", health_check_interval=0
+    )
+    assert client.session.trust_env is True
+    assert not client.session.proxies
+    client.close()
+
+
+def test_client_sets_content_type_per_body_and_caches_endpoints(tmp_path):
+    from mcp_docassemble.endpoints import EndpointTable
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+
+    seen = []
+    with FakeDocassembleServer() as fake:
+        handle = fake.handle
+
+        def recording(method, path, query, body, files, headers):
+            seen.append((method, path, headers.get("Content-Type", "")))
+            return handle(method, path, query, body, files, headers)
+
+        fake.handle = recording
+        client = DocassembleClient(fake.base_url, "test-key")
+        assert "Content-Type" not in client.session.headers
+        client.get_user_by_id(3)
+        client.create_playground_project("demo")
+        client.extract_template_fields(("form.pdf", b"%PDF-1.4"))
+        client.close()
+
+    content_types = {path: content_type for _, path, content_type in seen}
+    assert content_types["/api/user/3"] == ""
+    assert content_types["/api/projects"] == "application/json"
+    assert content_types["/api/fields"].startswith("multipart/form-data; boundary=")
+
+    table = EndpointTable("https://da.example/", max_entries=2)
+    first = table.resolve("api/user/5")
+    assert first == ("/api/user/5", "/api/user/{id}", "https://da.example/api/user/5")
+    assert table.resolve("api/user/5") is first
+    assert table.resolve("/api/user/7")[1] == "/api/user/{id}"
+    # Über max_entries hinaus berechnet, aber nicht mehr gecacht
+    assert table.resolve("/api/user/9")[1] == "/api/user/{id}"
+    assert "/api/user/9" not in table._entries
+
+
+def test_tracing_links_tool_client_and_http_spans():
+    import asyncio
+
+    from mcp.types import CallToolRequest, CallToolRequestParams
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.server import DocassembleServer
+    from mcp_docassemble.tracing import Tracer
+
+    class Collector:
+        def __init__(self):
+            self.spans = []
+
+        def on_end(self, span):
+            self.spans.append(span)
+
+    collector = Collector()
+    with FakeDocassembleServer() as fake:
+        server = DocassembleServer()
+        server.setup_client(
+            fake.base_url, "test-key", tracer=Tracer(processor=collector)
+        )
+        request = CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(
+                name="docassemble_get_user_by_id", arguments={"user_id": 2}
+            ),
+        )
+        asyncio.run(server.server.request_handlers[CallToolRequest](request))
+
+    http, method, tool = collector.spans
+    assert tool.name == "mcp.tool docassemble_get_user_by_id"
+    assert method.parent_id == tool.span_id and method.name == "client.get_user_by_id"
+    assert http.parent_id == method.span_id and http.trace_id == tool.trace_id
+    assert http.attributes["http.route"] == "/api/user/{id}"
+    assert http.attributes["http.status_code"] == 200
+
+
+def test_slow_call_monitor_logs_shape_and_writes_profile(tmp_path):
+    import asyncio
+
+    from mcp.types import CallToolRequest, CallToolRequestParams
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.server import DocassembleServer
+    from mcp_docassemble.slowcalls import SlowCallMonitor
+
+    with FakeDocassembleServer(latency=0.02) as fake:
+        server = DocassembleServer()
+        server.setup_client(fake.base_url, "test-key")
+        server.slow_calls = SlowCallMonitor(
+            threshold_seconds=0.01,
+            profile_dir=str(tmp_path),
+            profile_sample_rate=1.0,
+        )
+        request = CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(
+                name="docassemble_get_user_secret",
+                arguments={"username": "user1@example.com", "password": "hunter2"},
+            ),
+        )
+        asyncio.run(server.server.request_handlers[CallToolRequest](request))
+
+    entry = server.slow_calls.recent[-1]
+    assert entry["tool"] == "docassemble_get_user_secret"
+    assert entry["upstream_requests"] == 1 and entry["upstream_seconds"] >= 0.02
+    assert entry["arguments"]["username"] == {"type": "str", "size": 17}
+    assert entry["arguments"]["password"] == {"type": "str", "redacted": True}
+    assert "hunter2" not in str(entry)
+    assert entry["profile"].endswith(".prof")
+    assert len(list(tmp_path.glob("*.txt"))) == 1
+
+
+def test_loadtest_reports_latency_and_error_breakdown():
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.loadtest import LoadTest, build_operations, parse_mix
+
+    mix = parse_mix("interview_flow=2,list_users=1", list(build_operations("i", 1)))
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1", list(mix))
+
+    with FakeDocassembleServer(error_rate=0.3, seed=3) as fake:
+        client = DocassembleClient(fake.base_url, "test-key", pool_maxsize=4)
+        report = LoadTest(client, mix, concurrency=4, requests=40, seed=1).run()
+        # Flows löschen ihre Sessions; übrig bleiben nur fehlgeschlagene Löschungen
+        deleted = fake.get_stats()["endpoints"]["DELETE /api/interviews"]
+        assert deleted > 0 and len(client.sessions) < deleted
+        fake.error_rate = 0
+        client.reap_sessions(force=True)
+        assert len(client.sessions) == 0
+
+    assert report["operations"] == 40
+    assert sum(op["count"] for op in report["per_operation"].values()) == 40
+    assert report["errors"] == sum(report["errors_by_type"].values()) > 0
+    assert all(": HTTP 500" in key for key in report["errors_by_type"])
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+
+def test_run_interview_script_drives_session_to_completion():
+    import asyncio
+    import json
+
+    from mcp.types import CallToolRequest, CallToolRequestParams
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.server import DocassembleServer
+
+    answers = {
+        "user_name": "Ada",
+        "user_email": "ada@example.com",
+        "accepts_terms": True,
+        "user_age": 36,
+        "unused": 1,
+    }
+    with FakeDocassembleServer() as fake:
+        server = DocassembleServer()
+        server.setup_client(fake.base_url, "test-key")
+        handler = server.server.request_handlers[CallToolRequest]
+        request = CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(
+                name="docassemble_run_interview_script",
+                arguments={"i": "demo.yml", "answers": answers},
+            ),
+        )
+        result = json.loads(asyncio.run(handler(request)).root.content[0].text)
+
+        assert result["status"] == "completed"
+        assert [step["question"] for step in result["steps"]] == [
+            "name",
+            "terms",
+            "age",
+        ]
+        assert result["round_trips"] == 5 and result["round_trips_saved"] == 3
+        assert result["unused_answers"] == ["unused"]
+        stored = server.client.get_interview_variables("demo.yml", result["session"])
+        assert stored["user_age"] == 36
+
+        partial = server.client.run_interview_script(
+            "demo.yml", [{"user_name": "Ada", "user_email": "ada@example.com"}]
+        )
+        assert partial["status"] == "plan_exhausted"
+        assert partial["question"]["_question_name"] == "terms"
+
+
+def test_interview_matrix_runs_cases_and_cleans_up_sessions():
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.interview_matrix import file_references
+
+    cases = {
+        "base": {"user_name": "Ada", "user_email": "ada@example.com"},
+        "matrix": {"accepts_terms": [True, False], "user_age": [20, 30, 40]},
+    }
+    with FakeDocassembleServer() as fake:
+        client = DocassembleClient(fake.base_url, "test-key")
+        report = client.run_interview_matrix(
+            "demo.yml", cases, max_workers=3, variables=["user_age"]
+        )
+        assert fake.get_stats()["endpoints"]["DELETE /api/session"] == 6
+
+        # Unerwartete Exceptions beenden nur den Fall; die Session wird gelöscht
+        client.get_current_question = lambda *args, **kwargs: "<html>"
+        broken = client.run_interview_matrix("demo.yml", [{}, {}], max_workers=2)
+        assert fake.get_stats()["endpoints"]["DELETE /api/session"] == 8
+
+    assert broken["by_status"] == {"error": 2}
+    assert all(
+        r["deleted"] and "AttributeError" in r["error"] for r in broken["results"]
+    )
+    assert report["cases"] == 6 and report["by_status"] == {"completed": 6}
+    first = report["results"][0]
+    assert first["name"] == "accepts_terms=True,user_age=20"
+    assert first["variables"] == {"user_age": 20} and first["deleted"]
+    assert first["files"][0]["format"] == "pdf"
+
+    dafile = {"_class": "docassemble.base.util.DAFile", "number": 7, "filename": "a"}
+    assert file_references(None, {"docs": [dafile]})[0]["variable"] == "docs[0]"
+
+
+def test_session_registry_reaps_expired_sessions():
+    import time
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+
+    with FakeDocassembleServer() as fake:
+        client = DocassembleClient(
+            fake.base_url, "test-key", session_timeout=60, session_reap_interval=0
+        )
+        sessions = [client.start_interview("demo.yml")["session"] for _ in range(3)]
+        client.delete_interview_session("demo.yml", sessions[0])
+        client.sessions._sessions[sessions[1]].last_used -= 120
+        assert client.get_session_stats()["live"] == 2
+        assert client.get_session_stats()["expired"] == 1
+
+        result = client.reap_sessions()
+        assert result["reaped"] == 1 and result["stats"]["live"] == 1
+        assert client.reap_sessions(force=True)["stats"]["live"] == 0
+        assert fake.get_stats()["endpoints"]["DELETE /api/session"] == 3
+
+        background = DocassembleClient(
+            fake.base_url, "test-key", session_timeout=0.1, session_reap_interval=0.05
+        )
+        background.start_interview("demo.yml")
+        deadline = time.time() + 5
+        while len(background.sessions) and time.time() < deadline:
+            time.sleep(0.05)
+        assert background.get_session_stats()["reaped"] == 1
+
+
+def test_client_timeout_applies_to_every_request():
+    import time
+
+    from mcp_docassemble.client import DocassembleAPIError
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+
+    with FakeDocassembleServer(latency=2) as fake:
+        client = DocassembleClient(fake.base_url, "test-key", timeout=0.2)
+        started = time.perf_counter()
+        with pytest.raises(DocassembleAPIError, match="timed out"):
+            client.get_current_user()
+        assert time.perf_counter() - started < 1
+
+
+def test_node_pool_balances_and_fails_over():
+    import socket
+
+    from mcp_docassemble.cancellation import ToolCancelledError
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.tracing import Tracer
+
+    first = FakeDocassembleServer().start()
+    second = FakeDocassembleServer().start()
+    try:
+        client = DocassembleClient(
+            f"{first.base_url},{second.base_url}", "test-key", health_check_interval=0
+        )
+        for _ in range(10):
+            client.get_current_user()
+        assert [node["requests"] for node in client.get_node_stats()["nodes"]] == [
+            5,
+            5,
+        ]
+
+        session = client.start_interview("demo.yml")["session"]
+        owner = (
+            first if client.nodes._affinity[session].url == first.base_url else second
+        )
+        before = owner.get_stats()["requests"]
+        for _ in range(3):
+            client.get_current_question("demo.yml", session)
+        assert owner.get_stats()["requests"] == before + 3
+
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            dead_url = f"http://127.0.0.1:{closed.getsockname()[1]}"
+        spans = []
+        failover = DocassembleClient(
+            [dead_url, first.base_url],
+            "test-key",
+            health_check_interval=0,
+            tracer=Tracer(processor=type("Collector", (), {"on_end": spans.append})()),
+        )
+        for _ in range(4):
+            assert failover.get_current_user()["id"] == 1
+        retry_counts = [span.attributes["http.retry_count"] for span in spans]
+        assert sorted(retry_counts) == [0, 0, 0, 1]
+        stats = failover.get_node_stats()
+        assert stats["failovers"] == 1 and stats["healthy"] == 1
+        assert not stats["nodes"][0]["healthy"]
+
+        # Auch ein Abbruch gibt den gewählten Knoten wieder frei
+        def cancelled(*args, **kwargs):
+            raise ToolCancelledError()
+
+        client.session.request = cancelled
+        with pytest.raises(ToolCancelledError):
+            client.get_current_user()
+        nodes = client.get_node_stats()["nodes"]
+        assert [node["outstanding"] for node in nodes] == [0, 0]
+        retries = failover.get_metrics()["counters"]["docassemble_client_retries_total"]
+        assert retries == [{"labels": {"endpoint": "/api/user"}, "value": 1}]
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_tenant_pool_routes_tools_and_evicts_idle_clients():
+    import asyncio
+    import time
+
+    from mcp.types import CallToolRequest, CallToolRequestParams, ListToolsRequest
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.ratelimit import TokenBucket
+    from mcp_docassemble.server import DocassembleServer
+
+    def request(name, arguments):
+        return CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(name=name, arguments=arguments),
+        )
+
+    with FakeDocassembleServer() as acme, FakeDocassembleServer() as beta:
+        server = DocassembleServer()
+        server.setup_tenants(
+            {
+                "acme": {"base_url": acme.base_url, "api_key": "a"},
+                "beta": {"base_url": beta.base_url, "api_key": "b", "rate_limit": 50},
+            },
+            idle_seconds=60,
+        )
+        handler = server.server.request_handlers[CallToolRequest]
+        tools = asyncio.run(
+            server.server.request_handlers[ListToolsRequest](
+                ListToolsRequest(method="tools/list")
+            )
+        ).root.tools
+        user_tool = next(t for t in tools if t.name == "docassemble_get_current_user")
+        assert user_tool.inputSchema["properties"]["tenant"]["enum"] == ["acme", "beta"]
+        assert "tenant" in user_tool.inputSchema["required"]
+
+        assert server.tenants.get_stats()["open_clients"] == 0
+        for _ in range(3):
+            call = request("docassemble_get_current_user", {"tenant": "acme"})
+            assert not asyncio.run(handler(call)).root.isError
+        assert acme.get_stats()["endpoints"]["GET /api/user"] == 3
+        assert "GET /api/user" not in beta.get_stats()["endpoints"]
+        asyncio.run(
+            handler(request("docassemble_get_current_user", {"tenant": "beta"}))
+        )
+
+        unknown = request("docassemble_get_current_user", {"tenant": "gamma"})
+        assert asyncio.run(handler(unknown)).root.isError
+        missing = asyncio.run(handler(request("docassemble_get_current_user", {})))
+        assert missing.root.isError
+
+        acme_metrics = server.tenants.get("acme").get_metrics()
+        calls = acme_metrics["counters"]["docassemble_mcp_tool_calls_total"]
+        assert [entry["labels"]["tenant"] for entry in calls] == ["acme"]
+        assert server.tenants.get("beta").rate_limiter.rate == 50
+        assert 'tenant="beta"' in server.tenants.metrics.to_prometheus()
+
+        assert server.tenants.evict_idle(now=time.monotonic() + 120) == ["acme", "beta"]
+        stats = server.tenants.get_stats()
+        assert stats["open_clients"] == 0 and stats["evicted"] == 2
+        asyncio.run(
+            handler(request("docassemble_get_current_user", {"tenant": "acme"}))
+        )
+        assert server.tenants.get_stats()["created"] == 3
+
+    bucket = TokenBucket(rate=100, burst=1)
+    started = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.perf_counter() - started >= 0.04
+    assert bucket.get_stats()["throttled"] == 5
+
+
+def test_tool_executor_bounds_concurrency_and_serves_health_over_http():
+    import asyncio
+    import threading
+
+    from starlette.testclient import TestClient
+
+    from mcp_docassemble.executor import ServerBusyError, ToolExecutor
+    from mcp_docassemble.server import DocassembleServer
+    from mcp_docassemble.transport import create_http_app
+
+    executor = ToolExecutor(max_workers=2, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        calls = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServerBusyError):
+            await executor.run(release.wait, 5)
+        stats = executor.get_stats()
+        release.set()
+        return stats, await asyncio.gather(*calls)
+
+    stats, results = asyncio.run(scenario())
+    assert stats["running"] == 2 and stats["queued"] == 1 and stats["rejected"] == 1
+    assert results == [True, True, True]
+
+    server = DocassembleServer()
+    server.executor = executor
+    app = create_http_app(server, "streamable-http")
+    with TestClient(app, base_url="http://127.0.0.1:8000") as http:
+        assert http.get("/healthz").json()["tools"]["completed"] == 3
+        assert http.post("/mcp", json={}).status_code in (400, 406)
+
+
+def test_http_transport_rejects_foreign_hosts_missing_tokens_and_outside_paths(
+    tmp_path,
+):
+    from starlette.testclient import TestClient
+
+    from mcp_docassemble.config import ServerConfig
+    from mcp_docassemble.server import DocassembleServer
+    from mcp_docassemble.transport import create_http_app
+
+    with pytest.raises(ValueError, match="MCP_AUTH_TOKEN"):
+        ServerConfig(base_url="https://da.example", api_key="k", mcp_transport="sse")
+    server = DocassembleServer()
+    with pytest.raises(ValueError, match="Loopback"):
+        create_http_app(server, host="0.0.0.0")
+
+    app = create_http_app(
+        server, host="0.0.0.0", auth_token="s3cret", extra_hosts=["mcp.example.org"]
+    )
+    initialize = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "test", "version": "1"},
+        },
+    }
+    headers = {
+        "Authorization": "Bearer s3cret",
+        "Accept": "application/json, text/event-stream",
+    }
+    with TestClient(app, base_url="http://mcp.example.org") as http:
+        assert http.get("/healthz").status_code == 200
+        for auth in ({}, {"Authorization": "Bearer wrong"}):
+            response = http.post(
+                "/mcp", json=initialize, headers={"Accept": headers["Accept"], **auth}
+            )
+            assert response.status_code == 401
+        assert (
+            http.post(
+                "/mcp", json=initialize, headers={**headers, "Host": "evil.example"}
+            ).status_code
+            == 421
+        )
+        assert (
+            http.post(
+                "/mcp",
+                json=initialize,
+                headers={**headers, "Origin": "http://evil.example"},
+            ).status_code
+            == 403
+        )
+        response = http.post(
+            "/mcp",
+            json=initialize,
+            headers={**headers, "Origin": "https://mcp.example.org"},
+        )
+        assert response.status_code == 200
+
+    # Über HTTP: lokale Pfade nur unterhalb von local_root
+    server.allow_local_paths = False
+    arguments = {"template_file": "form.pdf"}
+    assert "DOCASSEMBLE_LOCAL_ROOT" in server._local_path_error(
+        "docassemble_extract_template_fields", arguments
+    )
+    server.local_root = str(tmp_path.resolve())
+    assert not server._local_path_error(
+        "docassemble_extract_template_fields", arguments
+    )
+    assert arguments["template_file"] == str(tmp_path.resolve() / "form.pdf")
+    (tmp_path / "escape").symlink_to("/etc")
+    for path in ("../secret.pdf", "/etc/passwd", "escape/passwd"):
+        assert "außerhalb" in server._local_path_error(
+            "docassemble_sync_playground_project", {"local_dir": path}
+        )
+
+
+def test_cli_import_defers_client_and_mcp_sdk():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, mcp_docassemble, mcp_docassemble.cli\n"
+        "heavy = [m for m in ('mcp', 'requests', 'mcp_docassemble.server') "
+        "if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+        "assert mcp_docassemble.DocassembleClient.__name__ == 'DocassembleClient'\n"
+        "assert 'requests' in sys.modules and 'mcp' not in sys.modules\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_server_config_reads_and_validates_environment():
+    from mcp_docassemble.config import ServerConfig
+
+    config = ServerConfig.from_env(
+        {
+            "DOCASSEMBLE_BASE_URL": "https://a.example.com,https://b.example.com",
+            "DOCASSEMBLE_API_KEY": "key",
+            "DOCASSEMBLE_MCP_PORT": "9000",
+            "DOCASSEMBLE_SESSION_AFFINITY": "false",
+            "DOCASSEMBLE_CACHE_DIR": "",
+            "OTEL_EXPORTER_OTLP_ENDPOINT": "http://collector:4318",
+        }
+    )
+    assert config.mcp_port == 9000
+    assert config.session_affinity is False
+    assert config.cache_dir is None
+    assert config.trace_otlp_endpoint == "http://collector:4318"
+    assert config.client_options()["timeout"] == 30
+
+    with pytest.raises(ValueError) as error:
+        ServerConfig.from_env(
+            {
+                "DOCASSEMBLE_BASE_URL": "docassemble.example.com",
+                "DOCASSEMBLE_API_KEY": "key",
+                "DOCASSEMBLE_MCP_PORT": "http",
+                "DOCASSEMBLE_MCP_TRANSPORT": "websocket",
+            }
+        )
+    for variable in ("BASE_URL", "MCP_PORT", "MCP_TRANSPORT"):
+        assert f"DOCASSEMBLE_{variable}" in str(error.value)
+
+    with pytest.raises(ValueError, match="DOCASSEMBLE_TENANTS_FILE"):
+        ServerConfig.from_env({})
+    assert (
+        ServerConfig.from_env({"DOCASSEMBLE_TENANTS_FILE": "t.json"}).base_url is None
+    )
+
+
+def test_warmup_runs_after_initialized_within_budget():
+    import asyncio
+
+    from mcp.types import InitializedNotification
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.server import DocassembleServer
+
+    with FakeDocassembleServer() as fake:
+        server = DocassembleServer()
+        server.setup_client(fake.base_url, "test-key")
+        server.setup_warmup(budget=5, connections=3)
+        # Client Erzeugung sendet keinen Request mehr
+        assert fake.get_stats()["requests"] == 0
+
+        handler = server.server.notification_handlers[InitializedNotification]
+        notification = InitializedNotification(method="notifications/initialized")
+        asyncio.run(handler(notification))
+        server.warmup.join(5)
+
+        endpoints = fake.get_stats()["endpoints"]
+        assert endpoints["GET /health_check"] == 3
+        for endpoint in ("/api/user", "/api/privileges", "/api/list", "/api/config"):
+            assert endpoints[f"GET {endpoint}"] == 1
+        assert all(call["ok"] for call in server.warmup.result["calls"].values())
+        assert server.warmup.result["connections"] == 3
+
+        # Konfiguration, Interview Liste und Version kommen aus dem Cache
+        before = fake.get_stats()["requests"]
+        assert server.client.da_version == "1.6.0-fake"
+        server.client.get_server_config()
+        server.client.list_advertised_interviews()
+        assert fake.get_stats()["requests"] == before
+        assert not server.warmup.start()
+
+    from mcp_docassemble.warmup import WarmUp
+
+    with FakeDocassembleServer(latency=0.5) as slow:
+        client = DocassembleClient(slow.base_url, "test-key")
+        result = WarmUp(client, budget=0.1, connections=1).run()
+        assert result["seconds"] < 0.4
+        assert "get_current_user" in result["timed_out"]
+
+
+def test_cancelled_tool_call_aborts_request_and_frees_worker():
+    import asyncio
+    import time
+
+    from mcp_docassemble.executor import ToolExecutor
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+
+    executor = ToolExecutor(max_workers=1, max_queue=1)
+
+    with FakeDocassembleServer(latency=2) as fake:
+        client = DocassembleClient(fake.base_url, "test-key")
+
+        async def scenario():
+            running = asyncio.ensure_future(executor.run(client.get_current_user))
+            queued = asyncio.ensure_future(executor.run(client.list_privileges))
+            await asyncio.sleep(0.2)
+            assert executor.get_stats()["queued"] == 1
+            cancelled_at = time.perf_counter()
+            running.cancel()
+            queued.cancel()
+            for task in (running, queued):
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+            # Der blockierende Request endet, ohne die Latenz abzuwarten
+            while executor.get_stats()["running"]:
+                await asyncio.sleep(0.01)
+            freed_after = time.perf_counter() - cancelled_at
+            return freed_after, await executor.run(lambda: "free")
+
+        freed_after, result = asyncio.run(scenario())
+
+    assert freed_after < 1 and result == "free"
+    stats = executor.get_stats()
+    assert stats["cancelled"] == 2 and stats["queued"] == 0
+    assert (
+        "docassemble_mcp_tool_cancelled_total",
+        {"stage": "running"},
+        1,
+    ) in list(executor.metrics())
+    cancelled = client.get_metrics()["counters"][
+        "docassemble_client_requests_cancelled_total"
+    ]
+    assert cancelled == [{"labels": {"endpoint": "/api/user"}, "value": 1}]
+    # Nur der laufende Aufruf hat den Server erreicht
+    assert "GET /api/privileges" not in fake.get_stats()["endpoints"]
+
+
+def test_long_running_tool_reports_progress_to_host(tmp_path):
+    import asyncio
+
+    from mcp.server.lowlevel.server import request_ctx
+    from mcp.shared.context import RequestContext
+    from mcp.types import CallToolRequest, CallToolRequestParams, RequestParams
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.server import DocassembleServer
+
+    (tmp_path / "questions").mkdir()
+    (tmp_path / "modules").mkdir()
+    for n in range(3):
+        (tmp_path / "questions" / f"q{n}.yml").write_text(f"question: {n}\n")
+    (tmp_path / "modules" / "helpers.py").write_text("X = 1\n")
+
+    class _Session:
+        def __init__(self):
+            self.notifications = []
+
+        async def send_progress_notification(
+            self, token, progress, total, message, **kw
+        ):
+            self.notifications.append((token, progress, total, message))
+
+    session = _Session()
+    request = CallToolRequest(
+        method="tools/call",
+        params=CallToolRequestParams(
+            name="docassemble_sync_playground_project",
+            arguments={"local_dir": str(tmp_path)},
+        ),
+    )
+
+    with FakeDocassembleServer(restart_seconds=0.3) as fake:
+        server = DocassembleServer()
+        server.setup_client(fake.base_url, "test-key")
+        server.client.restart_coalescer.poll_interval = 0.1
+        handler = server.server.request_handlers[CallToolRequest]
+
+        async def call():
+            meta = RequestParams.Meta(progressToken="sync-1")
+            request_ctx.set(RequestContext(1, meta, session, None))
+            return await handler(request)
+
+        result = asyncio.run(call()).root
+
+    assert not result.isError
+    notifications = session.notifications
+    assert {token for token, *_ in notifications} == {"sync-1"}
+    values = [progress for _, progress, _, _ in notifications]
+    assert values == sorted(set(values))
+    # Ende der Upload Phase (4 Dateien) und Statuswechsel des Restarts
+    assert (4.0, 4.0) in [(progress, total) for _, progress, total, _ in notifications]
+    assert notifications[-1][3] == "Server Restart: completed"
+
+
+def test_job_tools_run_in_background_and_persist_results(tmp_path):
+    import asyncio
+    import json
+    import os
+    import stat
+    import threading
+
+    from mcp.types import CallToolRequest, CallToolRequestParams
+
+    from mcp_docassemble.fakeserver import FakeDocassembleServer
+    from mcp_docassemble.jobs import JobManager
+    from mcp_docassemble.server import DocassembleServer
+
+    def request(name, arguments):
+        return CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(name=name, arguments=arguments),
+        )
+
+    state_file = tmp_path / "jobs.json"
+    with FakeDocassembleServer(latency=0.2) as fake:
+        server = DocassembleServer()
+        server.jobs = JobManager(max_workers=1, max_queue=1, state_file=str(state_file))
+        server.setup_client(fake.base_url, "test-key")
+        handler = server.server.request_handlers[CallToolRequest]
+
+        def call(name, **arguments):
+            result = asyncio.run(handler(request(name, arguments))).root
+            return result.isError, result.content[0].text
+
+        submit = {"tool": "docassemble_get_current_user", "arguments": {}}
+        error, text = call("docassemble_job_submit", **submit)
+        job_id = json.loads(text)["job_id"]
+        assert not error
+        # Ein Job läuft, einer wartet, der dritte wird abgelehnt
+        call("docassemble_job_submit", **submit)
+        error, text = call("docassemble_job_submit", **submit)
+        assert error and "Warteschlange voll" in text
+
+        error, text = call("docassemble_job_result", job_id=job_id)
+        assert error and "noch nicht abgeschlossen" in text
+        assert json.loads(call("docassemble_job_status", job_id=job_id)[1])[
+            "status"
+        ] in ("queued", "running")
+
+        while server.jobs.get_stats()["completed"] < 2:
+            threading.Event().wait(0.05)
+        error, text = call("docassemble_job_result", job_id=job_id)
+        assert not error and json.loads(text)["id"] == 1
+        assert call("docassemble_job_status")[1].count('"completed"') >= 2
+
+    # Nach einem Neustart sind Ergebnisse wieder abrufbar
+    state = json.loads(state_file.read_text())
+    state["jobs"].append({**state["jobs"][0], "job_id": "lost", "status": "running"})
+    state_file.write_text(json.dumps(state))
+    restored = JobManager(state_file=str(state_file))
+    assert restored.get("lost").status == "interrupted"
+    assert restored.get(job_id).to_dict(include_result=True)["result"]["id"] == 1
+    # Nur die zuletzt abgeschlossenen Jobs bleiben erhalten
+    assert (
+        JobManager(state_file=str(state_file), max_finished=1).list_jobs()[0]["job_id"]
+        == "lost"
+    )
+    # Ergebnisse können Secrets enthalten
+    if os.name == "posix":
+        assert stat.S_IMODE(state_file.stat().st_mode) == 0o600
+
+    # Jobs sind nur für den eigenen Mandanten sichtbar
+    tenant_jobs = JobManager()
+    acme_job = tenant_jobs.submit("docassemble_get_current_user", dict, tenant="acme")
+    assert tenant_jobs.get(acme_job.job_id, "acme") is acme_job
+    with pytest.raises(KeyError):
+        tenant_jobs.get(acme_job.job_id, "other")
+    assert tenant_jobs.list_jobs("other") == [] and tenant_jobs.list_jobs() == []
+    assert len(tenant_jobs.list_jobs("acme")) == 1
+    tenant_jobs.shutdown()